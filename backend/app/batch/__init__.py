@@ -0,0 +1,2 @@
+# バッチ処理 __init__.py
+# 初心者向け解説：APIサーバーとは別に、cron などから定期実行する処理を置くパッケージ
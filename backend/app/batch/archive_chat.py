@@ -0,0 +1,111 @@
+# 夜間バッチ：古いチャット履歴のアーカイブ
+# 初心者向け解説：N日より古いチャットを chat_messages から chat_archives（ユーザー × 月ごとに圧縮）へ移す
+#
+# 使い方：
+#   cd backend
+#   python -m app.batch.archive_chat                # CHAT_ARCHIVE_AFTER_DAYS（既定180日）より古いものを移す
+#   python -m app.batch.archive_chat --days 90 --codec zstd
+#
+# cron の例（毎日 4:00）：
+#   0 4 * * * cd /app/backend && python -m app.batch.archive_chat >> /var/log/archive_chat.log 2>&1
+#
+# なぜ必要なのか：
+# - chat_messages とその索引を小さく保ち、メモリ（バッファプール）に収まるようにするため
+# - 移したメッセージも GET /api/chat/history で今まで通り読める（app/services/chat_history.py）
+#
+# 注意：アーカイブ済みのメッセージは全文検索（/api/search）の対象外になる
+#
+# 中断した場合：もう一度実行するだけでよい（1か月分ずつ commit しているので、移し終えた分は残らない）
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select
+
+import app.models  # noqa: F401  全モデルを登録（リレーション解決のため）
+from app.config import settings
+from app.database import SessionLocal
+from app.models.chat import ChatMessage
+from app.services.chat_archive import archive_oldest_month
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _archive_user(user_id: int, cutoff: datetime, codec: str) -> int:
+    """1ユーザー分を古い月から順に移し、移した件数を返す（1か月ごとに commit）"""
+    db = SessionLocal()
+    moved = 0
+    try:
+        while True:
+            count = archive_oldest_month(db, user_id, cutoff, codec)
+            if count == 0:
+                break
+            db.commit()
+            moved += count
+        return moved
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run(days: int = None, codec: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    アーカイブを実行
+
+    Args:
+        days: この日数より古いメッセージを移す（None なら CHAT_ARCHIVE_AFTER_DAYS）
+        codec: "zlib" / "zstd"（None なら CHAT_ARCHIVE_CODEC）
+        chunk_size: ユーザーIDを一度に読む件数（yield_per の件数）
+    """
+    days = settings.CHAT_ARCHIVE_AFTER_DAYS if days is None else days
+    codec = codec or settings.CHAT_ARCHIVE_CODEC
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    started = time.perf_counter()
+    users = 0
+    moved = 0
+
+    # なぜ読み込み用と書き込み用でセッションを分けるのか：
+    # - yield_per はサーバー側カーソルで少しずつ読むので、同じ接続で commit すると読み込みが壊れる
+    reader = SessionLocal()
+    try:
+        query = reader.execute(
+            select(ChatMessage.user_id)
+            .where(ChatMessage.created_at < cutoff)
+            .distinct()
+            .order_by(ChatMessage.user_id),
+            execution_options={"yield_per": chunk_size}
+        ).scalars()
+        for user_id in query:
+            moved += _archive_user(user_id, cutoff, codec)
+            users += 1
+    finally:
+        reader.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "users": users,
+        "archived_messages": moved,
+        "cutoff": cutoff.isoformat(timespec="seconds"),
+        "elapsed_seconds": round(elapsed, 2),
+    }
+    print(f"✅ チャットアーカイブ完了: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="古いチャット履歴を圧縮して chat_archives へ移す")
+    parser.add_argument("--days", type=int, default=None,
+                        help=f"この日数より古いものを移す（既定: {settings.CHAT_ARCHIVE_AFTER_DAYS}）")
+    parser.add_argument("--codec", choices=["zlib", "zstd"], default=None,
+                        help=f"圧縮方式（既定: {settings.CHAT_ARCHIVE_CODEC}）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="ユーザーIDを一度に読む件数")
+    args = parser.parse_args(argv)
+    run(days=args.days, codec=args.codec, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
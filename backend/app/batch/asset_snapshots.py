@@ -0,0 +1,100 @@
+# 夜間バッチ：資産スナップショットの記録とロールアップ
+# 初心者向け解説：資産に変更がなかった日も推移グラフに点が出るよう、1日1回全員分を記録する
+#
+# 使い方：
+#   cd backend
+#   python -m app.batch.asset_snapshots              # 今日の記録 + 古い行のロールアップ
+#   python -m app.batch.asset_snapshots --no-rollup  # 記録だけ
+#
+# cron の例（毎日 0:30）：
+#   30 0 * * * cd /app/backend && python -m app.batch.asset_snapshots >> /var/log/asset_snapshots.log 2>&1
+
+import argparse
+import time
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import select
+
+import app.models  # noqa: F401  全モデルを登録（リレーション解決のため）
+from app.database import SessionLocal
+from app.models.asset import Asset
+from app.models.asset_snapshot import AssetSnapshot
+from app.services.asset_history import record_asset_snapshot, rollup_snapshots
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _process_chunk(user_ids: List[int], today: date, rollup: bool) -> int:
+    """1チャンク分を記録（・ロールアップ）して commit し、削除した行数を返す"""
+    db = SessionLocal()
+    try:
+        connection = db.connection()
+        removed = 0
+        for user_id in user_ids:
+            record_asset_snapshot(connection, user_id, today)
+            if rollup:
+                removed += rollup_snapshots(connection, user_id, today)
+        db.commit()
+        return removed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run(chunk_size: int = DEFAULT_CHUNK_SIZE, rollup: bool = True) -> dict:
+    """
+    資産を持っているユーザー（と過去にスナップショットがあるユーザー）全員分を処理
+
+    なぜ過去のスナップショットも対象：資産を全部削除したユーザーの履歴もロールアップするため
+    """
+    today = date.today()
+    started = time.perf_counter()
+    processed = 0
+    removed = 0
+
+    # なぜ読み込み用と書き込み用でセッションを分けるのか：
+    # - yield_per はサーバー側カーソルで少しずつ読むので、同じ接続で commit すると読み込みが壊れる
+    reader = SessionLocal()
+    try:
+        user_ids = select(Asset.user_id).union(select(AssetSnapshot.user_id)).subquery()
+        query = reader.execute(
+            select(user_ids.c.user_id).order_by(user_ids.c.user_id),
+            execution_options={"yield_per": chunk_size}
+        ).scalars()
+        chunk = []
+        for user_id in query:
+            chunk.append(user_id)
+            if len(chunk) >= chunk_size:
+                removed += _process_chunk(chunk, today, rollup)
+                processed += len(chunk)
+                chunk = []
+        if chunk:
+            removed += _process_chunk(chunk, today, rollup)
+            processed += len(chunk)
+    finally:
+        reader.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "processed": processed,
+        "rolled_up_rows": removed,
+        "elapsed_seconds": round(elapsed, 2),
+        "users_per_second": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"✅ 資産スナップショット完了: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="全ユーザーの資産スナップショットを記録し、古い行をロールアップ")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="まとめて処理するユーザー数")
+    parser.add_argument("--no-rollup", action="store_true", help="ロールアップを行わない")
+    args = parser.parse_args(argv)
+    run(chunk_size=args.chunk_size, rollup=not args.no_rollup)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# 月次バッチ：chat_messages の区画（パーティション）の作成・削除（MySQL のみ）
+# 初心者向け解説：先の月の区画を前もって作り、古い月の区画を削除する
+#
+# 使い方：
+#   cd backend
+#   python -m app.batch.chat_partitions                   # 設定値どおりに作成・削除
+#   python -m app.batch.chat_partitions --ahead 6 --retain-months 0   # 6か月先まで作成、削除はしない
+#   python -m app.batch.chat_partitions --force           # 中身が残っている古い区画も削除
+#
+# cron の例（毎月1日 4:30。アーカイブ（app.batch.archive_chat）の後に実行する）：
+#   30 4 1 * * cd /app/backend && python -m app.batch.chat_partitions >> /var/log/chat_partitions.log 2>&1
+#
+# なぜ前もって作るのか：
+# - 区画がない月の行は pmax に入る。pmax が大きくなってから分割すると、行の移動で時間がかかる
+# - 空の pmax を分割するだけなら一瞬で終わる
+#
+# なぜ既定では空の区画だけ削除するのか：
+# - アーカイブで chat_archives に移し終えた月は空になっている → 削除してもメッセージは消えない
+# - 削除は DELETE と違って、ディスク領域もすぐに解放される
+
+import argparse
+from datetime import date
+from typing import List, Optional
+
+from app.config import settings
+from app.database import engine
+from app.services.chat_partitions import create_future_partitions, drop_expired_partitions
+
+
+def run(ahead: int = None, retain_months: int = None, force: bool = False) -> dict:
+    """
+    区画の作成と削除を実行
+
+    Args:
+        ahead: 今月から何か月先までの区画を作るか（None なら CHAT_PARTITION_AHEAD_MONTHS）
+        retain_months: これより古い月の区画を削除（None なら CHAT_PARTITION_RETENTION_MONTHS、0 なら削除しない）
+        force: 中身が残っている区画も削除する
+    """
+    ahead = settings.CHAT_PARTITION_AHEAD_MONTHS if ahead is None else ahead
+    retain_months = settings.CHAT_PARTITION_RETENTION_MONTHS if retain_months is None else retain_months
+
+    if engine.dialect.name != "mysql":
+        print(f"⚠️ パーティションは MySQL のみ対応です（現在: {engine.dialect.name}）。何もしません")
+        return {"created": [], "dropped": [], "kept": []}
+
+    today = date.today()
+    # ALTER TABLE は MySQL では自動的に確定されるので、トランザクションは分けない
+    with engine.connect() as connection:
+        created = create_future_partitions(connection, today, ahead)
+        dropped, kept = ([], [])
+        if retain_months > 0:
+            dropped, kept = drop_expired_partitions(connection, today, retain_months, force)
+
+    summary = {"created": created, "dropped": dropped, "kept": kept}
+    if kept:
+        print(f"⚠️ 中身が残っているため削除しなかった区画: {kept}（先にアーカイブを実行するか --force）")
+    print(f"✅ チャットの区画の管理完了: {summary}")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="chat_messages の月別パーティションを作成・削除（MySQL のみ）")
+    parser.add_argument("--ahead", type=int, default=None,
+                        help=f"何か月先まで作るか（既定: {settings.CHAT_PARTITION_AHEAD_MONTHS}）")
+    parser.add_argument("--retain-months", type=int, default=None,
+                        help=f"これより古い月を削除（既定: {settings.CHAT_PARTITION_RETENTION_MONTHS}、0 = 削除しない）")
+    parser.add_argument("--force", action="store_true", help="中身が残っている区画も削除する")
+    args = parser.parse_args(argv)
+    run(ahead=args.ahead, retain_months=args.retain_months, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# 夜間バッチ：全ユーザーのシミュレーション事前計算
+# 初心者向け解説：ダッシュボードが見られる前（夜間）に、シミュレーションを計算して保存しておく
+#
+# 使い方：
+#   cd backend
+#   python -m app.batch.precompute                      # 50年・年次で実行
+#   python -m app.batch.precompute --years 100 --resolution monthly --workers 4
+#
+# cron の例（毎日 3:00）：
+#   0 3 * * * cd /app/backend && python -m app.batch.precompute >> /var/log/precompute.log 2>&1
+#
+# 仕組み：
+# 1. 「前回の計算後に data_version が変わった（または未計算の）ユーザー」だけを
+#    ID順に yield_per で少しずつ読む（全ユーザーを一度にメモリに載せない）
+# 2. チャンクごとに入力をまとめて読み込み、プロセスプールで並列に計算
+# 3. simulation_results に書き込んで、チャンクごとに commit
+#
+# 中断した場合：
+# - もう一度実行するだけでよい。commit 済みのユーザーは data_version が一致するので自動的にスキップされる
+# - 最後に表示された last_user_id を --after-id に渡すと、対象の検索もそこから始める
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+import app.models  # noqa: F401  全モデルを登録（リレーション解決のため）
+from app.database import SessionLocal
+from app.models.simulation_result import SimulationResult
+from app.models.user import User
+from app.services.compute_pool import init_worker
+from app.services.simulation_inputs import load_simulation_inputs_bulk, simulate_payload
+from app.services.simulation_results import save_result
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+def stale_users_query(db, years: int, resolution: str, base_year: int, after_id: int = 0):
+    """
+    再計算が必要なユーザー（ID と data_version）を ID 順に返すクエリ
+
+    - 結果がまだない
+    - 結果の data_version が古い
+    - 結果の開始年が去年以前
+    """
+    return (
+        db.query(User.id, User.data_version)
+        .outerjoin(
+            SimulationResult,
+            and_(
+                SimulationResult.user_id == User.id,
+                SimulationResult.years == years,
+                SimulationResult.resolution == resolution
+            )
+        )
+        .filter(
+            User.id > after_id,
+            or_(
+                SimulationResult.id.is_(None),
+                SimulationResult.data_version != User.data_version,
+                SimulationResult.base_year != base_year
+            )
+        )
+        .order_by(User.id)
+    )
+
+
+def process_chunk(
+    chunk: List[Tuple[int, int]],
+    years: int,
+    resolution: str,
+    base_year: int,
+    executor: Optional[ProcessPoolExecutor]
+) -> int:
+    """1チャンク分（[(ユーザーID, data_version), ...]）を計算して保存し、件数を返す"""
+    db = SessionLocal()
+    try:
+        inputs_by_user = load_simulation_inputs_bulk(db, [user_id for user_id, _ in chunk], years)
+        inputs = [inputs_by_user[user_id] for user_id, _ in chunk]
+
+        if executor is None:
+            payloads = [simulate_payload(item, resolution) for item in inputs]
+        else:
+            payloads = executor.map(simulate_payload, inputs, repeat(resolution))
+
+        for (user_id, data_version), payload in zip(chunk, payloads):
+            save_result(db, user_id, years, resolution, data_version, base_year, payload)
+        db.commit()
+        return len(chunk)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def run(
+    years: int = 50,
+    resolution: str = "yearly",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 0,
+    after_id: int = 0
+) -> dict:
+    """
+    事前計算を実行
+
+    Args:
+        years: シミュレーション年数
+        resolution: "yearly" / "monthly"
+        chunk_size: 1回にまとめて処理するユーザー数（yield_per の件数でもある）
+        workers: 計算プロセス数（0 = プロセスプールを使わない）
+        after_id: このユーザーIDより後から処理する（中断からの再開用）
+    """
+    base_year = datetime.now().year
+    started = time.perf_counter()
+    processed = 0
+    last_user_id = after_id
+
+    executor = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker
+        )
+    # なぜ読み込み用と書き込み用でセッションを分けるのか：
+    # - yield_per はサーバー側カーソルで少しずつ読むので、同じ接続で commit すると読み込みが壊れる
+    reader = SessionLocal()
+    try:
+        query = stale_users_query(reader, years, resolution, base_year, after_id).yield_per(chunk_size)
+        chunk = []
+        for user_id, data_version in query:
+            chunk.append((user_id, data_version))
+            if len(chunk) >= chunk_size:
+                processed += process_chunk(chunk, years, resolution, base_year, executor)
+                last_user_id = chunk[-1][0]
+                chunk = []
+                _report(processed, started, last_user_id)
+        if chunk:
+            processed += process_chunk(chunk, years, resolution, base_year, executor)
+            last_user_id = chunk[-1][0]
+            _report(processed, started, last_user_id)
+    finally:
+        reader.close()
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "processed": processed,
+        "elapsed_seconds": round(elapsed, 2),
+        "users_per_second": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        "last_user_id": last_user_id,
+    }
+    print(f"✅ 事前計算完了: {summary}")
+    return summary
+
+
+def _report(processed: int, started: float, last_user_id: int):
+    """進捗（処理件数・スループット・再開用のID）を表示"""
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"  {processed}人処理済み（{rate:.1f} users/s, last_user_id={last_user_id}）", flush=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="全ユーザーのシミュレーションを事前計算して simulation_results に保存")
+    parser.add_argument("--years", type=int, default=50, help="シミュレーション年数（既定: 50）")
+    parser.add_argument("--resolution", choices=["yearly", "monthly"], default="yearly", help="計算モード")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="まとめて処理するユーザー数")
+    parser.add_argument("--workers", type=int, default=2, help="計算プロセス数（0 = 使わない）")
+    parser.add_argument("--after-id", type=int, default=0, help="このユーザーIDより後から再開")
+    args = parser.parse_args(argv)
+
+    print(f"🌙 事前計算開始: years={args.years}, resolution={args.resolution}, workers={args.workers}")
+    run(
+        years=args.years,
+        resolution=args.resolution,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        after_id=args.after_id
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,70 @@
 # FastAPI メインアプリケーション
 # 初心者向け解説：バックエンドの入り口です
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+# 起動時間の計測用（このファイルの読み込み開始から、リクエストを受け付けるまで）
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from app.config import settings
 from app.database import engine, Base
+from app.services.compute_pool import start_pool, shutdown_pool
+from app.services.job_queue import job_queue
+from app.services import llm
+from app.services.llm import llm_metrics
+from app.services.query_stats import QueryStatsMiddleware
+from app.services.profiling import ProfilingMiddleware
 
 # モデルをインポートしてテーブル作成を有効化
 import app.models
 
-# データベーステーブルを作成
-# 注目：実際にはAlembicを使うべき（後で説明）
-Base.metadata.create_all(bind=engine)
+
+# === 起動・終了時の処理（lifespan）===
+# なぜ読み込み時ではなく lifespan で行うのか：
+# - import しただけ（gunicorn の --preload・スクリプト・テスト）で DB に接続しない
+# - 起動にかかった時間を1か所で測れる
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    アプリ起動時と終了時に実行される処理
+    
+    yield より前：起動時（計算プロセス・ジョブワーカーの起動）
+    yield より後：終了時（クリーンアップ）
+    """
+    started = time.perf_counter()
+    
+    # データベーステーブルの作成は Alembic のマイグレーションで、ワーカーの起動前に1回だけ行う（startup.sh）
+    # なぜワーカーごとに create_all しないのか：
+    # - 起動のたびに全テーブルの存在確認の SQL が走り、ワーカーが増えるほど起動が遅くなる
+    # - 索引の追加や列の変更は create_all では反映されない
+    # 一時的な SQLite で動かす時だけ DB_CREATE_ALL_ON_STARTUP=true で作る
+    if settings.DB_CREATE_ALL_ON_STARTUP:
+        Base.metadata.create_all(bind=engine)
+    
+    # シミュレーション用の計算プロセスを起動（NumPy読み込み済みの状態で待機）
+    start_pool()
+    
+    # バックグラウンドジョブのワーカーを起動
+    await job_queue.start()
+    
+    # LLM クライアントは別スレッドで準備（待たずにリクエストの受け付けを始める）
+    if settings.LLM_WARMUP_ON_STARTUP:
+        asyncio.get_running_loop().run_in_executor(None, llm.warm_up)
+    
+    print(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} が起動しました"
+          f"（読み込み {_import_seconds * 1000:.0f} ms + 起動処理 {(time.perf_counter() - started) * 1000:.0f} ms）")
+    print(f"📚 APIドキュメント: http://localhost:8000/docs")
+    
+    yield
+    
+    await job_queue.stop()
+    shutdown_pool()
+    print("👋 アプリケーションを終了します")
 
 # === FastAPI アプリ作成 ===
 app = FastAPI(
@@ -20,6 +73,9 @@ app = FastAPI(
     description="WealthSupporter API - 資産管理アプリのバックエンド",
     docs_url="/docs",  # Swagger UI（APIドキュメント）
     redoc_url="/redoc",  # ReDoc（別のドキュメント）
+    default_response_class=ORJSONResponse,
+    # なぜ ORJSONResponse：標準の json より高速にレスポンスをシリアライズできる
+    lifespan=lifespan,
 )
 
 # === CORS設定 ===
@@ -34,15 +90,24 @@ app.add_middleware(
     allow_credentials=True,  # Cookieを許可
     allow_methods=["*"],  # 全HTTPメソッドを許可（GET, POST, PUT, DELETE）
     allow_headers=["*"],  # 全ヘッダーを許可
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms", "X-Profile-Id"],  # フロントエンドから SQL の回数を見られるように
 )
 
+# === SQL 実行回数の計測 ===
+# リクエストごとに SQL の回数・時間を数えてヘッダーとログに出す（app/services/query_stats.py）
+app.add_middleware(QueryStatsMiddleware)
+
+# === リクエスト単位のプロファイル ===
+# 管理者が ?profile=1 を付けたシミュレーション・チャットのリクエストだけ記録（app/services/profiling.py）
+app.add_middleware(ProfilingMiddleware)
+
 # === ルーター登録 ===
 # なぜ別ファイルに分けるのか：
 # - 機能ごとに整理
 # - ファイルが長くなりすぎない
 # - チーム開発で分担しやすい
 
-from app.routers import auth, assets, chat, income, expense, house, education, career, risk, retirement, family, simulation
+from app.routers import auth, assets, chat, income, expense, house, education, career, risk, retirement, family, simulation, jobs, summary, search, admin
 
 app.include_router(auth.router, prefix="/api/auth", tags=["認証"])
 app.include_router(assets.router, prefix="/api/assets", tags=["資産"])
@@ -56,6 +121,10 @@ app.include_router(retirement.router, prefix="/api/retirement", tags=["老後"])
 app.include_router(chat.router, prefix="/api/chat", tags=["チャット"])
 app.include_router(family.router, tags=["家族構成"])
 app.include_router(simulation.router, tags=["シミュレーション"])
+app.include_router(summary.router, prefix="/api/summary", tags=["家計サマリー"])
+app.include_router(search.router, prefix="/api/search", tags=["検索"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["バックグラウンドジョブ"])
+app.include_router(admin.router, prefix="/api/admin", tags=["管理者"])
 
 # === ヘルスチェックエンドポイント ===
 # なぜ必要なのか：
@@ -84,22 +153,21 @@ def health_check():
     """
     return {"status": "healthy"}
 
-# === 起動時の処理 ===
-@app.on_event("startup")
-async def startup_event():
+@app.get("/metrics", tags=["ヘルスチェック"], response_class=PlainTextResponse)
+def metrics():
     """
-    アプリ起動時に実行される処理
+    監視用のメトリクス（Prometheus のテキスト形式）
     
-    ここでデータベース接続確認などを行える
-    """
-    print(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} が起動しました")
-    print(f"📚 APIドキュメント: http://localhost:8000/docs")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    アプリ終了時に実行される処理
+    - llm_circuit_state：LLM サーキットブレーカーの状態
+    - llm_calls_total：LLM 呼び出しの回数（成功・失敗・拒否）
+    - llm_fallbacks_total：LLM の代わりに予備の処理で応答した回数
+    - llm_prompt_tokens_total / llm_response_tokens_total：入力・出力のトークン数
+    - llm_parse_total：応答から JSON を取り出せたか
+    - 呼び出し元ごとの詳しい集計は GET /api/admin/llm-stats（管理者のみ）
     
-    クリーンアップ処理など
+    注意：値はこのプロセスの分だけ（ワーカーが複数ならワーカーごと）
     """
-    print("👋 アプリケーションを終了します")
+    return llm_metrics.to_prometheus()
+
+# 読み込みにかかった時間（gunicorn の preload では、マスタープロセスでの1回分）
+_import_seconds = time.perf_counter() - _import_started
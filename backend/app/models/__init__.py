@@ -3,8 +3,30 @@
 
 from app.models.user import User
 from app.models.asset import Asset
+from app.models.income import Income
+from app.models.expense import Expense
+from app.models.house import House
+from app.models.education import Education
+from app.models.career import Career
+from app.models.risk import Risk
 from app.models.chat import ChatMessage
 from app.models.family import FamilyMember
 from app.models.retirement import Retirement
+from app.models.simulation_result import SimulationResult
+from app.models.financial_summary import UserFinancialSummary
+from app.models.asset_snapshot import AssetSnapshot
+from app.models.chat_archive import ChatArchive
+from app.models.chat_memory import UserChatMemory
 
-__all__ = ["User", "Asset", "ChatMessage", "FamilyMember", "Retirement"]
+# 全文検索の索引（MySQL: FULLTEXT / SQLite: FTS5）を登録
+from app.models import search_index  # noqa: F401
+
+# 入力データ変更時に users.data_version を更新するフックを登録
+from app.models import data_version  # noqa: F401
+
+__all__ = [
+    "User", "Asset", "Income", "Expense", "House", "Education",
+    "Career", "Risk", "ChatMessage", "FamilyMember", "Retirement",
+    "SimulationResult", "UserFinancialSummary", "AssetSnapshot",
+    "ChatArchive", "UserChatMemory"
+]
@@ -0,0 +1,30 @@
+# 資産スナップショットモデル
+# 初心者向け解説：資産合計の「履歴」を残すための追記専用テーブル
+#
+# なぜ必要なのか：
+# - assets テーブルは現在の金額しか持たず、更新すると前の値は消える
+# - 日ごと（または変更のたび）に資産の種類ごとの合計を記録しておけば、推移グラフが描ける
+#
+# 注目ポイント：
+# - 1行 = 「ある日付・ある資産種類の合計」だけのコンパクトな形
+# - 古い行は週・月単位にまとめる（ロールアップ）ので、行数が増え続けない
+#   granularity: day（日次）/ week（週の最後の記録だけ残したもの）/ month（月の最後の記録だけ残したもの）
+#   日付はどの粒度でも実際の記録日
+
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index
+from app.database import Base
+
+class AssetSnapshot(Base):
+    """資産スナップショットテーブル"""
+    __tablename__ = "asset_snapshots"
+    __table_args__ = (
+        # なぜ (user_id, snapshot_date)：範囲検索「このユーザーの○月〜○月」を速くするため
+        Index("ix_asset_snapshots_user_date", "user_id", "snapshot_date"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    asset_type = Column(String(50), nullable=False)
+    total = Column(Float, nullable=False)  # その日時点の、この種類の資産合計
+    granularity = Column(String(5), default="day", nullable=False)  # day / week / month
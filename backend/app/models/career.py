@@ -8,7 +8,7 @@ class Career(Base):
     __tablename__ = "careers"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     career_type = Column(String(50), nullable=False)  # 転職、副業、起業など
     description = Column(String(200), nullable=False)
     expected_income = Column(Float, nullable=True)
@@ -1,11 +1,17 @@
 # チャットメッセージモデル（データベーステーブル定義）
 # 初心者向け解説：AIとのチャット履歴を保存するテーブル
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKeyConstraint, Index, event
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import date, datetime
+from app.config import settings
 from app.database import Base
 
+
+def _not_mysql(ddl, target, bind, dialect=None, **kw) -> bool:
+    """MySQL 以外のときだけDDLを実行する条件"""
+    return (dialect or bind.dialect).name != "mysql"
+
 class ChatMessage(Base):
     """
     チャットメッセージテーブル
@@ -15,10 +21,20 @@ class ChatMessage(Base):
     - 履歴を見返せる
     """
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # なぜ複合索引 (user_id, created_at, id)：
+        # - 「このユーザーの履歴を新しい順に」を索引の順番のまま読める（並べ替え不要）
+        # - キーセットページネーション（created_at, id より古いもの）の条件もそのまま使える
+        # - 先頭が user_id なので、user_id だけの検索にも使える
+        Index("ix_chat_messages_user_created_id", "user_id", "created_at", "id"),
+        # なぜ MySQL では外部キーを作らない：MySQL では月別パーティション表（下の after_create）に
+        # 外部キーを付けられないため。ユーザー削除時は User.chat_messages の cascade で消える
+        ForeignKeyConstraint(["user_id"], ["users.id"]).ddl_if(callable_=_not_mysql),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     # どのユーザーのチャットか
     
     message = Column(Text, nullable=False)
@@ -27,11 +43,28 @@ class ChatMessage(Base):
     response = Column(Text, nullable=False)
     # AIの応答
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
-    # なぜ index：日付順で並べることが多いので
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # 日付順の並べ替えは上の複合索引を使う
     
     # === リレーション ===
     user = relationship("User", back_populates="chat_messages")
     
     def __repr__(self):
         return f"<ChatMessage(id={self.id}, user_id={self.user_id})>"
+
+
+@event.listens_for(ChatMessage.__table__, "after_create")
+def _partition_by_month(target, connection, **kw):
+    """
+    MySQL：作ったばかりの chat_messages を created_at の月別パーティション表にする
+
+    今月から CHAT_PARTITION_AHEAD_MONTHS か月先までの区画を作る
+    （それより先は python -m app.batch.chat_partitions で毎月作り足す）
+    """
+    if connection.dialect.name != "mysql":
+        return
+    # なぜ関数内でインポート：モデルの読み込み時にサービスを読み込まないため
+    from app.services.chat_partitions import partitioning_ddl
+
+    for statement in partitioning_ddl(date.today(), settings.CHAT_PARTITION_AHEAD_MONTHS):
+        connection.exec_driver_sql(statement)
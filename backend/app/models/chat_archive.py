@@ -0,0 +1,34 @@
+# チャットアーカイブモデル
+# 初心者向け解説：古いチャット履歴を「ユーザー × 月」ごとに圧縮してまとめて保存するテーブル
+#
+# なぜ必要なのか：
+# - chat_messages は増え続け、1行ごとに message / response の全文を持つ
+# - 何か月も前の会話はほとんど読まれないので、圧縮して別テーブルに移す
+#   → chat_messages とその索引が小さく保たれ、メモリ（バッファプール）に収まりやすい
+#
+# payload の中身：その月のメッセージの JSON 配列（新しい順）を zlib または zstd で圧縮したもの
+#   [[id, created_at, message, response], ...]
+
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.mysql import LONGBLOB
+from datetime import datetime
+from app.database import Base
+
+class ChatArchive(Base):
+    """チャットアーカイブテーブル（1ユーザー・1か月につき1行）"""
+    __tablename__ = "chat_archives"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", name="uq_chat_archives_user_period"),
+        # 履歴を遡る時の「このユーザーの月を新しい順に」を、並べ替えなしで読むための索引
+        Index("ix_chat_archives_user_last", "user_id", "last_created_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    period = Column(String(7), nullable=False)  # "2025-01" のような年月
+    message_count = Column(Integer, nullable=False)
+    first_created_at = Column(DateTime, nullable=False)  # 含まれる最も古いメッセージの日時
+    last_created_at = Column(DateTime, nullable=False)  # 含まれる最も新しいメッセージの日時
+    codec = Column(String(10), nullable=False)  # zlib / zstd
+    payload = Column(LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
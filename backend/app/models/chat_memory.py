@@ -0,0 +1,27 @@
+# チャットの会話メモリーモデル
+# 初心者向け解説：AIが「これまでの会話」を覚えておくための、ユーザーごとの要約を保存するテーブル
+#
+# なぜ必要なのか：
+# - 会話の履歴を全部プロンプトに入れると、会話が長くなるほどトークン数（料金・待ち時間）が増える
+# - 直近の数ターンはそのまま、それより古い会話はこの要約（summary）1つにまとめてプロンプトに入れる
+#   → プロンプトの大きさは会話の長さに関係なく一定以下に収まる
+#
+# summarized_through_at / summarized_through_id：要約に含め終わった最後のメッセージ
+# （これより新しいメッセージが「まだ要約していない直近のターン」）
+#
+# 更新は app/services/chat_memory.py が、直近のターンが上限を超えた時だけ行う
+
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class UserChatMemory(Base):
+    """ユーザーごとの会話メモリーテーブル（1ユーザー1行）"""
+    __tablename__ = "user_chat_memory"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    summary = Column(Text, nullable=False, default="")  # 古い会話の要約
+    summarized_turns = Column(Integer, nullable=False, default=0)  # 要約に含めたターン数の累計
+    summarized_through_at = Column(DateTime, nullable=True)
+    summarized_through_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
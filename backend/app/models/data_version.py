@@ -0,0 +1,99 @@
+# データバージョン・家計サマリーの自動更新
+# 初心者向け解説：ユーザーのデータが変更されたら、flush の直後に次の2つを行うフック
+# 1. シミュレーションの入力になるテーブルが変わった → users.data_version を +1
+# 2. 家計サマリーに関わるテーブルが変わった → user_financial_summary の、変わったテーブルの分を集計し直す
+# 3. 資産が変わった → その日の資産スナップショット（asset_snapshots）を記録し直す
+#
+# なぜフック（イベント）で行うのか：
+# - 各ルーター・チャットの作成・更新・削除のたびに書くと、書き忘れが起きる
+# - flush（DBへの書き込み）のタイミングで変更されたオブジェクトを見れば、漏れなく検知できる
+# - 同じトランザクション内で更新するので、rollback すればサマリーも元に戻る
+#
+# 注意：db.query(...).delete() のような一括操作は flush を通らないので検知されない
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.asset import Asset
+from app.models.income import Income
+from app.models.expense import Expense
+from app.models.house import House
+from app.models.education import Education
+from app.models.career import Career
+from app.models.family import FamilyMember
+from app.models.retirement import Retirement
+from app.models.risk import Risk
+
+# シミュレーションの入力になるモデル
+VERSIONED_MODELS = (Asset, Income, Expense, House, Education, Career, FamilyMember, Retirement)
+
+# 家計サマリーの集計対象になるモデル（リスクはシミュレーションには使わないがサマリーには含める）
+SUMMARY_MODELS = VERSIONED_MODELS + (Risk,)
+
+
+def changed_user_ids(session: Session, models=VERSIONED_MODELS) -> set:
+    """今回の flush で、指定したモデルの行が変わったユーザーIDの集合"""
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models) and obj.user_id is not None:
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue  # 属性に触れただけで値は変わっていない
+            user_ids.add(obj.user_id)
+    return user_ids
+
+
+def changed_models_by_user(session: Session, models=SUMMARY_MODELS) -> dict:
+    """今回の flush で行が変わったモデルを、ユーザーIDごとに集める（{user_id: {Asset, Income, ...}}）"""
+    changes = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models) and obj.user_id is not None:
+            if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+                continue
+            changes.setdefault(obj.user_id, set()).add(type(obj))
+    return changes
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_users(session: Session, flush_context, instances):
+    """flush 前に対象ユーザーを集めておく（flush 後は new / dirty が空になるため）"""
+    session.info.setdefault("changed_user_ids", set()).update(changed_user_ids(session))
+    from app.services.financial_summary import lock_financial_summary
+
+    summary_changes = session.info.setdefault("summary_changes", {})
+    for user_id, models in changed_models_by_user(session).items():
+        if user_id not in summary_changes:
+            # 元データを書き込む前にサマリー行をロック（同じユーザーの同時更新を順番にする）
+            lock_financial_summary(session.connection(), user_id)
+        summary_changes.setdefault(user_id, set()).update(models)
+    session.info.setdefault("asset_user_ids", set()).update(changed_user_ids(session, (Asset,)))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_version(session: Session, flush_context):
+    """
+    対象ユーザーの data_version を +1 し、家計サマリー・資産スナップショットを更新
+
+    なぜ UPDATE 文を直接使うのか：
+    - flush の途中でORMオブジェクトを変更すると、もう一度 flush が必要になる
+    - "data_version = data_version + 1" ならDB側で加算されるので、同時更新でも値が飛ばない
+    """
+    # なぜ関数内でインポート：サービス側がモデルをインポートするので、循環インポートを避ける
+    from app.services.financial_summary import refresh_financial_summary
+    from app.services.asset_history import record_asset_snapshot
+
+    user_ids = session.info.pop("changed_user_ids", None)
+    if user_ids:
+        session.connection().execute(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(data_version=User.data_version + 1)
+        )
+
+    # サマリーは data_version の更新後に集計する（最新のバージョンを記録するため）
+    # 変わったモデルの分（例：支出だけ追加 → 支出の集計だけ）を集計し直す
+    for user_id, models in (session.info.pop("summary_changes", None) or {}).items():
+        refresh_financial_summary(session.connection(), user_id, models)
+
+    for user_id in session.info.pop("asset_user_ids", None) or ():
+        record_asset_snapshot(session.connection(), user_id)
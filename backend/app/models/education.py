@@ -8,7 +8,7 @@ class Education(Base):
     __tablename__ = "educations"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     education_type = Column(String(50), nullable=False)  # 学費、塾、習い事など
     child_name = Column(String(100), nullable=False)
     amount = Column(Float, nullable=False)
@@ -8,7 +8,7 @@ class Expense(Base):
     __tablename__ = "expenses"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     expense_type = Column(String(50), nullable=False)  # 生活費、固定費、変動費など
     occurrence_type = Column(String(10), nullable=True)  # 頻度（年回数）
     category = Column(String(50), nullable=False)  # 食費、住居費、交通費など
@@ -20,7 +20,7 @@ class FamilyMember(Base):
     __tablename__ = "family_members"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     relationship_type = Column(String(50), nullable=False)  # 本人/配偶者/子供1/子供2/子供3/その他
     name = Column(String(100), nullable=True)
     gender = Column(String(20), nullable=False)  # 男/女/その他
@@ -0,0 +1,47 @@
+# 家計サマリーモデル
+# 初心者向け解説：ユーザーごとの合計値（資産合計・年収・年間支出など）を1行にまとめたテーブル
+#
+# なぜ必要なのか：
+# - 以前はダッシュボードを開くたびに、全カテゴリの行を読んで合計していた
+# - 書き込みのたびにこの1行を更新しておけば、読むときは1行取得するだけで済む
+#
+# 更新は app/models/data_version.py のフックが、元データの変更と同じトランザクションで行う
+# （ルーターやチャットから直接書き換えない）
+
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+class UserFinancialSummary(Base):
+    """ユーザーごとの家計サマリーテーブル（1ユーザー1行）"""
+    __tablename__ = "user_financial_summary"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    # === 資産 ===
+    total_assets = Column(Float, default=0, nullable=False)  # 資産合計
+    asset_count = Column(Integer, default=0, nullable=False)
+    
+    # === 収支（年額換算：月額の行は12倍） ===
+    annual_income = Column(Float, default=0, nullable=False)
+    income_count = Column(Integer, default=0, nullable=False)
+    annual_expense = Column(Float, default=0, nullable=False)
+    expense_count = Column(Integer, default=0, nullable=False)
+    annual_net_cashflow = Column(Float, default=0, nullable=False)  # 年収 - 年間支出
+    
+    # === 未来計画（登録金額の合計） ===
+    house_total = Column(Float, default=0, nullable=False)
+    house_count = Column(Integer, default=0, nullable=False)
+    housing_loan_balance = Column(Float, default=0, nullable=False)  # 購入済みローンの現在の残高
+    education_total = Column(Float, default=0, nullable=False)
+    education_count = Column(Integer, default=0, nullable=False)
+    career_count = Column(Integer, default=0, nullable=False)
+    risk_total = Column(Float, default=0, nullable=False)
+    risk_count = Column(Integer, default=0, nullable=False)
+    retirement_total = Column(Float, default=0, nullable=False)
+    retirement_count = Column(Integer, default=0, nullable=False)
+    family_count = Column(Integer, default=0, nullable=False)
+    
+    net_worth = Column(Float, default=0, nullable=False)  # 純資産 = 資産合計 - 住宅ローン残高
+    data_version = Column(Integer, default=0, nullable=False)  # 集計時点の users.data_version
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,11 +1,17 @@
 # 家モデル
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class House(Base):
     """住宅情報を管理するテーブル"""
     __tablename__ = "houses"
+    __table_args__ = (
+        # なぜ複合索引 (user_id, house_type)：
+        # - 家計サマリーの住宅ローン残高は「このユーザーの購入・ローンの行」だけを読む
+        # - 先頭が user_id なので、user_id だけの検索（一覧・シミュレーション）にも使える
+        Index("ix_houses_user_type", "user_id", "house_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
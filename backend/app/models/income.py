@@ -19,7 +19,7 @@ class Income(Base):
     __tablename__ = "incomes"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     income_type = Column(String(50), nullable=False)  # 月収、年収、ボーナス、副業など
     occurrence_type = Column(String(20), default="定期")  # 定期、一時
     amount = Column(Float, nullable=False)
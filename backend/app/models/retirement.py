@@ -8,7 +8,7 @@ class Retirement(Base):
     __tablename__ = "retirements"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     retirement_type = Column(String(50), nullable=False)  # 年金、貯蓄、退職金など
     name = Column(String(200), nullable=False)
     retirement_age = Column(Integer, nullable=True)  # 退職年齢
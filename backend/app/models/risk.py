@@ -8,7 +8,7 @@ class Risk(Base):
     __tablename__ = "risks"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # ユーザーごとの絞り込み用の索引
     risk_type = Column(String(50), nullable=False)  # 生命保険、医療保険、老後資金など
     name = Column(String(200), nullable=False)
     amount = Column(Float, nullable=False)
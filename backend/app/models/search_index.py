@@ -0,0 +1,106 @@
+# 全文検索用の索引定義
+# 初心者向け解説：チャット履歴と各カテゴリの備考（notes）を、キーワードで探せるようにする索引
+#
+# データベースごとの仕組み：
+# - MySQL ：FULLTEXT 索引（ngram パーサー）
+#            日本語は単語の区切りにスペースがないので、2文字ずつに区切って索引にする
+#            ただし chat_messages は月別パーティション表で FULLTEXT が使えないので対象外
+#            （期間を絞った部分一致で検索する。app/services/search.py）
+# - SQLite：FTS5 の仮想テーブル search_index（trigram トークナイザー）
+#            ローカル開発・テスト用。元テーブルのトリガーで自動的に同期する
+#
+# どちらも Alembic のマイグレーション（migrations/versions/0006_add_fulltext_search.py）で作られる。
+# create_all（DB_CREATE_ALL_ON_STARTUP=true の時）でも同じものが作られる
+
+from sqlalchemy import DDL, Index, event
+
+from app.database import Base
+from app.models.asset import Asset
+from app.models.career import Career
+from app.models.chat import ChatMessage
+from app.models.education import Education
+from app.models.expense import Expense
+from app.models.family import FamilyMember
+from app.models.house import House
+from app.models.income import Income
+from app.models.retirement import Retirement
+from app.models.risk import Risk
+
+# 検索対象：検索結果の種類名 → (モデル, 見出しに使う列, 本文の列)
+SEARCH_SOURCES = {
+    "chat": (ChatMessage, "message", ("message", "response")),
+    "asset": (Asset, "name", ("notes",)),
+    "income": (Income, "income_type", ("notes",)),
+    "expense": (Expense, "category", ("notes",)),
+    "house": (House, "name", ("notes",)),
+    "education": (Education, "child_name", ("notes",)),
+    "career": (Career, "description", ("notes",)),
+    "risk": (Risk, "name", ("notes",)),
+    "retirement": (Retirement, "name", ("notes",)),
+    "family": (FamilyMember, "relationship_type", ("notes",)),
+}
+
+
+# === MySQL：FULLTEXT（ngram）索引 ===
+# なぜ ddl_if：SQLite では FULLTEXT が使えないので、MySQL の時だけ作る
+MYSQL_FULLTEXT_SOURCES = [source for source in SEARCH_SOURCES if source != "chat"]
+
+for _source in MYSQL_FULLTEXT_SOURCES:
+    _model, _title, _columns = SEARCH_SOURCES[_source]
+    Index(
+        f"ft_{_model.__tablename__}_{'_'.join(_columns)}",
+        *[getattr(_model, column) for column in _columns],
+        mysql_prefix="FULLTEXT",
+        mysql_with_parser="ngram",
+    ).ddl_if(dialect="mysql")
+
+
+# === SQLite：FTS5 仮想テーブル + 同期トリガー ===
+
+def _body_sql(prefix: str, columns) -> str:
+    """トリガー内で本文を組み立てるSQL（複数列はスペースでつなぐ）"""
+    return " || ' ' || ".join(f"COALESCE({prefix}.{column}, '')" for column in columns)
+
+
+def sqlite_search_statements():
+    """FTS5 テーブル・トリガー・初回の取り込みのSQL（マイグレーションからも使う）"""
+    statements = [
+        # source / row_id / user_id / title は検索対象外（UNINDEXED）。本文 body だけを索引にする
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "source UNINDEXED, row_id UNINDEXED, user_id UNINDEXED, title UNINDEXED, body, "
+        "tokenize='trigram')"
+    ]
+    backfill = []
+    for source, (model, title, columns) in SEARCH_SOURCES.items():
+        table = model.__tablename__
+        condition = " OR ".join(f"{{p}}.{column} IS NOT NULL" for column in columns)
+        insert = (
+            "INSERT INTO search_index(source, row_id, user_id, title, body) "
+            f"VALUES ('{source}', NEW.id, NEW.user_id, NEW.{title}, {_body_sql('NEW', columns)});"
+        )
+        remove = f"DELETE FROM search_index WHERE source = '{source}' AND row_id = OLD.id;"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} "
+            f"WHEN {condition.format(p='NEW')} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE ON {table} "
+            f"BEGIN {remove} INSERT INTO search_index(source, row_id, user_id, title, body) "
+            f"SELECT '{source}', NEW.id, NEW.user_id, NEW.{title}, {_body_sql('NEW', columns)} "
+            f"WHERE {condition.format(p='NEW')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} "
+            f"BEGIN {remove} END",
+        ]
+        backfill.append(
+            f"SELECT '{source}', id, user_id, {title}, {_body_sql(table, columns)} "
+            f"FROM {table} WHERE {condition.format(p=table)}"
+        )
+    # 索引が空の時だけ、既存の行を取り込む（トリガーを作る前からあったデータ用）
+    statements.append(
+        "INSERT INTO search_index(source, row_id, user_id, title, body) "
+        "SELECT * FROM (" + " UNION ALL ".join(backfill) + ") "
+        "WHERE NOT EXISTS (SELECT 1 FROM search_index)"
+    )
+    return statements
+
+
+for _statement in sqlite_search_statements():
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,31 @@
+# シミュレーション結果モデル
+# 初心者向け解説：夜間バッチで事前計算したキャッシュフローを保存するテーブル
+#
+# なぜ必要なのか：
+# - ダッシュボードは朝にまとめて見られるが、データが最後に変わったのは数日前のことが多い
+# - 事前に計算しておけば、表示時はこのテーブルを読むだけで済む
+#
+# 結果が使えるのは次の条件を満たすときだけ：
+# - data_version がユーザーの現在の data_version と一致（入力が変わっていない）
+# - base_year が今年と一致（年齢・開始年がずれていない）
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+class SimulationResult(Base):
+    """事前計算済みのシミュレーション結果テーブル"""
+    __tablename__ = "simulation_results"
+    __table_args__ = (
+        # 1ユーザー・1条件（年数 × 計算モード）につき1行
+        UniqueConstraint("user_id", "years", "resolution", name="uq_simulation_results_user_params"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    years = Column(Integer, nullable=False)  # シミュレーション年数
+    resolution = Column(String(10), nullable=False)  # yearly / monthly
+    data_version = Column(Integer, nullable=False)  # 計算に使った入力のバージョン
+    base_year = Column(Integer, nullable=False)  # 計算の開始年
+    result = Column(JSON, nullable=False)  # 年ごとの系列 + 初期資産などの付随情報
+    computed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,7 +1,7 @@
 # ユーザーモデル（データベーステーブル定義）
 # 初心者向け解説：MySQLの users テーブルの設計図です
 
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -43,6 +43,11 @@ class User(Base):
     )
     # onupdate：更新時に自動で現在時刻
     
+    data_version = Column(Integer, default=0, server_default=text("0"), nullable=False)
+    # シミュレーションの入力（収入・支出・資産など）が変わるたびに +1 される
+    # なぜ必要：夜間バッチが「前回の計算から変わったユーザー」だけを再計算するため
+    # 更新は app/models/data_version.py のフックが自動で行う
+    
     # === リレーション定義 ===
     # なぜ relationship を使うのか：
     # - user.assets でユーザーの全資産を取得できる
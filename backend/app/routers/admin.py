@@ -0,0 +1,58 @@
+# 管理者用ルーター
+# 初心者向け解説：運用・調査のためのエンドポイント（settings.ADMIN_EMAILS のユーザーだけ使える）
+
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.models.user import User
+from app.services.llm import llm_metrics
+from app.services.profiling import list_profiles, read_profile
+from app.utils.security import get_current_admin
+
+router = APIRouter()
+
+
+@router.get("/llm-stats")
+async def get_llm_stats(admin: User = Depends(get_current_admin)) -> Dict:
+    """
+    LLM（Gemini）呼び出しの集計
+    
+    operations は合計時間の長い順。operation（呼び出し元）ごとに：
+    - calls / fallbacks / errors：成功・失敗・拒否・予備の処理の回数、失敗した例外の種類
+    - latency_*：応答時間（p50 / p95 は直近500回から）
+    - prompt_chars_* / prompt_tokens_* / response_tokens_total：プロンプトの大きさとトークン数
+    - parse：応答から JSON を取り出せたか（ok / empty / error）
+    
+    注意：値はこのプロセスの分だけ（ワーカーが複数ならワーカーごと）
+    """
+    return llm_metrics.snapshot()
+
+
+@router.get("/profiles")
+async def get_profiles(admin: User = Depends(get_current_admin)) -> List[Dict]:
+    """
+    保存したプロファイルの一覧（新しい順）
+    
+    プロファイルは /api/simulation/* と /api/chat/* に ?profile=1 を付けると保存される
+    （app/services/profiling.py）
+    """
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, admin: User = Depends(get_current_admin)):
+    """
+    プロファイルをダウンロード（folded stacks 形式）
+    
+    使い方例：flamegraph.pl profile.folded > profile.svg
+             または https://www.speedscope.app/ に読み込む
+    """
+    profile = read_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="プロファイルが見つかりません"
+        )
+    return profile
@@ -1,14 +1,16 @@
 # 資産管理ルーター
 # 初心者向け解説：資産のCRUD（作成・読取・更新・削除）
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
 from app.models.asset import Asset
-from app.schemas.asset import AssetCreate, AssetUpdate, AssetResponse
+from app.schemas.asset import AssetCreate, AssetUpdate, AssetResponse, AssetHistoryResponse
+from app.services.asset_history import get_asset_history
 from app.utils.security import get_current_user
 
 router = APIRouter()
@@ -32,6 +34,33 @@ async def get_assets(
     assets = db.query(Asset).filter(Asset.user_id == current_user.id).all()
     return assets
 
+@router.get("/history", response_model=AssetHistoryResponse)
+async def get_asset_history_chart(
+    start: Optional[date] = Query(None, description="開始日（省略時は1年前）"),
+    end: Optional[date] = Query(None, description="終了日（省略時は今日）"),
+    bucket: Optional[str] = Query(None, pattern="^(day|week|month)$", description="粒度（省略時は期間から自動）"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    資産推移（純資産グラフ用）を取得
+    
+    初心者向け解説：
+    - asset_snapshots から期間内の行だけを読み、日・週・月ごとに1点へまとめて返す
+    - 各点の値は、その期間の最後に記録された資産合計（期末残高）
+    
+    注目ポイント：
+    - "/{asset_id}" より前に定義する（後だと "history" が asset_id として解釈される）
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=365)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日は終了日より前にしてください"
+        )
+    return get_asset_history(db, current_user.id, start, end, bucket)
+
 @router.get("/{asset_id}", response_model=AssetResponse)
 async def get_asset(
     asset_id: int,
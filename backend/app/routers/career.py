@@ -6,31 +6,24 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.career import Career
+from app.schemas.career import CareerResponse
 from app.utils.security import get_current_user
+from app.utils.query import load_response_columns
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[CareerResponse])
 async def get_careers(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """ユーザーのキャリア設計情報一覧を取得"""
-    careers = db.query(Career).filter(Career.user_id == current_user.id).all()
-    return [{
-        "id": c.id,
-        "career_type": c.career_type,
-        "description": c.description,
-        "expected_income": c.expected_income,
-        "currency": c.currency,
-        "target_date": str(c.target_date) if c.target_date else None,
-        "notes": c.notes,
-        "timeline": c.timeline if hasattr(c, 'timeline') else None,
-        "event_year": c.event_year if hasattr(c, 'event_year') else None,
-        "salary_increase_rate": c.salary_increase_rate if hasattr(c, 'salary_increase_rate') else None
-    } for c in careers]
+    careers = db.query(Career).options(
+        load_response_columns(Career, CareerResponse)
+    ).filter(Career.user_id == current_user.id).all()
+    return careers
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=CareerResponse, status_code=status.HTTP_201_CREATED)
 async def create_career(
     career_data: dict,
     current_user: User = Depends(get_current_user),
@@ -53,20 +46,9 @@ async def create_career(
     db.commit()
     db.refresh(db_career)
     
-    return {
-        "id": db_career.id,
-        "career_type": db_career.career_type,
-        "description": db_career.description,
-        "expected_income": db_career.expected_income,
-        "currency": db_career.currency,
-        "target_date": str(db_career.target_date) if db_career.target_date else None,
-        "notes": db_career.notes,
-        "timeline": db_career.timeline if hasattr(db_career, 'timeline') else None,
-        "event_year": db_career.event_year if hasattr(db_career, 'event_year') else None,
-        "salary_increase_rate": db_career.salary_increase_rate if hasattr(db_career, 'salary_increase_rate') else None
-    }
+    return db_career
 
-@router.put("/{career_id}")
+@router.put("/{career_id}", response_model=CareerResponse)
 async def update_career(
     career_id: int,
     career_data: dict,
@@ -92,18 +74,7 @@ async def update_career(
     db.commit()
     db.refresh(db_career)
     
-    return {
-        "id": db_career.id,
-        "career_type": db_career.career_type,
-        "description": db_career.description,
-        "expected_income": db_career.expected_income,
-        "currency": db_career.currency,
-        "target_date": str(db_career.target_date) if db_career.target_date else None,
-        "notes": db_career.notes,
-        "timeline": db_career.timeline if hasattr(db_career, 'timeline') else None,
-        "event_year": db_career.event_year if hasattr(db_career, 'event_year') else None,
-        "salary_increase_rate": db_career.salary_increase_rate if hasattr(db_career, 'salary_increase_rate') else None
-    }
+    return db_career
 
 @router.delete("/{career_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_career(
@@ -1,9 +1,10 @@
 # チャットルーター - 全カテゴリ自動振り分け対応
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.chat import ChatMessage
 from app.models.asset import Asset
@@ -14,15 +15,22 @@ from app.models.education import Education
 from app.models.career import Career
 from app.models.risk import Risk
 from app.models.retirement import Retirement
-from app.schemas.chat import ChatMessageCreate, ChatMessageResponse
+from app.schemas.chat import ChatMessageCreate, ChatMessageResponse, ChatHistoryPage
 from app.utils.security import get_current_user
 from app.services.gemini_service import GeminiService
+from app.services.financial_summary import get_financial_summary
+from app.services.chat_archive import ArchiveReader
+from app.services.chat_history import fetch_history_page
+from app.services.chat_memory import load_memory, update_memory
+from app.services.reference_data import EDUCATION_COSTS
+from app.utils.pagination import decode_cursor
 
 router = APIRouter()
 
 @router.post("/", response_model=ChatMessageResponse, status_code=status.HTTP_201_CREATED)
 async def send_message(
     message_data: ChatMessageCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -125,47 +133,34 @@ async def send_message(
                 current_year = datetime.now().year
                 birth_year = current_year - child_age
                 
-                # 費用マスタデータ
-                cost_data = {
-                    'nursery': {'public': 450000, 'private': 800000, 'start_age': 0, 'duration': 6},
-                    'kindergarten': {'public': 220000, 'private': 530000, 'start_age': 3, 'duration': 3},
-                    'elementary': {'public': 320000, 'private': 1600000, 'start_age': 6, 'duration': 6},
-                    'junior_high': {'public': 490000, 'private': 1410000, 'start_age': 12, 'duration': 3},
-                    'high_school': {'public': 460000, 'private': 970000, 'start_age': 15, 'duration': 3},
-                    'university': {'public': 540000, 'private': 1350000, 'start_age': 18, 'duration': 4},
-                    'graduate_school': {'public': 540000, 'private': 1150000, 'start_age': 22, 'duration': 2}
-                }
-                
                 # 各学校段階を追加（まだ卒業していない段階、schoolsの指定に従う）
-                for school_type, data in cost_data.items():
-                    # 卒業年齢 = 入学年齢 + 期間 - 1
-                    end_age = data['start_age'] + data['duration'] - 1
-                    
+                # 費用は教育費マスタ（app/services/reference_data.py。起動時に1回だけ作る表）
+                for stage in EDUCATION_COSTS:
                     # 現在の年齢が卒業年齢以下の場合のみ追加（まだ卒業していない）
-                    if child_age <= end_age:
+                    if child_age <= stage.end_age:
                         # schoolsオブジェクトから該当学校の設定を取得
-                        school_setting = schools.get(school_type, 'none')
+                        school_setting = schools.get(stage.school_type, 'none')
                         
                         # "none"の場合はスキップ
                         if school_setting == 'none':
                             continue
                         
                         is_private = (school_setting == 'private')
-                        start_year = birth_year + data['start_age']
-                        end_year = start_year + data['duration'] - 1
-                        annual_cost = data['private'] if is_private else data['public']
+                        start_year = birth_year + stage.start_age
+                        end_year = start_year + stage.duration - 1
+                        annual_cost = stage.annual_cost(is_private)
                         
                         db.add(Education(
                             user_id=current_user.id,
                             education_type='planned',
                             child_name=child_name,
                             child_age=child_age,
-                            school_type=school_type,
+                            school_type=stage.school_type,
                             is_private=is_private,
                             start_year=start_year,
                             end_year=end_year,
                             annual_cost=annual_cost,
-                            amount=annual_cost * data['duration'],
+                            amount=annual_cost * stage.duration,
                             currency='JPY',
                             start_date=datetime.now().date(),
                             notes=f"AIチャットから自動追加: {message_data.message}"
@@ -246,15 +241,94 @@ async def send_message(
     # シンプルな確認メッセージのみ
     if added_items:
         ai_response = f"✅ 以下の情報を登録しました: {', '.join(added_items)}"
+        # 登録後の合計はサマリーの1行から取得（コミット時にフックで更新済み）
+        summary = get_financial_summary(db, current_user.id)
+        ai_response += (
+            f"\n現在の資産合計: {summary.total_assets:,.0f}円"
+            f" / 年間収支: {summary.annual_net_cashflow:,.0f}円"
+        )
     else:
-        ai_response = "情報を確認しましたが、登録できる項目がありませんでした。"
+        # 登録する情報がない → 相談・質問として、会話メモリー（要約 + 直近のターン）付きで回答
+        # 資産の情報は家計サマリーの1行から（資産を全件読まない）
+        summary = get_financial_summary(db, current_user.id)
+        memory = load_memory(db, current_user.id)
+        ai_response = await GeminiService.generate_response(
+            message_data.message,
+            summary,
+            memory_summary=memory.summary,
+            recent_turns=memory.turns
+        )
     
     db_chat = ChatMessage(user_id=current_user.id, message=message_data.message, response=ai_response)
     db.add(db_chat)
     db.commit()
     db.refresh(db_chat)
+    # 直近のターンがあふれていたら、応答を返した後で要約に取り込む
+    background_tasks.add_task(update_memory, current_user.id)
     return db_chat
 
-@router.get("/history", response_model=List[ChatMessageResponse])
-async def get_chat_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db), limit: int = 50):
-    return db.query(ChatMessage).filter(ChatMessage.user_id == current_user.id).order_by(ChatMessage.created_at.desc()).limit(limit).all()
+@router.get("/history", response_model=ChatHistoryPage)
+async def get_chat_history(
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="前のページの next_cursor（省略時は最新から）"),
+    include_response: bool = Query(True, description="false にすると AI の応答本文を省略（一覧表示用）"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    チャット履歴を新しい順に1ページ取得
+
+    続きは next_cursor を before に渡して取得する（何ページ目でも速さは同じ）
+    """
+    return fetch_history_page(db, current_user.id, limit, _parse_cursor(before), include_response)
+
+@router.get("/history/stream")
+async def stream_chat_history(
+    page_size: int = Query(100, ge=1, le=500),
+    max_pages: int = Query(10, ge=1, le=100),
+    before: Optional[str] = Query(None, description="このカーソルより古い履歴から流す"),
+    include_response: bool = Query(False, description="AI の応答本文も含めるか"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    古い履歴をページ単位で連続して返す（NDJSON：1行 = 1ページ）
+
+    初心者向け解説：
+    - 全部そろうのを待たずに、読めたページから順にクライアントへ送る
+    - 各行は GET /history と同じ形（items / next_cursor / has_more）
+    - max_pages に達したら、最後の行の next_cursor から続きを頼める
+    """
+    cursor = _parse_cursor(before)
+    user_id = current_user.id
+
+    def generate():
+        # なぜ新しいセッション：レスポンスを流している間は、依存性注入のセッションが閉じている場合がある
+        db = SessionLocal()
+        # アーカイブはリクエスト全体で1回のクエリで読み進める（ページごとに読み直さない）
+        archive_reader = ArchiveReader(db, user_id, page_size * max_pages + 1, include_response)
+        try:
+            nonlocal cursor
+            for _ in range(max_pages):
+                page = fetch_history_page(db, user_id, page_size, cursor, include_response, archive_reader)
+                yield ChatHistoryPage.model_validate(page).model_dump_json() + "\n"
+                if not page["has_more"]:
+                    break
+                last = page["items"][-1]
+                cursor = (last.created_at, last.id)
+        finally:
+            archive_reader.close()
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+def _parse_cursor(cursor: Optional[str]):
+    """クエリ文字列のカーソルを (created_at, id) に変換（不正なら 400）"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カーソルが不正です"
+        )
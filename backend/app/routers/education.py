@@ -8,34 +8,22 @@ from app.models.user import User
 from app.models.education import Education
 from app.schemas.education import EducationCreate, EducationUpdate, EducationResponse
 from app.utils.security import get_current_user
+from app.utils.query import load_response_columns
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[EducationResponse])
 async def get_educations(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """ユーザーの教育費情報一覧を取得"""
-    educations = db.query(Education).filter(Education.user_id == current_user.id).all()
-    return [{
-        "id": e.id,
-        "education_type": e.education_type,
-        "child_name": e.child_name,
-        "child_age": e.child_age,
-        "school_type": e.school_type,
-        "is_private": bool(e.is_private) if e.is_private is not None else False,
-        "start_year": e.start_year,
-        "end_year": e.end_year,
-        "annual_cost": float(e.annual_cost) if e.annual_cost else None,
-        "amount": e.amount,
-        "currency": e.currency,
-        "start_date": str(e.start_date) if e.start_date else None,
-        "notes": e.notes,
-        "timeline": e.timeline
-    } for e in educations]
+    educations = db.query(Education).options(
+        load_response_columns(Education, EducationResponse)
+    ).filter(Education.user_id == current_user.id).all()
+    return educations
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=EducationResponse, status_code=status.HTTP_201_CREATED)
 async def create_education(
     education_data: dict,
     current_user: User = Depends(get_current_user),
@@ -63,24 +51,9 @@ async def create_education(
     db.commit()
     db.refresh(db_education)
     
-    return {
-        "id": db_education.id,
-        "education_type": db_education.education_type,
-        "child_name": db_education.child_name,
-        "child_age": db_education.child_age,
-        "school_type": db_education.school_type,
-        "is_private": bool(db_education.is_private),
-        "start_year": db_education.start_year,
-        "end_year": db_education.end_year,
-        "annual_cost": float(db_education.annual_cost) if db_education.annual_cost else None,
-        "amount": db_education.amount,
-        "currency": db_education.currency,
-        "start_date": str(db_education.start_date) if db_education.start_date else None,
-        "notes": db_education.notes,
-        "timeline": db_education.timeline
-    }
+    return db_education
 
-@router.put("/{education_id}")
+@router.put("/{education_id}", response_model=EducationResponse)
 async def update_education(
     education_id: int,
     education_data: dict,
@@ -123,22 +96,7 @@ async def update_education(
     db.commit()
     db.refresh(db_education)
     
-    return {
-        "id": db_education.id,
-        "education_type": db_education.education_type,
-        "child_name": db_education.child_name,
-        "child_age": db_education.child_age,
-        "school_type": db_education.school_type,
-        "is_private": bool(db_education.is_private),
-        "start_year": db_education.start_year,
-        "end_year": db_education.end_year,
-        "annual_cost": float(db_education.annual_cost) if db_education.annual_cost else None,
-        "amount": db_education.amount,
-        "currency": db_education.currency,
-        "start_date": str(db_education.start_date) if db_education.start_date else None,
-        "notes": db_education.notes,
-        "timeline": db_education.timeline
-    }
+    return db_education
 
 @router.delete("/{education_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_education(
@@ -6,33 +6,24 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.house import House
+from app.schemas.house import HouseResponse
 from app.utils.security import get_current_user
+from app.utils.query import load_response_columns
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[HouseResponse])
 async def get_houses(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """ユーザーの住宅情報一覧を取得"""
-    houses = db.query(House).filter(House.user_id == current_user.id).all()
-    return [{
-        "id": h.id,
-        "house_type": h.house_type,
-        "name": h.name,
-        "amount": h.amount,
-        "currency": h.currency,
-        "start_date": str(h.start_date) if h.start_date else None,
-        "notes": h.notes,
-        "timeline": h.timeline,
-        "purchase_year": h.purchase_year,
-        "loan_term": h.loan_term,
-        "loan_rate": float(h.loan_rate) if h.loan_rate else None,
-        "down_payment": float(h.down_payment) if h.down_payment else None
-    } for h in houses]
+    houses = db.query(House).options(
+        load_response_columns(House, HouseResponse)
+    ).filter(House.user_id == current_user.id).all()
+    return houses
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=HouseResponse, status_code=status.HTTP_201_CREATED)
 async def create_house(
     house_data: dict,
     current_user: User = Depends(get_current_user),
@@ -57,22 +48,9 @@ async def create_house(
     db.commit()
     db.refresh(db_house)
     
-    return {
-        "id": db_house.id,
-        "house_type": db_house.house_type,
-        "name": db_house.name,
-        "amount": db_house.amount,
-        "currency": db_house.currency,
-        "start_date": str(db_house.start_date) if db_house.start_date else None,
-        "notes": db_house.notes,
-        "timeline": db_house.timeline,
-        "purchase_year": db_house.purchase_year,
-        "loan_term": db_house.loan_term,
-        "loan_rate": float(db_house.loan_rate) if db_house.loan_rate else None,
-        "down_payment": float(db_house.down_payment) if db_house.down_payment else None
-    }
+    return db_house
 
-@router.put("/{house_id}")
+@router.put("/{house_id}", response_model=HouseResponse)
 async def update_house(
     house_id: int,
     house_data: dict,
@@ -98,20 +76,7 @@ async def update_house(
     db.commit()
     db.refresh(db_house)
     
-    return {
-        "id": db_house.id,
-        "house_type": db_house.house_type,
-        "name": db_house.name,
-        "amount": db_house.amount,
-        "currency": db_house.currency,
-        "start_date": str(db_house.start_date) if db_house.start_date else None,
-        "notes": db_house.notes,
-        "timeline": db_house.timeline,
-        "purchase_year": db_house.purchase_year,
-        "loan_term": db_house.loan_term,
-        "loan_rate": float(db_house.loan_rate) if db_house.loan_rate else None,
-        "down_payment": float(db_house.down_payment) if db_house.down_payment else None
-    }
+    return db_house
 
 @router.delete("/{house_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_house(
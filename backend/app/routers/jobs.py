@@ -0,0 +1,83 @@
+# バックグラウンドジョブ API
+# 初心者向け解説：重い処理（AI分析など）を登録して、あとから結果を取りに来るためのAPI
+#
+# 使い方の流れ：
+# 1. POST /api/jobs           → ジョブIDがすぐに返る（status: queued）
+# 2. GET  /api/jobs/{job_id}  → status と progress を確認（数秒おきにポーリング）
+# 3. status が succeeded になったら result を使う
+# 4. 不要になったら DELETE /api/jobs/{job_id} でキャンセル
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from app.models.user import User
+from app.schemas.job import JobCreate, JobResponse
+from app.services.job_queue import job_queue, JobLimitExceeded, UnknownJobType
+from app.utils.security import get_current_user
+from app.config import settings
+
+router = APIRouter()
+
+
+async def _get_own_job(job_id: str, current_user: User) -> dict:
+    """ジョブを取得（他人のジョブは存在しない扱いにする）"""
+    job = await job_queue.get(job_id)
+    if not job or job["user_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ジョブが見つかりません（期限切れの可能性があります）"
+        )
+    return job
+
+
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    ジョブを登録
+
+    なぜ 202 Accepted：受け付けただけで、処理はまだ終わっていないため
+    """
+    try:
+        job = await job_queue.submit(current_user.id, job_data.job_type, job_data.params)
+    except UnknownJobType:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不明なジョブ種別です（利用可能: {', '.join(job_queue.job_types)}）"
+        )
+    except JobLimitExceeded:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"同時に実行できるジョブは{settings.JOB_MAX_CONCURRENT_PER_USER}件までです"
+        )
+    return job
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(current_user: User = Depends(get_current_user)):
+    """自分のジョブ一覧を取得（新しい順、期限切れのものは含まない）"""
+    return await job_queue.list_for_user(current_user.id)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """ジョブの状態・進捗・結果を取得"""
+    return await _get_own_job(job_id, current_user)
+
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    ジョブをキャンセル
+
+    完了済みのジョブはそのままの状態を返す
+    """
+    await _get_own_job(job_id, current_user)
+    return await job_queue.cancel(job_id)
@@ -6,31 +6,24 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.retirement import Retirement
+from app.schemas.retirement import RetirementResponse
 from app.utils.security import get_current_user
+from app.utils.query import load_response_columns
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[RetirementResponse])
 async def get_retirements(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """ユーザーの老後計画情報一覧を取得"""
-    retirements = db.query(Retirement).filter(Retirement.user_id == current_user.id).all()
-    return [{
-        "id": r.id,
-        "retirement_type": r.retirement_type,
-        "name": r.name,
-        "retirement_age": r.retirement_age,
-        "monthly_amount": r.monthly_amount,
-        "total_amount": r.total_amount,
-        "amount": r.amount,
-        "currency": r.currency,
-        "start_date": str(r.start_date) if r.start_date else None,
-        "notes": r.notes
-    } for r in retirements]
+    retirements = db.query(Retirement).options(
+        load_response_columns(Retirement, RetirementResponse)
+    ).filter(Retirement.user_id == current_user.id).all()
+    return retirements
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=RetirementResponse, status_code=status.HTTP_201_CREATED)
 async def create_retirement(
     retirement_data: dict,
     current_user: User = Depends(get_current_user),
@@ -54,20 +47,9 @@ async def create_retirement(
     db.commit()
     db.refresh(db_retirement)
     
-    return {
-        "id": db_retirement.id,
-        "retirement_type": db_retirement.retirement_type,
-        "name": db_retirement.name,
-        "retirement_age": db_retirement.retirement_age,
-        "monthly_amount": db_retirement.monthly_amount,
-        "total_amount": db_retirement.total_amount,
-        "amount": db_retirement.amount,
-        "currency": db_retirement.currency,
-        "start_date": str(db_retirement.start_date) if db_retirement.start_date else None,
-        "notes": db_retirement.notes
-    }
+    return db_retirement
 
-@router.put("/{retirement_id}")
+@router.put("/{retirement_id}", response_model=RetirementResponse)
 async def update_retirement(
     retirement_id: int,
     retirement_data: dict,
@@ -96,18 +78,7 @@ async def update_retirement(
     db.commit()
     db.refresh(db_retirement)
     
-    return {
-        "id": db_retirement.id,
-        "retirement_type": db_retirement.retirement_type,
-        "name": db_retirement.name,
-        "retirement_age": db_retirement.retirement_age,
-        "monthly_amount": db_retirement.monthly_amount,
-        "total_amount": db_retirement.total_amount,
-        "amount": db_retirement.amount,
-        "currency": db_retirement.currency,
-        "start_date": str(db_retirement.start_date) if db_retirement.start_date else None,
-        "notes": db_retirement.notes
-    }
+    return db_retirement
 
 @router.delete("/{retirement_id}")
 async def delete_retirement(
@@ -6,20 +6,24 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.risk import Risk
+from app.schemas.risk import RiskResponse
 from app.utils.security import get_current_user
+from app.utils.query import load_response_columns
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[RiskResponse])
 async def get_risks(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """ユーザーのリスク管理情報一覧を取得"""
-    risks = db.query(Risk).filter(Risk.user_id == current_user.id).all()
-    return [{"id": r.id, "risk_type": r.risk_type, "name": r.name, "amount": r.amount, "currency": r.currency, "start_date": str(r.start_date) if r.start_date else None, "notes": r.notes} for r in risks]
+    risks = db.query(Risk).options(
+        load_response_columns(Risk, RiskResponse)
+    ).filter(Risk.user_id == current_user.id).all()
+    return risks
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=RiskResponse, status_code=status.HTTP_201_CREATED)
 async def create_risk(
     risk_data: dict,
     current_user: User = Depends(get_current_user),
@@ -39,9 +43,9 @@ async def create_risk(
     db.commit()
     db.refresh(db_risk)
     
-    return {"id": db_risk.id, "risk_type": db_risk.risk_type, "name": db_risk.name, "amount": db_risk.amount, "currency": db_risk.currency, "start_date": str(db_risk.start_date) if db_risk.start_date else None, "notes": db_risk.notes}
+    return db_risk
 
-@router.put("/{risk_id}")
+@router.put("/{risk_id}", response_model=RiskResponse)
 async def update_risk(
     risk_id: int,
     risk_data: dict,
@@ -67,7 +71,7 @@ async def update_risk(
     db.commit()
     db.refresh(db_risk)
     
-    return {"id": db_risk.id, "risk_type": db_risk.risk_type, "name": db_risk.name, "amount": db_risk.amount, "currency": db_risk.currency, "start_date": str(db_risk.start_date) if db_risk.start_date else None, "notes": db_risk.notes}
+    return db_risk
 
 @router.delete("/{risk_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_risk(
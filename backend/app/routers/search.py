@@ -0,0 +1,44 @@
+# 全文検索 API
+# 初心者向け解説：チャット履歴と各カテゴリの備考をまとめてキーワード検索するAPI
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models.user import User
+from app.schemas.search import SearchResponse
+from app.models.search_index import SEARCH_SOURCES
+from app.services.search import search
+from app.utils.security import get_current_user
+
+router = APIRouter()
+
+@router.get("", response_model=SearchResponse)
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=100, description="検索キーワード"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    source: Optional[List[str]] = Query(None, description="種類で絞り込み（chat, asset, income など。複数指定可）"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    チャット履歴と備考を全文検索（関連の強い順）
+
+    使用例：GET /api/search?q=住宅ローン&source=chat&source=house
+    """
+    q = q.strip()
+    if not q:
+        # 空白だけのキーワードは、空文字の部分一致（全件に一致）になってしまうので受け付けない
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="検索キーワードを入力してください"
+        )
+    unknown = [s for s in (source or []) if s not in SEARCH_SOURCES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不明な種類です: {', '.join(unknown)}（指定できるのは {', '.join(SEARCH_SOURCES)}）"
+        )
+    result = search(db, current_user.id, q, limit, offset, source)
+    return {"query": q, "limit": limit, "offset": offset, **result}
@@ -1,37 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.user import User
-from app.models.income import Income
-from app.models.expense import Expense
-from app.models.asset import Asset
-from app.models.house import House
-from app.models.education import Education
-from app.models.family import FamilyMember
-from app.models.career import Career
-from app.models.retirement import Retirement
 from app.routers.auth import get_current_user
-from app.services.gemini_service import GeminiService
-from datetime import datetime
-from typing import List, Dict
-import google.generativeai as genai
-from app.config import settings
+from app.services.compute_pool import run_cpu_bound
+from app.services.job_queue import job_queue, JobContext
+from app.services.simulation_inputs import load_simulation_inputs, simulate_payload
+from app.services.simulation_results import get_fresh_result
+from app.utils.downsample import downsample_series
+import copy
+import json
+from app.services import llm
+from typing import Dict, Optional
 
 router = APIRouter(prefix="/api/simulation", tags=["simulation"])
 
-# Gemini モデルの初期化
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel('models/gemini-flash-latest')
+# Gemini が使えない時に返す、定型のキャッシュフロー改善提案
+DEFAULT_AI_SUGGESTIONS = {
+    "summary": "現在の収支状況を分析中です。データを入力して最適な提案を受け取りましょう。",
+    "improvement_points": [
+        "収入と支出のバランスを定期的に見直しましょう",
+        "緊急時のための資金を確保しましょう",
+        "長期的な資産形成を計画しましょう"
+    ],
+    "action_items": [
+        "月次の家計簿を記録して支出を可視化する",
+        "収入の10-20%を貯蓄に回す",
+        "投資信託などの資産運用を検討する"
+    ],
+    "risk_alerts": [
+        "収入が途絶えた場合の備えを確認しましょう",
+        "ライフイベント（教育費、住宅購入等）に備えましょう"
+    ]
+}
+
+def ai_suggestion_inputs(result: Dict) -> Dict:
+    """シミュレーション結果（simulate_payload の戻り値）から AI 提案の入力を取り出す"""
+    annual_incomes = result["annual_income"]
+    annual_expenses = result["annual_expense"]
+    net_cashflows = result["net_cashflow"]
+    cumulative_assets_list = result["cumulative_assets"]
+    return {
+        "initial_assets": result["initial_assets"],
+        "annual_income": annual_incomes[0] if annual_incomes else 0,
+        "annual_expense": annual_expenses[0] if annual_expenses else 0,
+        "net_cashflow": net_cashflows[0] if net_cashflows else 0,
+        "final_assets": cumulative_assets_list[-1] if cumulative_assets_list else 0,
+        "family_count": result["family_count"],
+        "has_children": result["has_children"],
+    }
+
 
 @router.get("/cashflow")
 async def get_cashflow_simulation(
     years: int = 50,
+    max_points: Optional[int] = Query(None, ge=3, description="グラフ用に返す点数の上限（省略時は全点）"),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax)$", description="間引き方式"),
+    resolution: str = Query("yearly", pattern="^(yearly|monthly)$", description="計算の粒度（年次 / 月次）"),
+    include_ai: bool = Query(True, description="AI提案を同期的に生成するか"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     キャッシュフローシミュレーションを計算
     
+    Args:
+        years: シミュレーション年数
+        max_points: 指定すると、イベント年（住宅購入・定年など）を残したまま
+            この点数以下に間引いて返す（LTTB または min/max バケッティング）
+        downsample: 間引き方式（"lttb" / "minmax"）
+        resolution: "yearly"（年単位で計算）または "monthly"（月単位で計算して年に集計）
+        include_ai: false にすると AI 提案を待たずにすぐ返す（ai_suggestions は null）
+    
     Returns:
         years: 年のリスト
         annual_income: 年間収入のリスト
@@ -40,279 +80,51 @@ async def get_cashflow_simulation(
         cumulative_assets: 累積資産のリスト
     """
     
-    # 現在のデータを取得
-    incomes = db.query(Income).filter(Income.user_id == current_user.id).all()
-    expenses = db.query(Expense).filter(Expense.user_id == current_user.id).all()
-    assets = db.query(Asset).filter(Asset.user_id == current_user.id).all()
-    houses = db.query(House).filter(House.user_id == current_user.id).all()
-    educations = db.query(Education).filter(Education.user_id == current_user.id).all()
-    family_members = db.query(FamilyMember).filter(FamilyMember.user_id == current_user.id).all()
-    careers = db.query(Career).filter(Career.user_id == current_user.id).all()
-    retirements = db.query(Retirement).filter(Retirement.user_id == current_user.id).all()
-    
-    # 本人の年齢を取得
-    current_age = None
-    person = db.query(FamilyMember).filter(
-        FamilyMember.user_id == current_user.id,
-        FamilyMember.relationship_type == '本人'
-    ).first()
-    
-    if person and person.birth_date:
-        birth_year = person.birth_date.year
-        current_age = datetime.now().year - birth_year
-    
-    # 現在の年を取得
-    current_year = datetime.now().year
-    
-    # 初期資産合計を計算
-    initial_assets = sum(asset.amount for asset in assets)
-    
-    # キャリア設計からベース設定を取得（localStorage相当）
-    base_income = 5000000  # デフォルト
-    base_increase_rate = 2  # デフォルト
-    retirement_age = 65  # デフォルト
-    
-    # 収入ページから現在の年収を取得
-    for income in incomes:
-        if income.income_type in ['月収', '月給']:
-            base_income = income.amount * 12
-            break
-        elif income.income_type in ['年収', '年俸']:
-            base_income = income.amount
-            break
-    
-    # 副業収入を計算
-    side_job_income = 0
-    for income in incomes:
-        if '副業' in income.income_type or '副収入' in income.income_type:
-            if income.occurrence_type in ['月収', '12']:
-                side_job_income += income.amount * 12
-            else:
-                side_job_income += income.amount
-    
-    # キャリアイベントから副業開始を加算
-    for career in careers:
-        if ('副業' in career.career_type) and career.expected_income:
-            if not career.event_year or career.event_year <= current_year:
-                side_job_income += career.expected_income
-    
-    # キャリアイベントを年でソート
-    sorted_careers = sorted([c for c in careers if c.event_year], key=lambda x: x.event_year)
-    
-    # 年間支出を計算
-    annual_expense_base = 0
-    for expense in expenses:
-        if expense.occurrence_type in ['月収', '12']:
-            annual_expense_base += expense.amount * 12
-        else:
-            annual_expense_base += expense.amount
-    
-    print(f"[DEBUG] 支出合計: {annual_expense_base:,.0f}円")
-    
-    # 家賃・住宅ローン（年次計算はループ内で実施）
-    # ここでは初期値のみ設定
-    print(f"[DEBUG] 住宅データ件数: {len(houses)}")
-    for house in houses:
-        print(f"[DEBUG] 住宅: {house.house_type}, 月額: {house.amount:,.0f}円, 購入年: {house.purchase_year}, ローン期間: {house.loan_term}年")
-    
-    # 住宅ローン残高を管理（各住宅のローン残高を追跡）
-    loan_balances = {}  # {house_id: balance}
-    
-    # シミュレーション結果を格納
-    simulation_years = []
-    annual_incomes = []
-    annual_expenses = []
-    net_cashflows = []
-    cumulative_assets_list = []
-    
-    cumulative_assets = initial_assets
-    
-    for year in range(years + 1):
-        target_year = current_year + year
-        target_age = current_age + year if current_age else None
-        simulation_years.append(target_year)
-        
-        # === 収入計算（キャリア設計 + 老後設計） ===
-        year_income = 0
-        
-        # 定年前：キャリア設計の総年収（本業 + 副業）
-        if target_age and target_age < retirement_age:
-            # その年のキャリアイベントを探す
-            event = next((c for c in sorted_careers if c.event_year == target_year), None)
-            
-            if year == 0:
-                # 初年度は現在の年収
-                year_income = base_income + side_job_income
-            elif event:
-                # イベントがある年は予想収入を使用
-                year_income = (event.expected_income or 0) + side_job_income
-            else:
-                # イベントがない年は前年から昇給率で計算
-                prev_income = annual_incomes[-1] if annual_incomes else base_income
-                # 適用される昇給率を取得
-                applicable_rate = base_increase_rate
-                prev_events = [c for c in sorted_careers if c.event_year and c.event_year < target_year]
-                if prev_events:
-                    latest_event = prev_events[-1]
-                    if latest_event.salary_increase_rate is not None:
-                        applicable_rate = latest_event.salary_increase_rate
-                
-                # 本業収入のみ昇給を適用、副業収入は固定
-                prev_main_income = prev_income - side_job_income
-                year_income = prev_main_income * (1 + applicable_rate / 100) + side_job_income
-        
-        # 定年後：老後設計（年金など）
-        else:
-            for retirement in retirements:
-                # 各老後資金の開始年齢を取得（デフォルト65歳）
-                ret_start_age = retirement.retirement_age if retirement.retirement_age else retirement_age
-                
-                # retirement_typeに基づいた処理
-                if retirement.retirement_type == '年金':
-                    # 年金は開始年齢以降、毎年継続的に受け取る
-                    if target_age and target_age >= ret_start_age and retirement.monthly_amount:
-                        year_income += retirement.monthly_amount * 12
-                elif retirement.retirement_type == '一時金（退職金など）':
-                    # 一時金は開始年齢に達した年のみ
-                    if target_age == ret_start_age:
-                        if retirement.total_amount:
-                            year_income += retirement.total_amount
-                        elif retirement.monthly_amount:
-                            year_income += retirement.monthly_amount * 12
-                else:  # 'その他'
-                    # その他は開始年齢以降、継続的な収入として扱う
-                    if target_age and target_age >= ret_start_age:
-                        if retirement.monthly_amount:
-                            year_income += retirement.monthly_amount * 12
-                        elif retirement.total_amount:
-                            year_income += retirement.total_amount
-        
-        # === 支出計算（支出 + 住宅 + 教育） ===
-        year_expense = annual_expense_base
-        
-        # 住宅費用を年次で計算（購入年とローン期間を考慮）
-        annual_housing_cost = 0
-        loan_principal_payments = 0  # 元金返済額の合計（資産増加分）
-        loan_new_debt = 0  # 新規ローン借入額（負債増加）
-        
-        for house in houses:
-            # 賃貸は常に計算
-            if house.house_type in ['賃貸', '家賃']:
-                annual_housing_cost += house.amount * 12
-            
-            # 住宅ローンは負債として扱う
-            elif house.house_type in ['住宅ローン', 'マンションローン', '購入', '新築マンション']:
-                if house.purchase_year and house.loan_term and house.amount:
-                    # amountが購入価格の場合
-                    purchase_price = house.amount
-                    down_payment = house.down_payment or 0
-                    loan_amount = purchase_price - down_payment  # ローン元金
-                    
-                    # 金利を考慮した月々返済額を計算（元利均等返済）
-                    if house.loan_rate and house.loan_rate > 0:
-                        annual_rate = house.loan_rate / 100  # %を小数に変換
-                        monthly_rate = annual_rate / 12
-                        num_payments = house.loan_term * 12
-                        
-                        # 元利均等返済の計算式
-                        # 月々返済額 = ローン元金 × (月利 × (1 + 月利)^返済回数) / ((1 + 月利)^返済回数 - 1)
-                        monthly_payment = loan_amount * (monthly_rate * (1 + monthly_rate) ** num_payments) / ((1 + monthly_rate) ** num_payments - 1)
-                        annual_payment = monthly_payment * 12
-                        total_repayment = monthly_payment * num_payments  # 返済総額（元金+利息）
-                    else:
-                        # 金利0%の場合は単純計算
-                        monthly_payment = loan_amount / (house.loan_term * 12)
-                        annual_payment = monthly_payment * 12
-                        total_repayment = loan_amount
-                    
-                    # 購入年の処理
-                    if target_year == house.purchase_year:
-                        # 頭金を支出
-                        if house.down_payment:
-                            annual_housing_cost += house.down_payment
-                        
-                        # 返済総額（元金+利息）を負債として記録
-                        loan_balances[house.id] = total_repayment
-                        
-                        # 返済総額を負債として記録（後で累積資産から引く）
-                        loan_new_debt += total_repayment
-                        
-                        print(f"[DEBUG] {target_year}年 住宅購入: 購入価格={purchase_price:,.0f}円, 頭金={down_payment:,.0f}円, ローン元金={loan_amount:,.0f}円, 返済総額={total_repayment:,.0f}円, 年間返済額={annual_payment:,.0f}円")
-                    
-                    # 返済期間の処理（購入年も含む）
-                    if house.purchase_year <= target_year < house.purchase_year + house.loan_term:
-                        # 購入年は返済額を支出に含めない（既に頭金で支出済み）
-                        if target_year != house.purchase_year:
-                            annual_housing_cost += annual_payment
-                        
-                        # 年間返済額がそのまま資産増加（負債減少）となる
-                        loan_principal_payments += annual_payment
-                        
-                        # ローン残高を減らす
-                        if house.id in loan_balances:
-                            loan_balances[house.id] -= annual_payment
-                            if target_year == house.purchase_year or (target_year - house.purchase_year) % 5 == 0:
-                                print(f"[DEBUG] {target_year}年 ローン返済: 年間返済額={annual_payment:,.0f}円, 残高={loan_balances[house.id]:,.0f}円")
-                else:
-                    # 購入年やローン期間が未設定の場合は従来通り支出として計算
-                    annual_housing_cost += house.amount * 12
-        
-        year_expense += annual_housing_cost
-        
-        # 教育費を年次で計算（開始年と終了年を考慮）
-        education_cost = 0
-        for education in educations:
-            if education.amount:
-                # start_year と end_year が設定されている場合
-                if education.start_year and education.end_year:
-                    if education.start_year <= target_year <= education.end_year:
-                        # annual_cost が設定されていればそれを使用、なければamount
-                        if education.annual_cost:
-                            education_cost += education.annual_cost
-                        else:
-                            education_cost += education.amount
-                # 年次が設定されていない場合は全期間で計算
-                else:
-                    education_cost += education.amount
-        
-        year_expense += education_cost
-        
-        if target_year == current_year:  # 初年度のみログ出力
-            print(f"[DEBUG] 初年度支出内訳 ({target_year}年):")
-            print(f"  - 支出: {annual_expense_base:,.0f}円")
-            print(f"  - 住宅: {annual_housing_cost:,.0f}円")
-            print(f"  - 教育: {education_cost:,.0f}円")
-            print(f"  - 合計: {year_expense:,.0f}円")
-        
-        # 年間収支
-        net_cashflow = year_income - year_expense
-        
-        # 累積資産を更新
-        # 1. 収支を加算
-        cumulative_assets += net_cashflow
-        # 2. 新規ローン借入を負債として減算
-        cumulative_assets -= loan_new_debt
-        # 3. ローン元金返済分を資産として加算
-        cumulative_assets += loan_principal_payments
-        
-        if loan_new_debt > 0 or loan_principal_payments > 0:
-            print(f"[DEBUG] {target_year}年 累積資産変動: 収支={net_cashflow:,.0f}円, 新規借入=-{loan_new_debt:,.0f}円, 元金返済=+{loan_principal_payments:,.0f}円, 累積資産={cumulative_assets:,.0f}円")
-        
-        annual_incomes.append(round(year_income))
-        annual_expenses.append(round(year_expense))
-        net_cashflows.append(round(net_cashflow))
-        cumulative_assets_list.append(round(cumulative_assets))
+    # 夜間バッチの事前計算結果があれば、それを使う（入力が変わっていない場合のみ）
+    result = get_fresh_result(db, current_user, years, resolution)
+    precomputed = result is not None
+    if not precomputed:
+        inputs = load_simulation_inputs(db, current_user.id, years)
+        # シミュレーション本体（年次 or 月次）
+        # 計算はプロセスプールで実行（イベントループを止めない）
+        result = await run_cpu_bound(simulate_payload, inputs, resolution)
+    initial_assets = result["initial_assets"]
+    current_age = result["current_age"]
+    simulation_years = result["years"]
+    annual_incomes = result["annual_income"]
+    annual_expenses = result["annual_expense"]
+    net_cashflows = result["net_cashflow"]
+    cumulative_assets_list = result["cumulative_assets"]
     
     # AIによる分析と提案を生成
-    ai_suggestions = await generate_ai_suggestions(
-        initial_assets=initial_assets,
-        annual_income=annual_incomes[0] if annual_incomes else 0,
-        annual_expense=annual_expenses[0] if annual_expenses else 0,
-        net_cashflow=net_cashflows[0] if net_cashflows else 0,
-        final_assets=cumulative_assets_list[-1] if cumulative_assets_list else 0,
-        family_count=len(family_members),
-        has_children=len([f for f in family_members if '子供' in f.relationship_type]) > 0
-    )
+    # include_ai=false の場合は省略（POST /api/jobs の "ai_suggestions" ジョブで別途取得できる）
+    ai_suggestions = None
+    if include_ai:
+        ai_suggestions = await generate_ai_suggestions(
+            **ai_suggestion_inputs(result)
+        )
+    
+    # グラフ用の間引き（AI提案は間引き前の値で計算済み）
+    downsampled = max_points is not None and max_points < len(simulation_years)
+    if downsampled:
+        sampled = downsample_series(
+            simulation_years,
+            {
+                "annual_income": annual_incomes,
+                "annual_expense": annual_expenses,
+                "net_cashflow": net_cashflows,
+                "cumulative_assets": cumulative_assets_list,
+            },
+            max_points=max_points,
+            key="cumulative_assets",
+            keep_x=result["event_years"],
+            method=downsample
+        )
+        simulation_years = sampled["x"]
+        annual_incomes = sampled["annual_income"]
+        annual_expenses = sampled["annual_expense"]
+        net_cashflows = sampled["net_cashflow"]
+        cumulative_assets_list = sampled["cumulative_assets"]
     
     return {
         "years": simulation_years,
@@ -320,12 +132,28 @@ async def get_cashflow_simulation(
         "annual_expense": annual_expenses,
         "net_cashflow": net_cashflows,
         "cumulative_assets": cumulative_assets_list,
+        "downsampled": downsampled,
+        "precomputed": precomputed,
+        "resolution": resolution,
         "initial_assets": round(initial_assets),
         "current_age": current_age,
         "ai_suggestions": ai_suggestions
     }
 
 
+def parse_ai_suggestions(result_text: str) -> Dict:
+    """AI提案の応答テキストから JSON を取り出す（パースの時間だけを計測できるように分けている）"""
+    result_text = result_text.strip()
+    
+    # JSON部分を抽出
+    if '```json' in result_text:
+        result_text = result_text.split('```json')[1].split('```')[0].strip()
+    elif '```' in result_text:
+        result_text = result_text.split('```')[1].split('```')[0].strip()
+    
+    return json.loads(result_text)
+
+
 async def generate_ai_suggestions(
     initial_assets: float,
     annual_income: float,
@@ -378,37 +206,43 @@ async def generate_ai_suggestions(
 """
 
     try:
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        # JSON部分を抽出
-        if '```json' in result_text:
-            result_text = result_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in result_text:
-            result_text = result_text.split('```')[1].split('```')[0].strip()
-        
-        import json
-        suggestions = json.loads(result_text)
-        return suggestions
+        # なぜ async 版：生成を待つ間もイベントループ（他のリクエスト・ジョブ）を止めない
+        # llm.generate：レート制限・サーキットブレーカー付き（遮断中はすぐ例外になる）
+        response = await llm.generate(prompt, "ai_suggestions")
+        return llm.parse_response("ai_suggestions", parse_ai_suggestions, response.text)
         
     except Exception as e:
         print(f"AI提案生成エラー: {e}")
-        # エラー時はデフォルトの提案を返す
-        return {
-            "summary": "現在の収支状況を分析中です。データを入力して最適な提案を受け取りましょう。",
-            "improvement_points": [
-                "収入と支出のバランスを定期的に見直しましょう",
-                "緊急時のための資金を確保しましょう",
-                "長期的な資産形成を計画しましょう"
-            ],
-            "action_items": [
-                "月次の家計簿を記録して支出を可視化する",
-                "収入の10-20%を貯蓄に回す",
-                "投資信託などの資産運用を検討する"
-            ],
-            "risk_alerts": [
-                "収入が途絶えた場合の備えを確認しましょう",
-                "ライフイベント（教育費、住宅購入等）に備えましょう"
-            ]
-        }
+        llm.llm_metrics.record_fallback("ai_suggestions")
+        # エラー時はデフォルトの提案を返す（呼び出し側が書き換えても共有の定数が変わらないようコピー）
+        return copy.deepcopy(DEFAULT_AI_SUGGESTIONS)
+
 
+
+# === バックグラウンドジョブ ===
+# 初心者向け解説：AI提案は時間がかかるので、ジョブとして登録して後から結果を取れるようにする
+# 使用例：POST /api/jobs {"job_type": "ai_suggestions", "params": {"years": 50}}
+
+@job_queue.register("ai_suggestions")
+async def run_ai_suggestions_job(params: Dict, context: JobContext) -> Dict:
+    """シミュレーションを実行し、その結果から AI 提案を生成するジョブ"""
+    years = int(params.get("years", 50))
+    resolution = params.get("resolution", "yearly")
+    if not 1 <= years <= 100:
+        raise ValueError("years は 1〜100 で指定してください")
+    if resolution not in ("yearly", "monthly"):
+        raise ValueError("resolution は yearly または monthly で指定してください")
+    
+    await context.set_progress(10, "データ読み込み中")
+    # なぜ SessionLocal：リクエストの外で動くので、get_db の依存性注入が使えない
+    db = SessionLocal()
+    try:
+        inputs = load_simulation_inputs(db, context.user_id, years)
+    finally:
+        db.close()
+    
+    await context.set_progress(30, "シミュレーション計算中")
+    result = await run_cpu_bound(simulate_payload, inputs, resolution)
+    
+    await context.set_progress(50, "AI分析中")
+    return await generate_ai_suggestions(**ai_suggestion_inputs(result))
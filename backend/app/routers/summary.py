@@ -0,0 +1,28 @@
+# 家計サマリー API
+# 初心者向け解説：ダッシュボード用の合計値を1行で返すAPI
+#
+# なぜ必要なのか：
+# - 以前は各カテゴリの一覧を全部取得して、フロントエンドで合計していた
+# - サマリーは書き込みのたびに更新済みなので、ここでは1行読むだけ
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.user import User
+from app.schemas.summary import FinancialSummaryResponse
+from app.services.financial_summary import get_financial_summary
+from app.utils.security import get_current_user
+
+router = APIRouter()
+
+@router.get("", response_model=FinancialSummaryResponse)
+async def read_financial_summary(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    ログインユーザーの家計サマリーを取得
+
+    資産合計・年収・年間支出（年額換算）・各カテゴリの件数・純資産など
+    """
+    return get_financial_summary(db, current_user.id)
@@ -3,7 +3,7 @@
 
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional
+from typing import Dict, List, Optional
 
 class AssetBase(BaseModel):
     """
@@ -87,3 +87,28 @@ class AssetResponse(AssetBase):
     
     class Config:
         from_attributes = True
+
+class AssetHistoryPoint(BaseModel):
+    """資産推移グラフの1点（バケット内の最後に記録された値）"""
+    date: date
+    total_assets: float
+    by_type: Dict[str, float]  # 資産種類ごとの合計
+
+class AssetHistoryResponse(BaseModel):
+    """
+    資産推移のレスポンス
+
+    使用例：GET /api/assets/history?start=2025-01-01&bucket=month
+    {
+        "bucket": "month",
+        "start": "2025-01-01",
+        "end": "2025-12-31",
+        "points": [
+            {"date": "2025-01-01", "total_assets": 5000000, "by_type": {"預金": 3000000, "株式": 2000000}}
+        ]
+    }
+    """
+    bucket: str  # day / week / month
+    start: date
+    end: date
+    points: List[AssetHistoryPoint]
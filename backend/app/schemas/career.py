@@ -0,0 +1,23 @@
+# キャリア設計スキーマ
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class CareerResponse(BaseModel):
+    """キャリア設計情報のレスポンス"""
+    id: int
+    user_id: int
+    career_type: str
+    description: str
+    expected_income: Optional[float] = None
+    currency: Optional[str] = None
+    target_date: Optional[date] = None
+    notes: Optional[str] = None
+
+    # 未来計画用フィールド
+    timeline: Optional[str] = None
+    event_year: Optional[int] = None
+    salary_increase_rate: Optional[float] = None
+
+    class Config:
+        from_attributes = True
@@ -3,6 +3,7 @@
 
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Optional
 
 class ChatMessageCreate(BaseModel):
     """
@@ -39,3 +40,34 @@ class ChatMessageResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class ChatHistoryItem(BaseModel):
+    """
+    チャット履歴一覧の1件
+
+    一覧表示では include_response=false にすると response を省略できる（null になる）
+    """
+    id: int
+    user_id: int
+    message: str
+    response: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ChatHistoryPage(BaseModel):
+    """
+    チャット履歴の1ページ（新しい順）
+
+    使用例：GET /api/chat/history?limit=50 のレスポンス
+    {
+        "items": [...],
+        "next_cursor": "MjAyNC0wMS0wMVQwMDowMDowMHwxMjM",
+        "has_more": true
+    }
+    → 続きは GET /api/chat/history?before=MjAyNC0wMS0wMVQwMDowMDowMHwxMjM
+    """
+    items: List[ChatHistoryItem]
+    next_cursor: Optional[str] = None  # より古いページを読むときに before に渡す
+    has_more: bool = False
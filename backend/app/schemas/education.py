@@ -1,5 +1,5 @@
 # 教育費用スキーマ
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
 from datetime import date
 
@@ -26,9 +26,35 @@ class EducationCreate(EducationBase):
 class EducationUpdate(EducationBase):
     pass
 
-class EducationResponse(EducationBase):
+class EducationResponse(BaseModel):
+    """
+    教育費情報のレスポンス
+
+    なぜ EducationBase を継承しないのか：
+    - DBでは timeline や is_private が NULL の行もある
+    - レスポンスでは NULL をそのまま返せるよう Optional にしている
+    """
     id: int
     user_id: int
+    education_type: str
+    child_name: str
+    child_age: Optional[int] = None
+    school_type: Optional[str] = None
+    is_private: bool = False
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    annual_cost: Optional[float] = None
+    amount: float
+    currency: Optional[str] = None
+    start_date: Optional[date] = None
+    notes: Optional[str] = None
+    timeline: Optional[str] = None
+
+    @field_validator("is_private", mode="before")
+    @classmethod
+    def _tinyint_to_bool(cls, value):
+        # MySQL の tinyint(0/1/NULL) を bool に変換
+        return bool(value) if value is not None else False
     
     class Config:
         from_attributes = True
@@ -0,0 +1,25 @@
+# 住宅スキーマ
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class HouseResponse(BaseModel):
+    """住宅情報のレスポンス"""
+    id: int
+    user_id: int
+    house_type: str
+    name: str
+    amount: float
+    currency: Optional[str] = None
+    start_date: Optional[date] = None
+    notes: Optional[str] = None
+
+    # 未来計画用フィールド
+    timeline: Optional[str] = None
+    purchase_year: Optional[int] = None
+    loan_term: Optional[int] = None
+    loan_rate: Optional[float] = None
+    down_payment: Optional[float] = None
+
+    class Config:
+        from_attributes = True
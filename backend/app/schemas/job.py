@@ -0,0 +1,48 @@
+# バックグラウンドジョブスキーマ（API入出力定義）
+# 初心者向け解説：重い処理をジョブとして登録・確認するときの形を定義
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+class JobCreate(BaseModel):
+    """
+    ジョブ登録時の入力データ
+
+    使用例：POST /api/jobs
+    {
+        "job_type": "ai_suggestions",
+        "params": {"years": 50}
+    }
+    """
+    job_type: str = Field(..., min_length=1, max_length=50)
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class JobResponse(BaseModel):
+    """
+    ジョブの状態のレスポンス
+
+    使用例：GET /api/jobs/{job_id} のレスポンス
+    {
+        "id": "3f2a...",
+        "job_type": "ai_suggestions",
+        "status": "running",
+        "progress": 50,
+        "message": "AI分析中",
+        "result": null,
+        "error": null,
+        "created_at": "2024-01-01T00:00:00",
+        ...
+    }
+    """
+    id: str
+    job_type: str
+    status: str  # queued / running / succeeded / failed / cancelled
+    progress: int = 0
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None  # この時刻を過ぎると結果は削除される
@@ -23,3 +23,20 @@ class Retirement(RetirementBase):
 
     class Config:
         from_attributes = True
+
+class RetirementResponse(BaseModel):
+    """老後計画情報のレスポンス（未来計画用フィールドを含む）"""
+    id: int
+    user_id: int
+    retirement_type: str
+    name: str
+    retirement_age: Optional[int] = None
+    monthly_amount: Optional[float] = None
+    total_amount: Optional[float] = None
+    amount: float
+    currency: Optional[str] = None
+    start_date: Optional[date] = None
+    notes: Optional[str] = None
+
+    class Config:
+        from_attributes = True
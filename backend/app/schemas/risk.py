@@ -0,0 +1,25 @@
+# リスク管理スキーマ
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class RiskResponse(BaseModel):
+    """リスク管理情報のレスポンス"""
+    id: int
+    user_id: int
+    risk_type: str
+    name: str
+    amount: float
+    currency: Optional[str] = None
+    start_date: Optional[date] = None
+    notes: Optional[str] = None
+
+    # 保険用フィールド
+    timeline: Optional[str] = None
+    insurance_type: Optional[str] = None
+    coverage_amount: Optional[float] = None
+    monthly_premium: Optional[float] = None
+    coverage_period: Optional[int] = None
+
+    class Config:
+        from_attributes = True
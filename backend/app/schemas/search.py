@@ -0,0 +1,38 @@
+# 検索スキーマ（API入出力定義）
+# 初心者向け解説：全文検索の結果の形を定義
+
+from pydantic import BaseModel
+from typing import List
+
+class SearchResult(BaseModel):
+    """
+    検索結果の1件
+
+    source の種類：chat / asset / income / expense / house / education / career / risk / retirement / family
+    """
+    source: str
+    id: int
+    title: str
+    snippet: str  # キーワード周辺の抜粋
+    score: float  # 大きいほど関連が強い
+
+class SearchResponse(BaseModel):
+    """
+    検索結果のレスポンス
+
+    使用例：GET /api/search?q=住宅ローン のレスポンス
+    {
+        "query": "住宅ローン",
+        "items": [
+            {"source": "chat", "id": 12, "title": "住宅ローンを組みました", "snippet": "…住宅ローンを組みました…", "score": 3.2}
+        ],
+        "limit": 20,
+        "offset": 0,
+        "has_more": false
+    }
+    """
+    query: str
+    items: List[SearchResult]
+    limit: int
+    offset: int
+    has_more: bool
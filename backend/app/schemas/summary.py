@@ -0,0 +1,45 @@
+# 家計サマリースキーマ（API入出力定義）
+# 初心者向け解説：ダッシュボードの合計値をまとめて返す形を定義
+
+from pydantic import BaseModel
+from datetime import datetime
+
+class FinancialSummaryResponse(BaseModel):
+    """
+    家計サマリーのレスポンス
+
+    使用例：GET /api/summary のレスポンス
+    {
+        "total_assets": 12000000,
+        "annual_income": 6000000,
+        "annual_expense": 3600000,
+        "annual_net_cashflow": 2400000,
+        "net_worth": 8000000,
+        ...
+    }
+    """
+    user_id: int
+    total_assets: float
+    asset_count: int
+    annual_income: float
+    income_count: int
+    annual_expense: float
+    expense_count: int
+    annual_net_cashflow: float
+    house_total: float
+    house_count: int
+    housing_loan_balance: float
+    education_total: float
+    education_count: int
+    career_count: int
+    risk_total: float
+    risk_count: int
+    retirement_total: float
+    retirement_count: int
+    family_count: int
+    net_worth: float
+    data_version: int
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,183 @@
+# 資産履歴（スナップショット）の記録・集約・検索
+# 初心者向け解説：asset_snapshots テーブルを使って、資産の推移グラフ用データを作る
+#
+# 記録のタイミング：
+# - 資産が追加・更新・削除された flush の直後（app/models/data_version.py のフック）
+#   → その日の行を「現在の種類別合計」で置き換える（1日に何度変更しても1日分の行だけ）
+# - 夜間バッチ app/batch/asset_snapshots.py（変更がなかった日も1日1回記録）
+#
+# ロールアップ（古い行をまとめる）：
+# - 90日より前の日次の行 → 週ごとに、その週の最後の日の行だけを残す
+# - 2年より前の週次の行 → 月ごとに、その月の最後の行だけを残す
+#   ※ 資産は「残高」なので合計ではなく、期間の最後の値（期末残高）を使う
+#
+# どの日付の行も「その日の全種類分」がそろっているので、日付ごとに合計すれば資産総額になる
+
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset
+from app.models.asset_snapshot import AssetSnapshot
+
+BUCKETS = ("day", "week", "month")
+DAILY_RETENTION_DAYS = 90  # これより古い日次の行は週次にまとめる
+WEEKLY_RETENTION_DAYS = 730  # これより古い週次の行は月次にまとめる
+
+# 資産が1件もない日の行の種類（合計 0 の行。by_type には出さない）
+NO_ASSETS_TYPE = ""
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """日付が属するバケットの開始日（週は月曜日、月は1日）"""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def auto_bucket(start: date, end: date) -> str:
+    """期間の長さからグラフ用の粒度を決める（点数が多くなりすぎないように）"""
+    days = (end - start).days
+    if days <= 92:
+        return "day"
+    if days <= 731:
+        return "week"
+    return "month"
+
+
+def record_asset_snapshot(connection: Connection, user_id: int, day: Optional[date] = None):
+    """
+    現在の資産を種類別に合計して、その日のスナップショットとして保存
+
+    同じ日の行はいったん消して入れ直す（1日1セット）
+    資産が1件もなければ合計 0 の行を1つ入れる（全部削除した日に、グラフが 0 まで下がるように）
+    """
+    day = day or date.today()
+    totals = connection.execute(
+        select(Asset.asset_type, func.sum(Asset.amount))
+        .where(Asset.user_id == user_id)
+        .group_by(Asset.asset_type)
+    ).all()
+
+    connection.execute(
+        delete(AssetSnapshot).where(
+            AssetSnapshot.user_id == user_id,
+            AssetSnapshot.snapshot_date == day,
+            AssetSnapshot.granularity == "day"
+        )
+    )
+    if not totals:
+        totals = [(NO_ASSETS_TYPE, 0.0)]
+    connection.execute(insert(AssetSnapshot), [
+        {
+            "user_id": user_id,
+            "snapshot_date": day,
+            "asset_type": asset_type,
+            "total": float(total or 0),
+            "granularity": "day",
+        }
+        for asset_type, total in totals
+    ])
+
+
+def rollup_snapshots(connection: Connection, user_id: int, today: Optional[date] = None) -> int:
+    """
+    古い行を粗い粒度にまとめる（1ユーザー分）。削除した行数を返す
+
+    日次 → 週次（DAILY_RETENTION_DAYS より前）、週次 → 月次（WEEKLY_RETENTION_DAYS より前）
+    """
+    today = today or date.today()
+    removed = 0
+    for source, target, retention in (
+        ("day", "week", DAILY_RETENTION_DAYS),
+        ("week", "month", WEEKLY_RETENTION_DAYS),
+    ):
+        # 現在のバケットの途中で切らないよう、境界をバケットの開始日にそろえる
+        cutoff = bucket_start(today - timedelta(days=retention), target)
+        rows = connection.execute(
+            select(AssetSnapshot.id, AssetSnapshot.snapshot_date, AssetSnapshot.asset_type, AssetSnapshot.total)
+            .where(
+                AssetSnapshot.user_id == user_id,
+                AssetSnapshot.granularity == source,
+                AssetSnapshot.snapshot_date < cutoff
+            )
+            .order_by(AssetSnapshot.snapshot_date)
+        ).all()
+        if not rows:
+            continue
+
+        # バケットごとに「最後の日付の行セット」だけを残す
+        # （日付は実際の記録日のまま。粒度の印だけ付け替える）
+        last_date_in_bucket: Dict[date, date] = {}
+        for row in rows:
+            last_date_in_bucket[bucket_start(row.snapshot_date, target)] = row.snapshot_date
+        keep_ids = {
+            row.id for row in rows
+            if last_date_in_bucket[bucket_start(row.snapshot_date, target)] == row.snapshot_date
+        }
+        drop_ids = [row.id for row in rows if row.id not in keep_ids]
+
+        if drop_ids:
+            connection.execute(delete(AssetSnapshot).where(AssetSnapshot.id.in_(drop_ids)))
+        connection.execute(
+            update(AssetSnapshot).where(AssetSnapshot.id.in_(keep_ids)).values(granularity=target)
+        )
+        removed += len(drop_ids)
+    return removed
+
+
+def get_asset_history(
+    db: Session,
+    user_id: int,
+    start: date,
+    end: date,
+    bucket: Optional[str] = None
+) -> Dict:
+    """
+    期間内の資産推移をバケット（日・週・月）ごとに返す
+
+    各バケットの値 = そのバケット内で最後に記録された日の値（期末残高）
+    DB側で日付・種類ごとに集計してから読むので、読む行数は「日付の数 × 種類数」で済む
+    """
+    bucket = bucket or auto_bucket(start, end)
+    rows = db.execute(
+        select(AssetSnapshot.snapshot_date, AssetSnapshot.asset_type, func.sum(AssetSnapshot.total))
+        .where(
+            AssetSnapshot.user_id == user_id,
+            AssetSnapshot.snapshot_date >= start,
+            AssetSnapshot.snapshot_date <= end
+        )
+        .group_by(AssetSnapshot.snapshot_date, AssetSnapshot.asset_type)
+        .order_by(AssetSnapshot.snapshot_date)
+    ).all()
+
+    # 日付ごとにまとめる → 同じバケットなら後の日付で上書き
+    by_date: "OrderedDict[date, Dict[str, float]]" = OrderedDict()
+    for snapshot_date, asset_type, total in rows:
+        by_type = by_date.setdefault(snapshot_date, {})
+        if asset_type != NO_ASSETS_TYPE:  # 資産なしの日は、種類なし（合計 0）の点になる
+            by_type[asset_type] = float(total)
+
+    points: "OrderedDict[date, Dict[str, float]]" = OrderedDict()
+    for snapshot_date, by_type in by_date.items():
+        points[bucket_start(snapshot_date, bucket)] = by_type
+
+    return {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "points": [
+            {
+                "date": point_date,
+                "total_assets": round(sum(by_type.values())),
+                "by_type": {asset_type: round(total) for asset_type, total in by_type.items()},
+            }
+            for point_date, by_type in points.items()
+        ],
+    }
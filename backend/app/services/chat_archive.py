@@ -0,0 +1,246 @@
+# チャット履歴のアーカイブ
+# 初心者向け解説：古いチャットを chat_messages から chat_archives（圧縮）へ移す処理と、
+#                アーカイブから履歴を読み出す処理
+#
+# 仕組み：
+# - アーカイブは「ユーザー × 月」ごとに1行。その月のメッセージを JSON にして圧縮した payload を持つ
+# - 同じ月に後から古いメッセージが追加でアーカイブされた場合は、既存の payload に混ぜて圧縮し直す
+# - 移したメッセージは元の id と created_at をそのまま持つので、履歴のカーソルはアーカイブでも使える
+#
+# 注目ポイント：
+# - アーカイブ済みのメッセージは、chat_messages のどの行よりも必ず古い
+#   （「N日より古いもの」を古い順に移すため）
+#   → 履歴は「chat_messages を読み切ったら、続きをアーカイブから読む」だけでよい
+
+import json
+import zlib
+from datetime import datetime
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage
+from app.models.chat_archive import ChatArchive
+
+
+class ArchivedMessage(NamedTuple):
+    """アーカイブから取り出した1件（ChatMessage と同じ属性名で読める）"""
+    id: int
+    user_id: int
+    message: str
+    response: Optional[str]
+    created_at: datetime
+
+
+def _codec_functions(codec: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """圧縮方式名 → (圧縮関数, 展開関数)"""
+    if codec == "zlib":
+        return (lambda data: zlib.compress(data, 6)), zlib.decompress
+    if codec == "zstd":
+        # なぜ関数内でインポート：zstd を使わない環境では zstandard パッケージは不要
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "CHAT_ARCHIVE_CODEC=zstd には zstandard パッケージが必要です（pip install zstandard）"
+            ) from e
+        return zstandard.ZstdCompressor(level=10).compress, zstandard.ZstdDecompressor().decompress
+    raise ValueError(f"未対応の圧縮方式です: {codec}")
+
+
+def pack_messages(messages: List[ArchivedMessage], codec: str) -> bytes:
+    """メッセージ一覧（新しい順）を圧縮した payload にする"""
+    compress, _ = _codec_functions(codec)
+    rows = [
+        [m.id, m.created_at.isoformat(), m.message, m.response]
+        for m in messages
+    ]
+    return compress(json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def unpack_messages(archive: ChatArchive, include_response: bool = True) -> List[ArchivedMessage]:
+    """payload を展開してメッセージ一覧（新しい順）に戻す"""
+    _, decompress = _codec_functions(archive.codec)
+    rows = json.loads(decompress(archive.payload).decode("utf-8"))
+    return [
+        ArchivedMessage(
+            id=row_id,
+            user_id=archive.user_id,
+            message=message,
+            response=response if include_response else None,
+            created_at=datetime.fromisoformat(created_at)
+        )
+        for row_id, created_at, message, response in rows
+    ]
+
+
+def _period(created_at: datetime) -> str:
+    return f"{created_at.year:04d}-{created_at.month:02d}"
+
+
+def _next_month(created_at: datetime) -> datetime:
+    if created_at.month == 12:
+        return datetime(created_at.year + 1, 1, 1)
+    return datetime(created_at.year, created_at.month + 1, 1)
+
+
+def archive_oldest_month(db: Session, user_id: int, cutoff: datetime, codec: str) -> int:
+    """
+    1ユーザーの「cutoff より古いメッセージ」のうち、いちばん古い月の分をアーカイブへ移す
+
+    なぜ1か月ずつ：1回に扱うメッセージ数を月単位に抑えて、メモリ使用量を一定にするため
+    戻り値：移した件数（0 なら、もう移すものがない）
+    """
+    oldest = db.execute(
+        select(ChatMessage.created_at)
+        .where(ChatMessage.user_id == user_id, ChatMessage.created_at < cutoff)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+        .limit(1)
+    ).scalar()
+    if oldest is None:
+        return 0
+
+    period = _period(oldest)
+    month_start = datetime(oldest.year, oldest.month, 1)
+    month_end = min(_next_month(oldest), cutoff)
+    hot_rows = db.execute(
+        select(ChatMessage.id, ChatMessage.message, ChatMessage.response, ChatMessage.created_at)
+        .where(
+            ChatMessage.user_id == user_id,
+            ChatMessage.created_at >= month_start,
+            ChatMessage.created_at < month_end
+        )
+    ).all()
+    moved = [
+        ArchivedMessage(row.id, user_id, row.message, row.response, row.created_at)
+        for row in hot_rows
+    ]
+
+    archive = db.execute(
+        select(ChatArchive).where(ChatArchive.user_id == user_id, ChatArchive.period == period)
+    ).scalar_one_or_none()
+    if archive is None:
+        archive = ChatArchive(user_id=user_id, period=period)
+        db.add(archive)
+        messages = moved
+    else:
+        # 同じ月の既存アーカイブに混ぜる（id が重複するものは新しく移す方を使う）
+        moved_ids = {m.id for m in moved}
+        messages = [m for m in unpack_messages(archive) if m.id not in moved_ids] + moved
+
+    messages.sort(key=lambda m: (m.created_at, m.id), reverse=True)
+    archive.codec = codec
+    archive.payload = pack_messages(messages, codec)
+    archive.message_count = len(messages)
+    archive.first_created_at = messages[-1].created_at
+    archive.last_created_at = messages[0].created_at
+
+    # created_at の範囲も付ける（MySQL の月別パーティションで、その月の区画だけを対象にするため）
+    db.execute(delete(ChatMessage).where(
+        ChatMessage.created_at >= month_start,
+        ChatMessage.created_at < month_end,
+        ChatMessage.id.in_([m.id for m in moved])
+    ))
+    return len(moved)
+
+
+def _archive_query(user_id: int, before: Optional[Tuple[datetime, int]], max_months: int):
+    """before より古いメッセージを持つ月の行を、新しい月から順に最大 max_months 行読むクエリ"""
+    query = select(ChatArchive).where(ChatArchive.user_id == user_id)
+    if before is not None:
+        query = query.where(ChatArchive.first_created_at <= before[0])
+    # yield_per：1行ずつ受け取る → 必要な件数がそろったら、残りの月の payload は読まない
+    return (
+        query.order_by(ChatArchive.last_created_at.desc(), ChatArchive.id.desc())
+        .limit(max_months)
+        .execution_options(yield_per=1)
+    )
+
+
+def fetch_archived_messages(
+    db: Session,
+    user_id: int,
+    need: int,
+    before: Optional[Tuple[datetime, int]] = None,
+    include_response: bool = True
+) -> List[ArchivedMessage]:
+    """
+    アーカイブから、before より古いメッセージを新しい順に最大 need 件取得
+
+    注目ポイント：
+    - 必要な月の行を、新しい順・LIMIT 付きの1クエリで読む
+      （対象の月はどれも before より古いメッセージを1件以上持つ。例外はカーソルの行がある月だけなので、
+        最大 need + 1 か月で足りる）
+    """
+    if need <= 0:
+        return []
+
+    results: List[ArchivedMessage] = []
+    archives = db.execute(_archive_query(user_id, before, need + 1)).scalars()
+    try:
+        for archive in archives:
+            for message in unpack_messages(archive, include_response):
+                if before is not None and (message.created_at, message.id) >= before:
+                    continue
+                results.append(message)
+                if len(results) >= need:
+                    return results
+    finally:
+        archives.close()  # 途中で抜けた時も、読み残した行を捨てて接続を次のクエリに使えるようにする
+    return results
+
+
+class ArchiveReader:
+    """
+    1つのリクエストの間、アーカイブを新しい月から順に読み進める（GET /history/stream 用）
+
+    なぜ：ページごとに fetch_archived_messages を呼ぶと、ページの数だけ同じ SELECT を実行し、
+         ページをまたぐ月は毎回展開し直すことになる
+    - 最初に必要になった時にクエリを1回だけ実行し、結果を開いたまま1か月ずつ受け取る
+    - 展開した月のメッセージは、カーソルが通り過ぎるまで覚えておく
+    - 使い終わったら close() を呼ぶ
+    """
+
+    def __init__(self, db: Session, user_id: int, max_messages: int, include_response: bool = True):
+        self.db = db
+        self.user_id = user_id
+        self.max_messages = max_messages  # このリクエストで読む最大件数（クエリの LIMIT に使う）
+        self.include_response = include_response
+        self.started = False  # 一度でもアーカイブを読んだか（読んだなら chat_messages はもう読み切っている）
+        self._archives = None
+        self._months = None
+        self._pending: Deque[ArchivedMessage] = deque()  # 展開済みで、まだカーソルより古いメッセージ（新しい順）
+
+    def read(self, need: int, before: Optional[Tuple[datetime, int]]) -> List[ArchivedMessage]:
+        """before より古いメッセージを新しい順に最大 need 件（fetch_archived_messages と同じ結果）"""
+        if need <= 0:
+            return []
+        if not self.started:
+            self.started = True
+            self._archives = self.db.execute(
+                _archive_query(self.user_id, before, self.max_messages + 1)
+            ).scalars()
+            self._months = iter(self._archives)
+
+        # 前のページで返した分（カーソル以降）を捨てる
+        while self._pending and before is not None and (
+            (self._pending[0].created_at, self._pending[0].id) >= before
+        ):
+            self._pending.popleft()
+
+        while len(self._pending) < need:
+            archive = next(self._months, None)
+            if archive is None:
+                break
+            self._pending.extend(
+                message for message in unpack_messages(archive, self.include_response)
+                if before is None or (message.created_at, message.id) < before
+            )
+        return list(islice(self._pending, need))
+
+    def close(self):
+        if self._archives is not None:
+            self._archives.close()
@@ -0,0 +1,77 @@
+# チャット履歴の読み込み
+# 初心者向け解説：チャット履歴を「新しい順に1ページずつ」読むための処理
+#
+# 仕組み（キーセットページネーション）：
+# - 並び順は (created_at, id) の降順
+# - 2ページ目以降は「前のページの最後の行より古い行」を条件にして LIMIT で読む
+# - 複合索引 (user_id, created_at, id) があるので、何ページ目でも索引を1ページ分たどるだけで済む
+# - chat_messages を読み切ったら、続きはアーカイブ（chat_archives）から読む
+#   アーカイブ済みの行は元の id / created_at を持つので、カーソルはそのまま使える
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.chat import ChatMessage
+from app.services.chat_archive import ArchiveReader, fetch_archived_messages
+from app.utils.pagination import encode_cursor
+
+# 一覧表示で response（AIの応答本文）を省くときに読む列
+LIST_COLUMNS = (ChatMessage.id, ChatMessage.user_id, ChatMessage.message, ChatMessage.created_at)
+
+
+def fetch_history_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    before: Optional[Tuple[datetime, int]] = None,
+    include_response: bool = True,
+    archive_reader: Optional[ArchiveReader] = None
+) -> Dict:
+    """
+    チャット履歴を1ページ分取得
+
+    引数：
+        before: (created_at, id)。この行より古いものを返す（None なら最新から）
+        include_response: False なら response 列を読まない（一覧表示用に軽くする）
+        archive_reader: 続けて何ページも読む時（GET /history/stream）に、同じものを渡す。
+                        アーカイブはこれで読み進める（ページごとにクエリ・展開をやり直さない）
+
+    戻り値：{"items": [...], "next_cursor": str or None, "has_more": bool}
+    """
+    columns = (ChatMessage,) if include_response else LIST_COLUMNS
+    query = db.query(*columns).filter(ChatMessage.user_id == user_id)
+
+    if before is not None:
+        created_at, row_id = before
+        # (created_at, id) < (カーソルの created_at, カーソルの id)
+        # なぜ created_at <= を別に書く：MySQL の月別パーティションで、カーソルより新しい月の区画を読まないため
+        query = query.filter(
+            ChatMessage.created_at <= created_at,
+            or_(ChatMessage.created_at < created_at, ChatMessage.id < row_id)
+        )
+
+    # 1件多く読んで「次のページがあるか」を判定する（COUNT を使わない）
+    # 前のページでアーカイブまで読んでいれば、chat_messages はもう読み切っている（アーカイブの方が必ず古い）
+    if archive_reader is not None and archive_reader.started:
+        rows: List = []
+    else:
+        rows = query.order_by(
+            ChatMessage.created_at.desc(), ChatMessage.id.desc()
+        ).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        # chat_messages は読み切った → 足りない分はアーカイブから（古いメッセージは圧縮して移してある）
+        last = (rows[-1].created_at, rows[-1].id) if rows else before
+        need = limit + 1 - len(rows)
+        if archive_reader is not None:
+            rows += archive_reader.read(need, last)
+        else:
+            rows += fetch_archived_messages(db, user_id, need, last, include_response)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    return {"items": rows, "next_cursor": next_cursor, "has_more": has_more}
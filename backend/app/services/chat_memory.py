@@ -0,0 +1,140 @@
+# 会話メモリー（直近のターン + 古い会話の要約）
+# 初心者向け解説：AIに会話の流れを覚えさせるため、プロンプトに入れる「これまでの会話」を用意する
+#
+# 仕組み：
+# - まだ要約していないターンは、chat_messages からそのまま読む
+# - それより古い会話は user_chat_memory.summary（要約）1つにまとめてある
+# - 要約していないターンが CHAT_MEMORY_TURNS + CHAT_MEMORY_SUMMARY_BATCH 件に達した時だけ、
+#   古い方から CHAT_MEMORY_SUMMARY_BATCH 件を「前回の要約 + あふれたターン」から要約し直す
+#   （毎回は要約しない。要約の直後は直近 CHAT_MEMORY_TURNS ターンが残る）
+#
+# 注目ポイント：
+# - プロンプトの大きさ ≒ 要約（最大 CHAT_MEMORY_SUMMARY_MAX_CHARS 文字）
+#                       + 直近のターン（1件最大 CHAT_MEMORY_TURN_MAX_CHARS 文字
+#                         × 最大 CHAT_MEMORY_TURNS + CHAT_MEMORY_SUMMARY_BATCH 件）
+#   → 会話がどれだけ長くなっても一定以下
+# - 要約は応答を返した後（BackgroundTasks）に行うので、チャットの待ち時間は増えない
+
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.chat import ChatMessage
+from app.models.chat_memory import UserChatMemory
+from app.services.gemini_service import GeminiService
+
+
+class ConversationMemory(NamedTuple):
+    """プロンプトに入れる会話メモリー"""
+    summary: str  # 古い会話の要約（なければ空文字）
+    turns: List[Tuple[str, str]]  # 直近のターン [(ユーザーの発言, AIの応答), ...]（古い順）
+
+
+def _truncate(value: str, max_chars: int) -> str:
+    return value if len(value) <= max_chars else value[:max_chars] + "…"
+
+
+def _unsummarized_rows(db: Session, user_id: int, memory: Optional[UserChatMemory], limit: int):
+    """要約に含まれていないメッセージを新しい順に最大 limit 件"""
+    query = select(
+        ChatMessage.id, ChatMessage.message, ChatMessage.response, ChatMessage.created_at
+    ).where(ChatMessage.user_id == user_id)
+    if memory is not None and memory.summarized_through_id is not None:
+        # (created_at, id) > 要約済みの最後の行（履歴のカーソルと同じ書き方）
+        query = query.where(
+            ChatMessage.created_at >= memory.summarized_through_at,
+            or_(
+                ChatMessage.created_at > memory.summarized_through_at,
+                ChatMessage.id > memory.summarized_through_id
+            )
+        )
+    return db.execute(
+        query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit)
+    ).all()
+
+
+def load_memory(db: Session, user_id: int) -> ConversationMemory:
+    """プロンプト用の会話メモリー（要約 + 直近のターン）を読み込む"""
+    memory = db.get(UserChatMemory, user_id)
+    # 要約待ちのターンも含めて読む（要約にも直近のターンにも入らない会話が出ないように）
+    rows = _unsummarized_rows(
+        db, user_id, memory, settings.CHAT_MEMORY_TURNS + settings.CHAT_MEMORY_SUMMARY_BATCH
+    )
+    max_chars = settings.CHAT_MEMORY_TURN_MAX_CHARS
+    turns = [
+        (_truncate(row.message, max_chars), _truncate(row.response, max_chars))
+        for row in reversed(rows)
+    ]
+    return ConversationMemory(memory.summary if memory else "", turns)
+
+
+async def update_memory(user_id: int):
+    """
+    直近のターンがあふれていたら、あふれた分を要約に取り込む
+
+    チャット送信の後に BackgroundTasks から呼ばれる（リクエストのセッションは使わない）
+
+    注目ポイント：
+    - 読むのは新しい方から CHAT_MEMORY_TURNS + CHAT_MEMORY_SUMMARY_BATCH × 2 件まで
+      （この機能より前からの長い履歴や、要約の失敗が続いた分は、それより古いものを要約せずに読み飛ばす）
+    - 同じユーザーの要約が同時に走った場合は、先に保存された方を残す（後の方は捨てる）
+    """
+    turns_to_keep = settings.CHAT_MEMORY_TURNS
+    batch = settings.CHAT_MEMORY_SUMMARY_BATCH
+
+    db = SessionLocal()
+    try:
+        memory = db.get(UserChatMemory, user_id)
+        rows = _unsummarized_rows(db, user_id, memory, turns_to_keep + batch * 2)
+        if len(rows) < turns_to_keep + batch:
+            return  # まだあふれていない
+
+        overflow = list(reversed(rows[turns_to_keep:]))  # 要約に取り込むターン（古い順）
+        previous_summary = memory.summary if memory else ""
+        summary = await GeminiService.summarize_conversation(
+            previous_summary,
+            [
+                (_truncate(row.message, settings.CHAT_MEMORY_TURN_MAX_CHARS),
+                 _truncate(row.response, settings.CHAT_MEMORY_TURN_MAX_CHARS))
+                for row in overflow
+            ],
+            settings.CHAT_MEMORY_SUMMARY_MAX_CHARS
+        )
+        if not summary:
+            return  # 要約に失敗 → 次のチャットの後にもう一度試す
+
+        last = overflow[-1]
+        values = {
+            "summary": _truncate(summary, settings.CHAT_MEMORY_SUMMARY_MAX_CHARS),
+            "summarized_turns": (memory.summarized_turns if memory else 0) + len(overflow),
+            "summarized_through_at": last.created_at,
+            "summarized_through_id": last.id,
+            "updated_at": datetime.utcnow(),
+        }
+        if memory is None:
+            try:
+                db.execute(insert(UserChatMemory).values(user_id=user_id, **values))
+            except IntegrityError:
+                db.rollback()  # 同時に作られた → そちらを残す
+                return
+        else:
+            # 読み込んだ時から要約済みの位置が変わっていなければ更新
+            db.execute(
+                update(UserChatMemory)
+                .where(
+                    UserChatMemory.user_id == user_id,
+                    UserChatMemory.summarized_through_id == memory.summarized_through_id
+                )
+                .values(**values)
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"会話メモリー更新エラー: {str(e)}")
+    finally:
+        db.close()
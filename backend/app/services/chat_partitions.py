@@ -0,0 +1,149 @@
+# chat_messages の月別パーティション管理（MySQL のみ）
+# 初心者向け解説：chat_messages を created_at の「月」ごとに別々の区画（パーティション）に分けて保存する
+#
+# なぜパーティションに分けるのか：
+# - 行数が数億になっても、1つの区画（1か月分）とその索引の大きさはほぼ一定
+#   → INSERT（最新の区画だけに書く）や、期間を指定した読み込みの速さが変わらない
+# - created_at の範囲が条件にあるクエリは、関係ない月の区画を読まずに済む（パーティションプルーニング）
+# - 古い月は DROP PARTITION で一瞬で消せる（DELETE のように1行ずつ消さない）
+#
+# 区画の構成：
+#   p202610  VALUES LESS THAN (TO_DAYS('2026-11-01'))  ← 2026年10月分
+#   p202611  VALUES LESS THAN (TO_DAYS('2026-12-01'))
+#   ...
+#   pmax     VALUES LESS THAN MAXVALUE                 ← 作り忘れた先の月の受け皿
+#
+# 先の月の区画は python -m app.batch.chat_partitions で前もって作る（pmax を分割する）
+#
+# 注意（MySQL の制約）：
+# - 主キー・ユニーク索引には created_at を含める必要がある → 主キーは (id, created_at)
+# - 外部キーと FULLTEXT 索引は使えない
+#   → user_id の外部キーは作らない（ユーザー削除時は ORM の cascade で消す）
+#   → チャットの全文検索は期間を絞った部分一致にする（app/services/search.py）
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TABLE_NAME = "chat_messages"
+MAXVALUE_PARTITION = "pmax"
+
+# MySQL の TO_DAYS() と Python の date.toordinal() の差
+# TO_DAYS('2000-01-01') = 730485, date(2000, 1, 1).toordinal() = 730120
+TO_DAYS_OFFSET = 365
+
+
+def month_start(day: date, months: int = 0) -> date:
+    """day の月の1日から months か月ずらした日（負の値なら過去）"""
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """月の区画名（例：p202610）"""
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def _partition_sql(month: date) -> str:
+    upper = month_start(month, 1)
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))"
+
+
+def _maxvalue_sql() -> str:
+    return f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE"
+
+
+def partitioning_ddl(today: date, ahead: int) -> List[str]:
+    """
+    作ったばかりの chat_messages をパーティション表に変えるDDL
+
+    今月から ahead か月先までの区画と pmax を作る
+    """
+    months = [month_start(today, i) for i in range(ahead + 1)]
+    partitions = ", ".join([_partition_sql(month) for month in months] + [_maxvalue_sql()])
+    return [
+        f"ALTER TABLE {TABLE_NAME} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)",
+        f"ALTER TABLE {TABLE_NAME} PARTITION BY RANGE (TO_DAYS(created_at)) ({partitions})",
+    ]
+
+
+def list_partitions(connection: Connection) -> List[Tuple[str, Optional[date]]]:
+    """
+    今ある区画の一覧 [(区画名, 上限の日付), ...]（古い順、pmax の上限は None）
+
+    パーティション表になっていなければ空のリスト
+    """
+    rows = connection.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": TABLE_NAME}).all()
+    partitions = []
+    for name, description in rows:
+        if description == "MAXVALUE":
+            partitions.append((name, None))
+        else:
+            partitions.append((name, date.fromordinal(int(description) - TO_DAYS_OFFSET)))
+    return partitions
+
+
+def create_future_partitions(connection: Connection, today: date, ahead: int) -> List[str]:
+    """
+    今月から ahead か月先までの区画がなければ、pmax を分割して作る
+
+    戻り値：作った区画名の一覧
+    """
+    partitions = list_partitions(connection)
+    if not partitions:
+        raise RuntimeError(f"{TABLE_NAME} はパーティション表ではありません")
+    if partitions[-1][0] != MAXVALUE_PARTITION:
+        raise RuntimeError(f"{TABLE_NAME} に {MAXVALUE_PARTITION} 区画がありません")
+
+    # 既存の区画の上限より後の月だけを作る（途中の月を後から差し込むことはできない）
+    last_upper = max((upper for _, upper in partitions if upper is not None), default=None)
+    months = [
+        month for month in (month_start(today, i) for i in range(ahead + 1))
+        if last_upper is None or month >= last_upper
+    ]
+    if not months:
+        return []
+
+    new_partitions = ", ".join([_partition_sql(month) for month in months] + [_maxvalue_sql()])
+    connection.execute(text(
+        f"ALTER TABLE {TABLE_NAME} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO ({new_partitions})"
+    ))
+    return [partition_name(month) for month in months]
+
+
+def drop_expired_partitions(
+    connection: Connection,
+    today: date,
+    retain_months: int,
+    force: bool = False
+) -> Tuple[List[str], List[str]]:
+    """
+    今月から retain_months か月より前の区画を削除
+
+    なぜ既定では空の区画だけ：アーカイブ（app.batch.archive_chat）が済んでいない
+    メッセージを消さないため。force=True なら中身があっても削除する
+
+    戻り値：(削除した区画名, 中身が残っていて残した区画名)
+    """
+    cutoff = month_start(today, -retain_months)
+    dropped, kept = [], []
+    for name, upper in list_partitions(connection):
+        if upper is None or upper > cutoff:
+            continue
+        has_rows = connection.execute(
+            text(f"SELECT 1 FROM {TABLE_NAME} PARTITION ({name}) LIMIT 1")
+        ).first() is not None
+        if has_rows and not force:
+            kept.append(name)
+        else:
+            dropped.append(name)
+
+    if dropped:
+        connection.execute(text(f"ALTER TABLE {TABLE_NAME} DROP PARTITION {', '.join(dropped)}"))
+    return dropped, kept
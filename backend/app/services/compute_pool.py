@@ -0,0 +1,106 @@
+# 計算用プロセスプール
+# 初心者向け解説：CPUを使う重い計算（シミュレーション）を、別プロセスで実行する仕組み
+#
+# なぜ必要なのか：
+# - gunicorn の各ワーカーは1つのイベントループで全リクエストをさばいている
+# - 100年分の月次シミュレーションのような計算をその場で行うと、計算が終わるまで
+#   同じワーカーの他のリクエストが全部待たされる
+# - 計算だけを別プロセスに渡せば、APIワーカーは応答を返し続けられる
+#   （Python の GIL があるので、スレッドではなく「プロセス」を使う）
+#
+# 注目ポイント：
+# - プロセス間ではデータを pickle でコピーするので、ORMオブジェクトではなく
+#   コンパクトな Timeline（数値とNumPy配列だけ）を渡す
+# - プロセスの起動とNumPyのインポートには時間がかかるので、アプリ起動時に済ませておく（プレウォーム）
+# - SIM_PROCESS_WORKERS=0 にするとプールを使わず、その場で計算する（開発・デバッグ用）
+# - プロファイル中のリクエスト（?profile=1）も、その場で計算する（run_inline）
+#   → プールの中の計算はプロファイラに記録されないため
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
+
+from app.config import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# True の間は run_cpu_bound がプールを使わない（今のリクエストの中だけ有効）
+_run_inline: ContextVar[bool] = ContextVar("run_inline", default=False)
+
+
+def init_worker():
+    """
+    プロセス起動時に1回だけ実行（プレウォーム）
+
+    NumPy とシミュレーションエンジンを読み込み、小さな計算を1回流しておく
+    → 最初のリクエストでインポート待ちが発生しない
+    """
+    from app.services.simulation_engine import simulate_cashflow
+    simulate_cashflow(
+        [], [], [], [], [], [],
+        initial_assets=0, current_year=2000, current_age=30, years=1, resolution="monthly"
+    )
+
+
+def _ping() -> bool:
+    return True
+
+
+def start_pool(workers: Optional[int] = None):
+    """
+    プロセスプールを起動（アプリ起動時に呼ぶ）
+
+    なぜ spawn：fork だと親プロセスのDB接続やイベントループのスレッドまで
+    複製されてしまうため、まっさらなプロセスで起動する
+    """
+    global _executor
+    if _executor is not None:
+        return
+    workers = settings.SIM_PROCESS_WORKERS if workers is None else workers
+    if workers <= 0:
+        return
+    _executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    )
+    # プロセスは最初のタスクが来たときに作られるので、ワーカー数だけ空タスクを投げて起動させる
+    for _ in range(workers):
+        _executor.submit(_ping)
+
+
+def shutdown_pool():
+    """プロセスプールを停止（アプリ終了時に呼ぶ）"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+@contextmanager
+def run_inline() -> Iterator[None]:
+    """with ブロックの中では、run_cpu_bound をプールに渡さずその場で実行する（プロファイル用）"""
+    token = _run_inline.set(True)
+    try:
+        yield
+    finally:
+        _run_inline.reset(token)
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    CPUを使う関数をプロセスプールで実行して結果を待つ
+
+    使い方例：
+    result = await run_cpu_bound(run_simulation, timeline, initial_assets, "monthly")
+
+    注意：func と引数は pickle できる必要がある（モジュールの関数・数値・配列など）
+    """
+    if _executor is None or _run_inline.get():
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
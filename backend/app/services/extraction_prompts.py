@@ -0,0 +1,251 @@
+# 情報抽出プロンプトの組み立て（カテゴリ振り分け付き）
+# 初心者向け解説：チャットのメッセージから収入・支出などを取り出すためのプロンプトを作る
+#
+# なぜ振り分けるのか：
+# - 以前は8カテゴリすべての説明（約4,000文字）を毎回送っていた
+# - 「食費5万円」のようにカテゴリが明らかなメッセージなら、関係するカテゴリの説明だけで十分
+# - AIを呼ぶ前に、キーワードでカテゴリを選ぶ（classify_categories。APIを使わないので一瞬で終わる）
+#   → プロンプトが小さくなり、入力トークン数（料金）と待ち時間が減る
+#
+# 注目ポイント：
+# - どのキーワードにも当たらない場合は、取りこぼさないように全カテゴリの説明を送る
+# - 「家賃収入」のように複数のカテゴリにまたがる場合は、両方の説明と判定の優先順位を入れる
+
+import re
+from typing import Dict, List, Sequence
+
+# カテゴリ（プロンプト内の並び順）
+CATEGORIES = ["income", "expense", "asset", "house", "education", "career", "risk", "retirement"]
+
+# カテゴリを選ぶためのキーワード（どれか1つでも含まれていれば、そのカテゴリを選ぶ）
+CATEGORY_KEYWORDS: Dict[str, Sequence[str]] = {
+    "income": ("収入", "稼", "給料", "給与", "ボーナス", "賞与", "月収", "年収", "手取り", "副業",
+               "配当", "利子", "利息", "もらう", "もらって", "もらえ"),
+    "expense": ("払", "支出", "出費", "使っ", "使う", "かか", "費", "生活費", "サブスク"),
+    "asset": ("資産", "持って", "保有", "買", "購入", "株", "貯金", "貯蓄", "預金", "投資",
+              "投信", "nisa", "ideco", "暗号", "ビットコイン", "債券", "ローン", "不動産"),
+    "house": ("家賃", "賃貸", "住宅", "ローン", "マンション", "持ち家", "戸建", "一軒家", "住ま", "引っ越"),
+    "education": ("子供", "子ども", "こども", "息子", "娘", "長男", "長女", "次男", "次女",
+                  "学校", "小学", "中学", "高校", "大学", "教育", "塾", "進学", "公立", "私立"),
+    "career": ("転職", "昇進", "昇格", "独立", "起業", "副業", "キャリア", "就職", "開業", "フリーランス"),
+    "risk": ("保険", "リスク", "保障", "補償"),
+    "retirement": ("年金", "退職", "老後", "定年", "リタイア", "ideco"),
+}
+
+# 【重要：判定優先順位】の各行（関係するカテゴリが2つ以上選ばれた時だけ入れる）
+PRIORITY_RULES = [
+    ("income", "「収入」「稼ぐ」という表現があれば → income カテゴリ\n   （家賃収入、配当金、副業収入なども含む）"),
+    ("house", "住居費用（支払い）がある場合 → house カテゴリ\n   （家賃、住宅ローンなど）"),
+    ("expense", "「払う」「支出」「使う」などの表現があれば → expense カテゴリ"),
+    ("asset", "資産の保有や購入があれば → asset カテゴリ"),
+]
+
+# カテゴリごとの説明（必須フィールド・判定基準・例）
+CATEGORY_PROMPTS: Dict[str, str] = {
+    "income": """\
+income（収入）★柔軟に判定★
+   - income_type: 以下から適切なものを選択、または具体的な内容を記載
+     * 月収/年収/ボーナス/給料/副業/副収入/家賃収入/配当金/利子/投資収益/不動産収入/その他
+   - amount: 金額（数値）
+   
+   判定基準：
+   - 「収入」「稼ぐ」「給料」「ボーナス」「もらう」などがある
+   - 「○○収入」という表現（家賃収入、副業収入など）
+   - 「配当」「利子」「不動産収入」など収入源が明示されている
+   - 周期（月、年）と金額が記載されている
+   
+   例：
+   - 「月収30万円」→ {"income_type": "月収", "amount": 300000}
+   - 「家賃収入 月10万円」→ {"income_type": "家賃収入", "amount": 100000}
+   - 「副業で月5万円稼いでいます」→ {"income_type": "副業", "amount": 50000}
+   - 「配当金が年20万円」→ {"income_type": "配当金", "amount": 200000}
+   - 「ボーナス年100万円」→ {"income_type": "ボーナス", "amount": 1000000}
+   - 「不動産から月15万の収入」→ {"income_type": "不動産収入", "amount": 150000}
+""",
+    "expense": """\
+expense（支出）
+   - expense_type: 固定費/変動費/その他
+   - category: 食費/光熱費/交通費/通信費/娯楽費/医療費/教育費/その他
+   - amount: 金額（数値）
+   
+   判定基準：
+   - 「払う」「支出」「使う」「かかる」「費用」などがある
+   - 具体的な支出項目（食費、光熱費など）が記載されている
+   - ただし、家賃・住宅ローンは除外（house カテゴリ）
+   
+   例：
+   - 「食費5万円」→ {"expense_type": "変動費", "category": "食費", "amount": 50000}
+   - 「毎月5万円使っています」→ {"expense_type": "その他", "category": "その他", "amount": 50000}
+   - 「光熱費月2万円」→ {"expense_type": "固定費", "category": "光熱費", "amount": 20000}
+""",
+    "asset": """\
+asset（資産）
+   - asset_type: 株式/貯金/不動産/投資信託/暗号資産/債券/ローン/その他
+   - name: 具体的な名前
+   - amount: 金額（数値、負債はマイナス）
+   
+   判定基準：
+   - 「持っている」「保有」「買った」「購入」などがある
+   - 資産の種類（株、貯金、投資信託など）が明示されている
+   - ただし、住宅ローンは除外（house カテゴリ）
+   
+   例：
+   - 「トヨタ株50万円」→ {"asset_type": "株式", "name": "トヨタ株", "amount": 500000}
+   - 「貯金300万円」→ {"asset_type": "貯金", "name": "貯金", "amount": 3000000}
+   - 「車のローン100万円」→ {"asset_type": "ローン", "name": "車のローン", "amount": -1000000}
+""",
+    "house": """\
+house（家賃・住宅ローン）
+   - house_type: 賃貸/持ち家/購入予定/住宅ローン/その他
+   - name: 物件名や説明
+   - amount: 金額
+   
+   判定基準：
+   - 「家賃」「賃貸」「住宅ローン」「マンション」「持ち家」などがある
+   - 住居に関連する費用や資産である
+   - 注意：「家賃収入」は income カテゴリに振り分け
+   
+   例：
+   - 「家賃10万円」→ {"house_type": "賃貸", "name": "家賃", "amount": 100000}
+   - 「住宅ローン月8万円」→ {"house_type": "住宅ローン", "name": "住宅ローン", "amount": 80000}
+   - 「持ち家3000万円」→ {"house_type": "持ち家", "name": "持ち家", "amount": 30000000}
+""",
+    "education": """\
+education（子供教育）
+   - child_name: 子供の名前
+   - child_age: 子供の年齢（数値）
+   - schools: 各学校段階の設定（オブジェクト）
+     * elementary: 小学校（"public"=公立, "private"=私立, "none"=通わせない）
+     * junior_high: 中学校（"public"=公立, "private"=私立, "none"=通わせない）
+     * high_school: 高校（"public"=公立, "private"=私立, "none"=通わせない）
+     * university: 大学（"public"=公立, "private"=私立, "none"=通わせない）
+     * graduate_school: 大学院（"public"=公立, "private"=私立, "none"=通わせない）
+   - amount: 費用（省略可）
+   
+   判定基準：
+   - 子供に関する情報がある
+   - 学校や教育に関する記載がある
+   
+   例：
+   - 「10歳の息子、小学校は公立、中学からは私立」→ {"child_name": "息子", "child_age": 10, "schools": {"elementary": "public", "junior_high": "private", "high_school": "private", "university": "private"}, "amount": 0}
+   - 「5歳の娘、すべて私立」→ {"child_name": "娘", "child_age": 5, "schools": {"elementary": "private", "junior_high": "private", "high_school": "private", "university": "private"}, "amount": 0}
+   重要：「中学から私立」などの表現は、それ以降の全段階を私立に設定。明示されていない過去の学校段階は"none"に設定
+""",
+    "career": """\
+career（キャリア設計）
+   - career_type: 転職/昇進/独立/副業/その他
+   - description: 説明
+   - expected_income: 予想収入
+   
+   判定基準：
+   - 「転職」「昇進」「独立」「起業」などがある
+""",
+    "risk": """\
+risk（リスク）
+   - risk_type: 生命保険/医療保険/損害保険/貯蓄型保険/その他
+   - name: 保険名等
+   - amount: 保険料や保障額
+   
+   判定基準：
+   - 「保険」「リスク」などがある
+""",
+    "retirement": """\
+retirement（老後資金）
+   - retirement_type: 年金/一時金（退職金など）/その他
+   - name: 名称（国民年金、厚生年金、企業年金、退職金など）
+   - retirement_age: 受給開始年齢（数値）
+   - monthly_amount: 月額（年金の場合）
+   - total_amount: 年間総額または一時金総額
+   
+   判定基準：
+   - 「年金」「退職金」「老後」「定年」などがある
+   - 将来の収入に関する記載がある
+   
+   例：
+   - 「65歳から年金月15万円」→ {"retirement_type": "年金", "name": "年金", "retirement_age": 65, "monthly_amount": 150000, "total_amount": 1800000}
+   - 「退職金2000万円」→ {"retirement_type": "一時金（退職金など）", "name": "退職金", "retirement_age": 65, "total_amount": 20000000}
+   - 「厚生年金月額10万円」→ {"retirement_type": "年金", "name": "厚生年金", "monthly_amount": 100000, "total_amount": 1200000}
+""",
+}
+
+# 【出力形式】の例に使う1行（選ばれたカテゴリのうち、この並びで先頭から最大 MAX_OUTPUT_EXAMPLES 個）
+MAX_OUTPUT_EXAMPLES = 3
+OUTPUT_EXAMPLES: Dict[str, str] = {
+    "income": '"income": {"income_type": "家賃収入", "amount": 100000}',
+    "expense": '"expense": {"expense_type": "変動費", "category": "食費", "amount": 50000}',
+    "retirement": '"retirement": {"retirement_type": "年金", "name": "厚生年金", "retirement_age": 65, "monthly_amount": 150000, "total_amount": 1800000}',
+    "asset": '"asset": {"asset_type": "貯金", "name": "貯金", "amount": 3000000}',
+    "house": '"house": {"house_type": "賃貸", "name": "家賃", "amount": 100000}',
+    "education": '"education": {"child_name": "娘", "child_age": 5, "schools": {"elementary": "public", "junior_high": "public", "high_school": "public", "university": "private"}, "amount": 0}',
+    "career": '"career": {"career_type": "転職", "description": "IT企業へ転職", "expected_income": 6000000}',
+    "risk": '"risk": {"risk_type": "医療保険", "name": "医療保険", "amount": 3000}',
+}
+
+# カテゴリ別の注意書き（そのカテゴリが選ばれた時だけ末尾に入れる）
+CATEGORY_NOTES: Dict[str, str] = {
+    "income": "※「○○収入」という表現は必ず income カテゴリです。",
+    "retirement": "※「年金」「退職金」「老後」に関する表現は retirement カテゴリです。",
+}
+
+AMOUNT_RULES = """\
+【金額の変換ルール】
+- 「1万円」→ 10000
+- 「10万円」→ 100000
+- 「30万円」→ 300000
+- 「100万円」→ 1000000
+- 「500万円」→ 5000000
+- 「2000万円」→ 20000000
+- 「1億円」→ 100000000"""
+
+
+def classify_categories(message: str) -> List[str]:
+    """
+    メッセージに関係しそうなカテゴリを、キーワードだけで選ぶ（AIは使わない）
+
+    どれにも当たらない場合は全カテゴリを返す（取りこぼし防止）
+    """
+    text = message.lower()
+    selected = [
+        category for category in CATEGORIES
+        if any(keyword in text for keyword in CATEGORY_KEYWORDS[category])
+    ]
+    return selected or list(CATEGORIES)
+
+
+def build_extraction_prompt(message: str, categories: Sequence[str] = CATEGORIES) -> str:
+    """選んだカテゴリの説明だけで、情報抽出のプロンプトを組み立てる"""
+    categories = [category for category in CATEGORIES if category in categories]
+
+    prompt = "\n以下のユーザーのメッセージを分析して、該当する情報を各カテゴリに振り分けてください。\n\n"
+    prompt += f"【ユーザーのメッセージ】\n{message}\n\n"
+
+    # 判定の優先順位は、迷う可能性がある（関係するカテゴリが2つ以上ある）時だけ必要
+    rules = [rule for category, rule in PRIORITY_RULES if category in categories]
+    if len(rules) >= 2:
+        prompt += "【重要：判定優先順位】\n"
+        prompt += "\n".join(f"{i}. {rule}" for i, rule in enumerate(rules, 1)) + "\n\n"
+
+    prompt += "【振り分けるカテゴリと必須フィールド】\n\n"
+    prompt += "\n\n".join(
+        f"{i}. {CATEGORY_PROMPTS[category].rstrip()}" for i, category in enumerate(categories, 1)
+    ) + "\n\n"
+
+    prompt += AMOUNT_RULES + "\n\n"
+    prompt += "【出力形式】\n該当情報がある場合（必ずJSONのみ）：\n{\n  "
+    examples = [example for category, example in OUTPUT_EXAMPLES.items() if category in categories]
+    prompt += ",\n  ".join(examples[:MAX_OUTPUT_EXAMPLES])
+    prompt += "\n}\n\n該当情報がない場合：\n{}\n\n※説明文は一切不要です。JSONのみを返してください。\n"
+    for category in categories:
+        if category in CATEGORY_NOTES:
+            prompt += CATEGORY_NOTES[category] + "\n"
+    return prompt
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    トークン数のおおよその見積もり（APIを呼ばずにログに出す用）
+
+    日本語などの全角文字は1文字 ≒ 1トークン、英数字・記号は4文字 ≒ 1トークンとして数える
+    """
+    ascii_chars = len(re.findall(r"[\x00-\x7f]", text))
+    return (len(text) - ascii_chars) + ascii_chars // 4
@@ -0,0 +1,135 @@
+# 偽の Gemini（負荷試験・ローカル開発用）
+# 初心者向け解説：本物の Gemini を呼ばずに、それらしい応答を返すモデル
+#
+# なぜ必要なのか：
+# - 負荷試験で本物の Gemini を呼ぶと、すぐに利用上限（クォータ）を使い切ってしまう
+# - 応答時間やエラーの割合を自由に変えて、遅い時・障害時のアプリの動きを確かめられる
+#
+# 使い方（.env）：
+#   LLM_BACKEND=fake
+#   LLM_FAKE_LATENCY_MS=800          # 応答時間の中央値
+#   LLM_FAKE_LATENCY_P95_MS=2500     # 応答時間の95パーセンタイル（対数正規分布）
+#   LLM_FAKE_ERROR_RATE=0.05         # 5% の呼び出しを失敗させる
+#   LLM_FAKE_ERROR_KIND=quota        # 失敗の種類（unavailable / quota）
+#   LLM_FAKE_RESPONSES_FILE=fake_responses.jsonl  # 用意した応答（任意）
+#
+# 用意した応答のファイル（1行に1つの JSON。上から順に、プロンプトに contains を含む最初の行を使う）：
+#   {"contains": "老後", "text": "老後資金は…"}
+#
+# 注目ポイント：
+# - google.generativeai.GenerativeModel と同じ generate_content / generate_content_async を持つので、
+#   app/services/llm.py の model と差し替えるだけで使える
+# - 情報抽出のプロンプトには、ローカル抽出（正規表現）の結果を JSON で返す（登録処理まで通しで動く）
+
+import asyncio
+import json
+import math
+import random
+import time
+from typing import List, NamedTuple, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from app.services.extraction_prompts import estimate_tokens
+from app.services.local_extractor import extract_locally
+
+FAKE_SUGGESTIONS = {
+    "summary": "（テスト用の応答）収支は安定しています。",
+    "improvement_points": ["固定費を見直しましょう", "貯蓄率を上げましょう", "資産を分散しましょう"],
+    "action_items": ["家計簿をつける", "先取り貯蓄を設定する", "積立投資を始める"],
+    "risk_alerts": ["急な出費に備えましょう", "教育費の増加に注意しましょう"],
+}
+
+
+class FakeUsage(NamedTuple):
+    """response.usage_metadata の代わり"""
+    prompt_token_count: int
+    candidates_token_count: int
+    total_token_count: int
+
+
+class FakeResponse:
+    """generate_content の戻り値の代わり（text と usage_metadata だけ）"""
+
+    def __init__(self, prompt: str, text: str):
+        self.text = text
+        prompt_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        self.usage_metadata = FakeUsage(prompt_tokens, output_tokens, prompt_tokens + output_tokens)
+
+
+class FakeGenerativeModel:
+    """偽の GenerativeModel"""
+
+    def __init__(
+        self,
+        latency_ms: float = 800,
+        latency_p95_ms: float = 2500,
+        error_rate: float = 0.0,
+        error_kind: str = "unavailable",
+        responses_file: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        # 対数正規分布の広がり：p95 = 中央値 × exp(1.645σ)
+        self.sigma = math.log(latency_p95_ms / latency_ms) / 1.645 if latency_p95_ms > latency_ms > 0 else 0.0
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self.random = random.Random(seed)
+        self.recorded = self._load_responses(responses_file) if responses_file else []
+
+    @classmethod
+    def from_settings(cls, settings) -> "FakeGenerativeModel":
+        return cls(
+            latency_ms=settings.LLM_FAKE_LATENCY_MS,
+            latency_p95_ms=settings.LLM_FAKE_LATENCY_P95_MS,
+            error_rate=settings.LLM_FAKE_ERROR_RATE,
+            error_kind=settings.LLM_FAKE_ERROR_KIND,
+            responses_file=settings.LLM_FAKE_RESPONSES_FILE or None,
+        )
+
+    @staticmethod
+    def _load_responses(path: str) -> List[dict]:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _latency_seconds(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.latency_ms * math.exp(self.random.gauss(0, self.sigma)) / 1000
+
+    def _maybe_fail(self):
+        if self.random.random() < self.error_rate:
+            if self.error_kind == "quota":
+                raise google_exceptions.ResourceExhausted("Resource has been exhausted (e.g. check quota). [fake]")
+            raise google_exceptions.ServiceUnavailable("The service is currently unavailable. [fake]")
+
+    def _respond(self, prompt: str) -> str:
+        """プロンプトの種類に応じた応答"""
+        for entry in self.recorded:
+            if entry.get("contains", "") in prompt:
+                return entry["text"]
+
+        if "【ユーザーのメッセージ】" in prompt:  # 情報抽出（extract_all_info）
+            message = prompt.split("【ユーザーのメッセージ】\n", 1)[1].split("\n\n", 1)[0]
+            return json.dumps(extract_locally(message), ensure_ascii=False)
+        if "NO_INCOME" in prompt or "NO_ASSET" in prompt:  # 収入・資産だけの抽出
+            category, empty = ("income", "NO_INCOME") if "NO_INCOME" in prompt else ("asset", "NO_ASSET")
+            message = prompt.split("メッセージ: ", 1)[-1].split("\n", 1)[0]
+            info = extract_locally(message, [category]).get(category)
+            return json.dumps(info, ensure_ascii=False) if info else empty
+        if "会話の要約を更新" in prompt:
+            return "（テスト用の要約）ユーザーは家計と老後資金について相談している。"
+        if "ファイナンシャルプランナー" in prompt:
+            return json.dumps(FAKE_SUGGESTIONS, ensure_ascii=False)
+        return "（テスト用の応答）ご相談ありがとうございます。収支のバランスを定期的に見直しましょう。"
+
+    async def generate_content_async(self, prompt: str, request_options=None) -> FakeResponse:
+        await asyncio.sleep(self._latency_seconds())
+        self._maybe_fail()
+        return FakeResponse(prompt, self._respond(prompt))
+
+    def generate_content(self, prompt: str, request_options=None) -> FakeResponse:
+        time.sleep(self._latency_seconds())
+        self._maybe_fail()
+        return FakeResponse(prompt, self._respond(prompt))
@@ -0,0 +1,225 @@
+# 家計サマリーの集計
+# 初心者向け解説：user_financial_summary テーブルの1行を、元データから作り直す処理
+#
+# 呼ばれるタイミング：
+# - 資産・収入・支出などの行が変わった flush の直後（app/models/data_version.py のフック）
+#   → 元データの変更と同じトランザクションなので、サマリーだけ古いまま残ることがない
+# - サマリー行がまだないユーザーが初めて読むとき（get_financial_summary）
+#
+# 注目ポイント：
+# - flush の途中で呼ばれるので、ORMではなく Core（select / insert / update 文）だけで処理する
+# - 全部を毎回集計し直すと1回の flush で十数クエリになるので、変わったテーブルの分（SECTIONS）だけを集計する
+# - 同じユーザーへの同時の書き込みは、サマリー行のロック（lock_financial_summary）で順番に処理する
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset
+from app.models.career import Career
+from app.models.education import Education
+from app.models.expense import Expense
+from app.models.family import FamilyMember
+from app.models.financial_summary import UserFinancialSummary
+from app.models.house import House
+from app.models.income import Income
+from app.models.retirement import Retirement
+from app.models.risk import Risk
+from app.models.user import User
+from app.services.timeline import LOAN_TYPES, MONTHLY_OCCURRENCES, calc_loan_balance
+
+MONTHLY_INCOME_TYPES = ['月収', '月給']
+
+
+def _locking(stmt):
+    """
+    最新のコミット済みの行を読む（ロック読み取り。MySQL では LOCK IN SHARE MODE）
+
+    なぜ：MySQL（REPEATABLE READ）の普通の SELECT は、トランザクションで最初に読んだ時点の
+    スナップショットを読む。サマリー行のロックを待っている間に他のリクエストがコミットした行が見えず、
+    その行を含まない集計で上書きしてしまう（SQLite では何も付かない）
+    """
+    return stmt.with_for_update(read=True)
+
+
+def _sum_and_count(connection: Connection, model, user_id: int):
+    """amount の合計と件数を1クエリで取得"""
+    total, count = connection.execute(
+        _locking(select(func.coalesce(func.sum(model.amount), 0), func.count(model.id))
+                 .where(model.user_id == user_id))
+    ).one()
+    return float(total), int(count)
+
+
+def _count(connection: Connection, model, user_id: int) -> int:
+    return int(connection.execute(
+        _locking(select(func.count(model.id)).where(model.user_id == user_id))
+    ).scalar())
+
+
+def _annual_total(rows, monthly_types=()) -> float:
+    """月額の行は12倍して年額に換算した合計"""
+    total = 0.0
+    for row in rows:
+        if row.occurrence_type in MONTHLY_OCCURRENCES or row.type_name in monthly_types:
+            total += row.amount * 12
+        else:
+            total += row.amount
+    return total
+
+
+def _housing_loan_balance(connection: Connection, user_id: int, now: datetime) -> float:
+    """購入済み（購入年が今年以前）の住宅ローンの現在の残高合計"""
+    rows = connection.execute(
+        _locking(select(
+            House.amount, House.down_payment, House.loan_rate, House.loan_term,
+            House.purchase_year, House.start_date
+        ).where(House.user_id == user_id, House.house_type.in_(LOAN_TYPES)))
+    ).all()
+
+    balance = 0.0
+    for row in rows:
+        if not (row.purchase_year and row.loan_term and row.amount) or row.purchase_year > now.year:
+            continue
+        purchase_month = 1
+        if row.start_date and row.start_date.year == row.purchase_year:
+            purchase_month = row.start_date.month
+        months_paid = (now.year - row.purchase_year) * 12 + (now.month - purchase_month)
+        balance += calc_loan_balance(
+            row.amount - (row.down_payment or 0), row.loan_rate, row.loan_term, months_paid
+        )
+    return balance
+
+
+# ===== セクションごとの集計（テーブル1つ分 → サマリーの列） =====
+
+def _asset_section(connection: Connection, user_id: int, now: datetime) -> dict:
+    total_assets, asset_count = _sum_and_count(connection, Asset, user_id)
+    return {"total_assets": total_assets, "asset_count": asset_count}
+
+
+def _income_section(connection: Connection, user_id: int, now: datetime) -> dict:
+    incomes = connection.execute(
+        _locking(select(Income.income_type.label("type_name"), Income.occurrence_type, Income.amount)
+                 .where(Income.user_id == user_id))
+    ).all()
+    return {"annual_income": _annual_total(incomes, MONTHLY_INCOME_TYPES), "income_count": len(incomes)}
+
+
+def _expense_section(connection: Connection, user_id: int, now: datetime) -> dict:
+    expenses = connection.execute(
+        _locking(select(Expense.expense_type.label("type_name"), Expense.occurrence_type, Expense.amount)
+                 .where(Expense.user_id == user_id))
+    ).all()
+    return {"annual_expense": _annual_total(expenses), "expense_count": len(expenses)}
+
+
+def _house_section(connection: Connection, user_id: int, now: datetime) -> dict:
+    house_total, house_count = _sum_and_count(connection, House, user_id)
+    return {
+        "house_total": house_total,
+        "house_count": house_count,
+        "housing_loan_balance": _housing_loan_balance(connection, user_id, now),
+    }
+
+
+def _total_section(model, prefix: str):
+    """合計と件数だけのセクション（教育費・リスク・老後）"""
+    def section(connection: Connection, user_id: int, now: datetime) -> dict:
+        total, count = _sum_and_count(connection, model, user_id)
+        return {f"{prefix}_total": total, f"{prefix}_count": count}
+    return section
+
+
+def _count_section(model, column: str):
+    """件数だけのセクション（キャリア・家族）"""
+    def section(connection: Connection, user_id: int, now: datetime) -> dict:
+        return {column: _count(connection, model, user_id)}
+    return section
+
+
+# どのモデルが変わったら、どの列を集計し直すか
+SECTIONS = {
+    Asset: _asset_section,
+    Income: _income_section,
+    Expense: _expense_section,
+    House: _house_section,
+    Education: _total_section(Education, "education"),
+    Risk: _total_section(Risk, "risk"),
+    Retirement: _total_section(Retirement, "retirement"),
+    Career: _count_section(Career, "career_count"),
+    FamilyMember: _count_section(FamilyMember, "family_count"),
+}
+
+
+def lock_financial_summary(connection: Connection, user_id: int):
+    """
+    サマリー行をロックして読む（SELECT ... FOR UPDATE。行がなければ None）
+
+    app/models/data_version.py の before_flush（元データを書き込む前）で呼ぶ
+    → 同じユーザーへの書き込みが同時に来ても、後から来た方は先の方のコミットまで待ってから書き込み・集計する
+    （書き込んだ後でロックを取ると、お互いの書き込み途中の行を待ち合ってデッドロックになる）
+    """
+    return connection.execute(
+        select(UserFinancialSummary).where(UserFinancialSummary.user_id == user_id).with_for_update()
+    ).first()
+
+
+def refresh_financial_summary(connection: Connection, user_id: int, models: Optional[Iterable] = None):
+    """
+    1ユーザー分のサマリーを元データから集計し直して保存
+
+    models：変わったモデル（Asset, Income など）。その分の列だけを集計し直す。
+            None、またはサマリー行がまだない場合は全部を集計する
+    """
+    now = datetime.now()
+    data_version = connection.execute(
+        select(User.data_version).where(User.id == user_id)
+    ).scalar()
+    if data_version is None:
+        return  # ユーザー自体が削除された
+
+    current = lock_financial_summary(connection, user_id)
+    if models is None or current is None:
+        sections = list(SECTIONS.values())
+    else:
+        sections = [SECTIONS[model] for model in models if model in SECTIONS]
+
+    values = {}
+    for section in sections:
+        values.update(section(connection, user_id, now))
+
+    # 合計から計算する列は、今回集計しなかった側は保存済みの値を使う
+    def value(column: str) -> float:
+        return values[column] if column in values else getattr(current, column)
+
+    values["annual_net_cashflow"] = value("annual_income") - value("annual_expense")
+    values["net_worth"] = value("total_assets") - value("housing_loan_balance")
+    values["data_version"] = data_version
+    values["updated_at"] = datetime.utcnow()
+
+    if current is not None:
+        connection.execute(
+            update(UserFinancialSummary)
+            .where(UserFinancialSummary.user_id == user_id)
+            .values(**values)
+        )
+    else:
+        connection.execute(insert(UserFinancialSummary).values(user_id=user_id, **values))
+
+
+def get_financial_summary(db: Session, user_id: int) -> Optional[UserFinancialSummary]:
+    """
+    サマリーを取得
+
+    この機能より前からいるユーザーは行がないので、初回だけここで作る
+    """
+    summary = db.get(UserFinancialSummary, user_id)
+    if summary is None:
+        refresh_financial_summary(db.connection(), user_id)
+        db.commit()
+        summary = db.get(UserFinancialSummary, user_id)
+    return summary
@@ -0,0 +1,450 @@
+# バックグラウンドジョブキュー
+# 初心者向け解説：AI分析などの重い処理を、リクエストとは別に実行する仕組み
+#
+# なぜ必要なのか：
+# - AI分析は数秒〜数十秒かかる。リクエストの中で待つとタイムアウトやワーカー枯渇の原因になる
+# - 「ジョブを登録 → すぐにIDを返す → 状態をポーリングで確認」という流れにする
+#
+# 構成：
+# - JobQueue      ：asyncio のワーカー（JOB_WORKERS 個）がキューからジョブを取り出して実行
+# - MemoryJobStore：ジョブの状態をプロセス内の dict に保存（開発・1ワーカー向け）
+# - RedisJobStore ：ジョブの状態を Redis 互換サーバーに保存（gunicorn 複数ワーカー向け）
+#                   どのワーカーに状態確認・キャンセルが届いても同じ結果になる
+#
+# ジョブの状態：queued → running → succeeded / failed / cancelled
+#
+# 注目ポイント：状態の移り変わりは「今の状態が○○なら書き換える」（transition）で行う
+# → 別ワーカーのキャンセルと実行開始が同時に来ても、どちらか片方だけが成功する
+
+import asyncio
+import json
+import time
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class UnknownJobType(Exception):
+    """登録されていないジョブ種別が指定された"""
+
+
+class JobLimitExceeded(Exception):
+    """ユーザーごとの同時実行数の上限を超えた"""
+
+
+class JobContext:
+    """
+    ジョブ実行中にハンドラへ渡されるオブジェクト
+
+    使い方例：
+    async def handler(params, context):
+        await context.set_progress(50)
+        if await context.is_cancelled():
+            return None
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: str, user_id: int):
+        self._queue = queue
+        self.job_id = job_id
+        self.user_id = user_id
+
+    async def set_progress(self, progress: int, message: Optional[str] = None):
+        """進捗（0〜100）を更新"""
+        fields = {"progress": max(0, min(int(progress), 100))}
+        if message is not None:
+            fields["message"] = message
+        await self._queue.store.update(self.job_id, **fields)
+
+    async def is_cancelled(self) -> bool:
+        """別のワーカー経由でキャンセルされていないか確認"""
+        job = await self._queue.store.get(self.job_id)
+        return bool(job and job.get("cancel_requested"))
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Awaitable[Any]]
+
+
+class MemoryJobStore:
+    """プロセス内の dict にジョブを保存するストア"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def create(self, job: Dict[str, Any]):
+        self._purge_expired()
+        self._jobs[job["id"]] = job
+
+    async def create_if_allowed(self, job: Dict[str, Any], max_active: int) -> bool:
+        """未完了のジョブが max_active 件未満の場合だけ登録（登録したら True）"""
+        # 途中に await がないので、確認と登録の間に他のリクエストが割り込むことはない
+        self._purge_expired()
+        if self._count_active(job["user_id"]) >= max_active:
+            return False
+        self._jobs[job["id"]] = job
+        return True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._purge_expired()
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def update(self, job_id: str, **fields):
+        if job_id in self._jobs:
+            self._jobs[job_id].update(fields)
+
+    async def transition(self, job_id: str, from_statuses, **fields) -> bool:
+        """状態が from_statuses のどれかの場合だけ書き換える（書き換えたら True）"""
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] not in from_statuses:
+            return False
+        job.update(fields)
+        return True
+
+    async def count_active(self, user_id: int) -> int:
+        return self._count_active(user_id)
+
+    def _count_active(self, user_id: int) -> int:
+        return sum(
+            1 for job in self._jobs.values()
+            if job["user_id"] == user_id and job["status"] in ACTIVE_STATUSES
+        )
+
+    async def list_for_user(self, user_id: int) -> List[Dict[str, Any]]:
+        self._purge_expired()
+        return [dict(job) for job in self._jobs.values() if job["user_id"] == user_id]
+
+    async def close(self):
+        pass
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.get("expires_at") and job["expires_at"] <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class RedisJobStore:
+    """
+    Redis 互換サーバーにジョブを保存するストア
+
+    キー設計：
+    - jobstate:{id}         ：ジョブ本体（ハッシュ。フィールドごとに値を JSON で保存。完了後は TTL 付き）
+    - jobs:user:{user_id}   ：そのユーザーのジョブIDの集合
+    - jobs:active:{user_id} ：そのユーザーの未完了（queued / running）のジョブIDの集合（同時実行数の上限用）
+
+    なぜハッシュ：更新したいフィールドだけを HSET で書き換えるため。
+    ジョブ全体を読んで書き戻すと、同時に動いた更新（進捗の更新とキャンセルなど）の片方が消える
+    （以前の job:{id} は JSON 文字列だったので、キーの名前も変えている）
+
+    「確認してから書き込む」処理（上限の確認と登録、状態の移り変わり）は WATCH / MULTI で行う：
+    確認した後に他のワーカーが同じキーを書き換えていたら EXEC が失敗（WatchError）するので、読み直してやり直す
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError(
+                "JOB_BACKEND=redis には redis パッケージが必要です（pip install redis）"
+            ) from e
+        from redis.exceptions import WatchError
+
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._watch_error = WatchError
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"jobstate:{job_id}"
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+        return {name: json.dumps(value, ensure_ascii=False) for name, value in fields.items()}
+
+    @staticmethod
+    def _user_key(user_id: int) -> str:
+        return f"jobs:user:{user_id}"
+
+    @staticmethod
+    def _active_key(user_id: int) -> str:
+        return f"jobs:active:{user_id}"
+
+    async def create(self, job: Dict[str, Any]):
+        await self._redis.hset(self._key(job["id"]), mapping=self._encode(job))
+        await self._redis.sadd(self._user_key(job["user_id"]), job["id"])
+
+    async def create_if_allowed(self, job: Dict[str, Any], max_active: int) -> bool:
+        """未完了のジョブが max_active 件未満の場合だけ登録（登録したら True）"""
+        active_key = self._active_key(job["user_id"])
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(active_key)
+                    active_ids = await pipe.smembers(active_key)
+                    # TTL切れ・完了済みのIDは数えない（集合から消し忘れたものの掃除）
+                    stale = []
+                    for job_id in active_ids:
+                        status = await pipe.hget(self._key(job_id), "status")
+                        if status is None or json.loads(status) not in ACTIVE_STATUSES:
+                            stale.append(job_id)
+                    if len(active_ids) - len(stale) >= max_active:
+                        return False
+                    pipe.multi()
+                    if stale:
+                        pipe.srem(active_key, *stale)
+                    pipe.hset(self._key(job["id"]), mapping=self._encode(job))
+                    pipe.sadd(self._user_key(job["user_id"]), job["id"])
+                    pipe.sadd(active_key, job["id"])
+                    await pipe.execute()
+                    return True
+                except self._watch_error:
+                    continue  # 同時に別のジョブが登録・完了した → 数え直す
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.hgetall(self._key(job_id))
+        return {name: json.loads(value) for name, value in raw.items()} if raw else None
+
+    async def update(self, job_id: str, **fields):
+        key = self._key(job_id)
+        if not await self._redis.exists(key):
+            return  # TTL切れ（途中のフィールドだけのハッシュを作らない）
+        # 渡されたフィールドだけを書き換える（他のフィールドは読まないので、同時の更新を上書きしない）
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=self._encode(fields))
+            if fields.get("expires_at"):
+                pipe.expire(key, max(int(fields["expires_at"] - time.time()), 1))
+            await pipe.execute()
+
+    async def transition(self, job_id: str, from_statuses, **fields) -> bool:
+        """状態が from_statuses のどれかの場合だけ書き換える（書き換えたら True）"""
+        key = self._key(job_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    status, user_id = await pipe.hmget(key, "status", "user_id")
+                    if status is None or json.loads(status) not in from_statuses:
+                        return False
+                    pipe.multi()
+                    pipe.hset(key, mapping=self._encode(fields))
+                    if fields.get("expires_at"):
+                        pipe.expire(key, max(int(fields["expires_at"] - time.time()), 1))
+                    if fields.get("status", "queued") not in ACTIVE_STATUSES:
+                        # 完了したので、同時実行数の枠を空ける
+                        pipe.srem(self._active_key(json.loads(user_id)), job_id)
+                    await pipe.execute()
+                    return True
+                except self._watch_error:
+                    continue  # 確認した後に別のワーカーが書き換えた → 読み直す
+
+    async def list_for_user(self, user_id: int) -> List[Dict[str, Any]]:
+        jobs = []
+        for job_id in await self._redis.smembers(self._user_key(user_id)):
+            job = await self.get(job_id)
+            if job is None:
+                # TTL切れのジョブはIDの集合からも消す
+                await self._redis.srem(self._user_key(user_id), job_id)
+            else:
+                jobs.append(job)
+        return jobs
+
+    async def count_active(self, user_id: int) -> int:
+        jobs = await self.list_for_user(user_id)
+        return sum(1 for job in jobs if job["status"] in ACTIVE_STATUSES)
+
+    async def close(self):
+        await self._redis.close()
+
+
+class JobQueue:
+    """
+    asyncio ワーカープールでジョブを実行するキュー
+
+    注目ポイント：
+    - ジョブの実行は、登録を受け付けたプロセスのワーカーが行う
+    - 状態はストアに保存するので、Redis を使えば別ワーカーからも確認・キャンセルできる
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+        self.store = None
+
+    def register(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """
+        ジョブ種別を登録するデコレーター
+
+        使い方例：
+        @job_queue.register("ai_suggestions")
+        async def run_ai_suggestions(params, context):
+            ...
+        """
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._handlers[job_type] = handler
+            return handler
+        return decorator
+
+    @property
+    def job_types(self) -> List[str]:
+        return sorted(self._handlers)
+
+    async def start(self):
+        """ワーカーを起動（アプリ起動時に1回呼ぶ）"""
+        if self._workers:
+            return
+        self._stopping = False
+        if settings.JOB_BACKEND == "redis":
+            self.store = RedisJobStore(settings.REDIS_URL)
+        else:
+            self.store = MemoryJobStore()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(max(settings.JOB_WORKERS, 1))
+        ]
+
+    async def stop(self):
+        """ワーカーを停止（アプリ終了時に呼ぶ）"""
+        self._stopping = True
+        for task in list(self._running.values()) + self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._running = {}
+        if self.store is not None:
+            await self.store.close()
+
+    async def submit(self, user_id: int, job_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """ジョブを登録してキューに入れる"""
+        if job_type not in self._handlers:
+            raise UnknownJobType(job_type)
+        if self.store is None:
+            await self.start()
+        job = {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "job_type": job_type,
+            "params": params or {},
+            "status": "queued",
+            "progress": 0,
+            "message": None,
+            "result": None,
+            "error": None,
+            "cancel_requested": False,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None,
+        }
+        # 上限の確認と登録は一度に行う（別々だと、同時に来た2つのリクエストが両方とも上限を通り抜ける）
+        if not await self.store.create_if_allowed(job, settings.JOB_MAX_CONCURRENT_PER_USER):
+            raise JobLimitExceeded(user_id)
+        await self._queue.put(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if self.store is None:
+            return None
+        return await self.store.get(job_id)
+
+    async def list_for_user(self, user_id: int) -> List[Dict[str, Any]]:
+        if self.store is None:
+            return []
+        jobs = await self.store.list_for_user(user_id)
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        ジョブをキャンセル
+
+        - まず cancel_requested を立てる（この後に別のワーカーで実行が始まっても、ハンドラが気づける）
+        - 待機中：その場で cancelled にする
+        - 実行中：このプロセスで実行中ならタスクを止める。
+                  別プロセスの場合は、ハンドラ側で cancel_requested を確認してもらう
+        """
+        if not await self.store.transition(job_id, ACTIVE_STATUSES, cancel_requested=True):
+            return await self.get(job_id)  # 見つからない or 完了済み
+
+        # queued のままの場合だけ cancelled にする（同時に実行が始まっていたら失敗する）
+        if not await self._finish(job_id, "cancelled", from_statuses=("queued",)):
+            task = self._running.get(job_id)
+            if task is not None:
+                task.cancel()
+        return await self.get(job_id)
+
+    async def _finish(
+        self, job_id: str, status: str, result: Any = None, error: Optional[str] = None,
+        from_statuses=("running",),
+    ) -> bool:
+        """
+        ジョブを完了状態にして、結果の保持期限（TTL）を設定
+
+        状態が from_statuses の場合だけ書き換える（キャンセル済みのジョブを succeeded で上書きしない）
+        """
+        now = time.time()
+        fields = {
+            "status": status,
+            "finished_at": now,
+            "expires_at": now + settings.JOB_RESULT_TTL_SECONDS,
+            "result": result,
+            "error": error,
+        }
+        if status == "succeeded":
+            fields["progress"] = 100
+        return await self.store.transition(job_id, from_statuses, **fields)
+
+    async def _worker(self):
+        """キューからジョブを取り出して順に実行するワーカー"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await self.store.get(job_id)
+        # queued → running も状態を確認しながら書き換える（同時に来たキャンセルとどちらか片方だけが成功する）
+        if job is None or not await self.store.transition(
+            job_id, ("queued",), status="running", started_at=time.time()
+        ):
+            return  # キャンセル済み or TTL切れ
+
+        context = JobContext(self, job_id, job["user_id"])
+        if await context.is_cancelled():
+            # 実行を始める直前にキャンセルが届いた
+            await self._finish(job_id, "cancelled")
+            return
+        task = asyncio.create_task(self._handlers[job["job_type"]](job["params"], context))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if self._stopping or not task.cancelled():
+                raise  # ワーカー自体の停止
+            await self._finish(job_id, "cancelled")
+        except Exception as e:
+            print(f"ジョブ実行エラー ({job['job_type']}): {e}")
+            traceback.print_exc()
+            await self._finish(job_id, "failed", error=str(e))
+        else:
+            if await context.is_cancelled():
+                await self._finish(job_id, "cancelled")
+            else:
+                await self._finish(job_id, "succeeded", result=result)
+        finally:
+            self._running.pop(job_id, None)
+
+
+# シングルトンインスタンス（アプリ全体で1つだけ作る）
+job_queue = JobQueue()
@@ -0,0 +1,446 @@
+# LLM（Gemini）呼び出しの共通窓口
+# 初心者向け解説：アプリ内のすべての Gemini 呼び出しはここを通る
+#
+# ここで行うこと：
+# 1. レート制限（トークンバケット）：1分あたりの呼び出し回数を利用上限（クォータ）以内に抑える
+# 2. サーキットブレーカー：失敗が続いたら、しばらく Gemini を呼ばずにすぐ「使えない」と返す
+#    → 呼び出し側は待たずに予備の処理（ローカル抽出・定型の提案など）に切り替えられる
+# 3. タイムアウト：応答が遅すぎる呼び出しを LLM_TIMEOUT_SECONDS で打ち切る
+# 4. メトリクス：成功・失敗・拒否・予備処理の回数と、ブレーカーの状態を数える（GET /metrics）
+#    呼び出しごとの応答時間・プロンプトの文字数・トークン数・JSON のパース結果も集計する
+#    （GET /api/admin/llm-stats：どのプロンプトが時間とクォータを使っているかを調べる）
+#
+# サーキットブレーカーの状態：
+#   closed（通常）     ─ 連続 LLM_CIRCUIT_FAILURE_THRESHOLD 回失敗 / 利用上限エラー ─→ open
+#   open（遮断中）     ─ LLM_CIRCUIT_RECOVERY_SECONDS 秒後 ─→ half_open
+#   half_open（お試し）─ 1回だけ呼んでみて、成功 → closed / 失敗 → open
+#
+# 注意：状態はプロセスごと。LLM_RATE_LIMIT_PER_MINUTE / BURST はアプリ全体の値なので、
+#       各ワーカーは WEB_CONCURRENCY で割った値を使う（全ワーカーの合計がクォータを超えない）
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from app.config import settings
+from app.services.extraction_prompts import estimate_tokens
+
+
+class LLMClient(NamedTuple):
+    """LLM の呼び出し先（LLM_BACKEND で切り替え）"""
+    model: Any  # generate_content_async を持つモデル（replay の時は None）
+    replayer: Any  # 記録した応答の再生（app/services/llm_recording.py。replay の時だけ）
+    recorder: Any  # 成功した呼び出しの記録（LLM_RECORD_FILE がある時だけ）
+
+
+# === LLM クライアントは最初に使う時に作る ===
+# なぜ読み込み時に作らないのか：
+# - google.generativeai の読み込み（1秒近く）と API の設定を、ワーカーの起動時に払わないため
+#   （gunicorn のワーカーごと・Azure のスケールアウトや再起動のたびにかかっていた）
+# - 起動後に lifespan（app/main.py）が別スレッドで warm_up() を呼ぶので、
+#   最初のチャットが読み込みを待つことも普通はない
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def _create_client() -> LLMClient:
+    replayer = None
+    model = None
+    if settings.LLM_BACKEND == "fake":
+        # 負荷試験・ローカル開発用：本物の Gemini を呼ばない（app/services/fake_llm.py）
+        from app.services.fake_llm import FakeGenerativeModel
+        model = FakeGenerativeModel.from_settings(settings)
+    elif settings.LLM_BACKEND == "replay":
+        # 性能試験用：記録した応答を返す（Gemini は呼ばない）
+        from app.services.llm_recording import LLMReplayer
+        replayer = LLMReplayer.from_file(settings.LLM_REPLAY_FILE, settings.LLM_REPLAY_LATENCY)
+    else:
+        import google.generativeai as genai
+
+        # === Gemini API の初期化 ===
+        # なぜ configure が必要：APIキーを設定して認証
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+
+        # === モデルの選択 ===
+        # models/gemini-flash-latest：テキスト生成用の最新無料モデル
+        # なぜ gemini-flash-latest：無料版で使える、日本語対応、高速
+        model = genai.GenerativeModel('models/gemini-flash-latest')
+
+    recorder = None
+    if settings.LLM_RECORD_FILE:
+        from app.services.llm_recording import LLMRecorder
+        recorder = LLMRecorder(settings.LLM_RECORD_FILE)
+    return LLMClient(model, replayer, recorder)
+
+
+def get_client() -> LLMClient:
+    """LLM クライアント（プロセスで1つ。初めて呼ばれた時に作る）"""
+    global _client
+    if _client is None:
+        # warm_up() のスレッドとリクエストが同時に来ても、作るのは1回だけ
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+def warm_up():
+    """LLM クライアントを前もって作る（起動後に別スレッドで呼ぶ）"""
+    started = time.perf_counter()
+    try:
+        get_client()
+    except Exception as e:
+        # 失敗しても起動は止めない（最初の呼び出しでもう一度作ろうとする）
+        print(f"LLM クライアントの準備に失敗しました: {str(e)}")
+        return
+    print(f"🤖 LLM クライアント準備完了（{settings.LLM_BACKEND}）: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+class LLMUnavailableError(Exception):
+    """LLM を呼ばずに断った（呼び出し側は予備の処理に切り替える）"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """サーキットブレーカーが開いている"""
+
+
+class RateLimitedError(LLMUnavailableError):
+    """レート制限の待ち時間が長すぎる"""
+
+
+class TokenBucket:
+    """
+    トークンバケット方式のレート制限
+
+    - 1分あたり rate_per_minute 個のトークンが少しずつたまる（最大 burst 個）
+    - 1回の呼び出しでトークンを1個使う。足りなければたまるまで待つ
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate_per_second)
+        self.updated = now
+
+    async def acquire(self, max_wait: float) -> bool:
+        """トークンを1個取る（max_wait 秒より長く待つ必要があれば取らずに False）"""
+        self._refill()
+        # 先にトークンを予約する（マイナスは「待っている呼び出しの数」）
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return True
+        wait = -self.tokens / self.rate_per_second
+        if wait > max_wait:
+            self.tokens += 1  # 予約を取り消す
+            return False
+        await asyncio.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """サーキットブレーカー（closed / open / half_open）"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_seconds: float,
+        on_state_change: Optional[Callable[[str], None]] = None
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.on_state_change = on_state_change
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"⚡ LLM サーキットブレーカー: {self.state} → {state}")
+            self.state = state
+            if self.on_state_change:
+                self.on_state_change(state)
+
+    def allow(self) -> bool:
+        """今呼んでよいか（half_open では1回だけ許可）"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_seconds:
+                return False
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def release(self):
+        """allow() の後、呼ばずに終わった場合に half_open のお試し枠を返す"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.trial_in_flight = False
+        self._set_state(self.CLOSED)
+
+    def record_failure(self, trip: bool = False):
+        """失敗を記録（trip=True なら回数に関係なくすぐ開く。利用上限エラーなど）"""
+        self.failures += 1
+        self.trial_in_flight = False
+        if trip or self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+
+class LLMMetrics:
+    """LLM 呼び出しの回数・時間・トークン数・パース結果・ブレーカーの状態（プロセス内で集計）"""
+
+    OUTCOMES = ("success", "error", "rejected_open", "rejected_rate_limit")
+    PARSE_RESULTS = ("ok", "empty", "error")  # JSON を取り出せた / 見つからなかった / 壊れていた
+    LATENCY_WINDOW = 500  # パーセンタイルの計算に使う、直近の呼び出しの数
+
+    def __init__(self):
+        self.calls = defaultdict(int)  # (operation, outcome) → 回数
+        self.fallbacks = defaultdict(int)  # operation → 予備の処理を使った回数
+        self.latency_sum = defaultdict(float)  # operation → 合計秒数（成功・失敗した呼び出し）
+        self.latency_count = defaultdict(int)
+        self.latency_max = defaultdict(float)
+        self.recent_latency = defaultdict(lambda: deque(maxlen=self.LATENCY_WINDOW))
+        self.prompt_chars = defaultdict(int)  # operation → プロンプトの合計文字数
+        self.prompt_tokens = defaultdict(int)  # operation → 入力トークンの合計
+        self.response_tokens = defaultdict(int)  # operation → 出力トークンの合計
+        self.errors = defaultdict(int)  # (operation, 例外の種類) → 回数
+        self.parses = defaultdict(int)  # (operation, パース結果) → 回数
+        self.state_changes = defaultdict(int)  # 遷移先の状態 → 回数
+        self.state = CircuitBreaker.CLOSED
+
+    def record_call(self, operation: str, outcome: str, seconds: Optional[float] = None):
+        self.calls[(operation, outcome)] += 1
+        if seconds is not None:
+            self.latency_sum[operation] += seconds
+            self.latency_count[operation] += 1
+            self.latency_max[operation] = max(self.latency_max[operation], seconds)
+            self.recent_latency[operation].append(seconds)
+
+    def record_usage(self, operation: str, prompt_chars: int, prompt_tokens: int, response_tokens: int):
+        self.prompt_chars[operation] += prompt_chars
+        self.prompt_tokens[operation] += prompt_tokens
+        self.response_tokens[operation] += response_tokens
+
+    def record_error(self, operation: str, error: Exception):
+        self.errors[(operation, type(error).__name__)] += 1
+
+    def record_parse(self, operation: str, result: str):
+        self.parses[(operation, result)] += 1
+
+    def record_fallback(self, operation: str):
+        self.fallbacks[operation] += 1
+
+    def record_state(self, state: str):
+        self.state = state
+        self.state_changes[state] += 1
+
+    def operation_stats(self) -> List[Dict]:
+        """operation ごとの集計（合計時間の長い順 ＝ 時間を使っている順）"""
+        # 注意：defaultdict に存在しないキーで [] を使うと 0 の行が増えるので .get で読む
+        operations = {op for op, _ in self.calls} | set(self.fallbacks)
+        stats = []
+        for op in operations:
+            count = self.latency_count.get(op, 0)
+            total = self.latency_sum.get(op, 0.0)
+            recent = sorted(self.recent_latency.get(op, ()))
+            successes = self.calls.get((op, "success"), 0)
+            prompt_chars = self.prompt_chars.get(op, 0)
+            prompt_tokens = self.prompt_tokens.get(op, 0)
+            stats.append({
+                "operation": op,
+                "calls": {outcome: n for outcome in self.OUTCOMES if (n := self.calls.get((op, outcome)))},
+                "fallbacks": self.fallbacks.get(op, 0),
+                "errors": {kind: n for (error_op, kind), n in sorted(self.errors.items()) if error_op == op},
+                "latency_total_seconds": round(total, 3),
+                "latency_avg_ms": round(total / count * 1000, 1) if count else None,
+                "latency_p50_ms": round(recent[len(recent) // 2] * 1000, 1) if recent else None,
+                "latency_p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 1) if recent else None,
+                "latency_max_ms": round(self.latency_max.get(op, 0.0) * 1000, 1) if count else None,
+                "prompt_chars_total": prompt_chars,
+                "prompt_chars_avg": round(prompt_chars / successes) if successes else None,
+                "prompt_tokens_total": prompt_tokens,
+                "prompt_tokens_avg": round(prompt_tokens / successes) if successes else None,
+                "response_tokens_total": self.response_tokens.get(op, 0),
+                "parse": {result: n for result in self.PARSE_RESULTS if (n := self.parses.get((op, result)))},
+            })
+        stats.sort(key=lambda row: row["latency_total_seconds"], reverse=True)
+        return stats
+
+    def snapshot(self) -> Dict:
+        """JSON で返す用"""
+        return {
+            "circuit_state": self.state,
+            "calls": {f"{op}:{outcome}": count for (op, outcome), count in sorted(self.calls.items())},
+            "fallbacks": dict(sorted(self.fallbacks.items())),
+            "state_changes": dict(sorted(self.state_changes.items())),
+            "operations": self.operation_stats(),
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus のテキスト形式"""
+        lines = [
+            "# HELP llm_circuit_state LLM circuit breaker state (1 = current state)",
+            "# TYPE llm_circuit_state gauge",
+        ]
+        for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+            lines.append(f'llm_circuit_state{{state="{state}"}} {1 if self.state == state else 0}')
+        lines += [
+            "# HELP llm_circuit_transitions_total LLM circuit breaker state transitions",
+            "# TYPE llm_circuit_transitions_total counter",
+        ]
+        for state, count in sorted(self.state_changes.items()):
+            lines.append(f'llm_circuit_transitions_total{{to="{state}"}} {count}')
+        lines += [
+            "# HELP llm_calls_total LLM calls by operation and outcome",
+            "# TYPE llm_calls_total counter",
+        ]
+        for (operation, outcome), count in sorted(self.calls.items()):
+            lines.append(f'llm_calls_total{{operation="{operation}",outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP llm_fallbacks_total Responses served by a local fallback instead of the LLM",
+            "# TYPE llm_fallbacks_total counter",
+        ]
+        for operation, count in sorted(self.fallbacks.items()):
+            lines.append(f'llm_fallbacks_total{{operation="{operation}"}} {count}')
+        lines += [
+            "# HELP llm_call_seconds Time spent in LLM calls",
+            "# TYPE llm_call_seconds summary",
+        ]
+        for operation in sorted(self.latency_count):
+            lines.append(f'llm_call_seconds_sum{{operation="{operation}"}} {self.latency_sum[operation]:.6f}')
+            lines.append(f'llm_call_seconds_count{{operation="{operation}"}} {self.latency_count[operation]}')
+        for name, values, help_text in (
+            ("llm_prompt_chars_total", self.prompt_chars, "Prompt characters sent to the LLM"),
+            ("llm_prompt_tokens_total", self.prompt_tokens, "Prompt tokens (reported by the API, or estimated)"),
+            ("llm_response_tokens_total", self.response_tokens, "Response tokens (reported by the API, or estimated)"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for operation, value in sorted(values.items()):
+                lines.append(f'{name}{{operation="{operation}"}} {value}')
+        lines += [
+            "# HELP llm_errors_total Failed LLM calls by exception type",
+            "# TYPE llm_errors_total counter",
+        ]
+        for (operation, kind), count in sorted(self.errors.items()):
+            lines.append(f'llm_errors_total{{operation="{operation}",type="{kind}"}} {count}')
+        lines += [
+            "# HELP llm_parse_total JSON extraction from LLM responses by result",
+            "# TYPE llm_parse_total counter",
+        ]
+        for (operation, result), count in sorted(self.parses.items()):
+            lines.append(f'llm_parse_total{{operation="{operation}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+llm_metrics = LLMMetrics()
+_web_workers = max(1, settings.WEB_CONCURRENCY)
+# まとめて呼べる回数は最低2回（チャット1回分：情報の抽出 + 返答の生成）
+rate_limiter = TokenBucket(
+    settings.LLM_RATE_LIMIT_PER_MINUTE / _web_workers,
+    max(2, settings.LLM_RATE_LIMIT_BURST // _web_workers)
+)
+circuit_breaker = CircuitBreaker(
+    settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+    settings.LLM_CIRCUIT_RECOVERY_SECONDS,
+    on_state_change=llm_metrics.record_state
+)
+
+
+def _is_quota_error(error: Exception) -> bool:
+    """利用上限（クォータ）のエラーか"""
+    # なぜ関数内でインポート：失敗した時しか使わないので、起動時に読み込まない
+    from google.api_core import exceptions as google_exceptions
+    return isinstance(error, google_exceptions.ResourceExhausted) or "quota" in str(error).lower()
+
+
+def _record_usage(operation: str, prompt: str, response):
+    """プロンプトの大きさとトークン数を記録（API が数を返さない時は見積もり）"""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+    response_tokens = getattr(usage, "candidates_token_count", None)
+    if response_tokens is None:
+        try:
+            response_tokens = estimate_tokens(response.text)
+        except ValueError:
+            response_tokens = 0  # 安全フィルタなどで本文がない応答
+    llm_metrics.record_usage(operation, len(prompt), prompt_tokens, response_tokens)
+
+
+def parse_response(operation: str, parse: Callable[[str], Any], text: str) -> Any:
+    """
+    応答テキストから JSON を取り出し、結果（ok / empty / error）を記録する
+
+    parse が空の値（None・{}）を返したら empty、ValueError（壊れた JSON）なら error として記録して投げ直す
+    """
+    try:
+        result = parse(text)
+    except ValueError:
+        llm_metrics.record_parse(operation, "error")
+        raise
+    llm_metrics.record_parse(operation, "ok" if result else "empty")
+    return result
+
+
+async def generate(prompt: str, operation: str):
+    """
+    Gemini でテキストを生成（レート制限・サーキットブレーカー・タイムアウト付き）
+
+    引数：
+        operation: 呼び出し元の名前（メトリクスの集計単位。例 "extract_all_info"）
+
+    例外：
+        LLMUnavailableError: 呼ばずに断った → 呼び出し側は予備の処理を使う
+        その他の例外: 呼んだが失敗した（タイムアウトを含む）
+    """
+    client = get_client()
+
+    if not circuit_breaker.allow():
+        llm_metrics.record_call(operation, "rejected_open")
+        raise CircuitOpenError("LLM サーキットブレーカーが開いています")
+
+    if not await rate_limiter.acquire(settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS):
+        circuit_breaker.release()
+        llm_metrics.record_call(operation, "rejected_rate_limit")
+        raise RateLimitedError("LLM のレート制限に達しました")
+
+    started = time.perf_counter()
+    try:
+        if client.replayer is not None:
+            call = client.replayer.generate(prompt, operation)
+        else:
+            call = client.model.generate_content_async(
+                prompt, request_options={"timeout": settings.LLM_TIMEOUT_SECONDS}
+            )
+        response = await asyncio.wait_for(call, timeout=settings.LLM_TIMEOUT_SECONDS)
+    except asyncio.CancelledError:
+        circuit_breaker.release()
+        raise
+    except Exception as e:
+        circuit_breaker.record_failure(trip=_is_quota_error(e))
+        llm_metrics.record_call(operation, "error", time.perf_counter() - started)
+        llm_metrics.record_error(operation, e)
+        raise
+
+    seconds = time.perf_counter() - started
+    circuit_breaker.record_success()
+    llm_metrics.record_call(operation, "success", seconds)
+    _record_usage(operation, prompt, response)
+    if client.recorder is not None:
+        client.recorder.record(operation, prompt, response.text, seconds)
+    return response
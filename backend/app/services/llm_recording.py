@@ -0,0 +1,105 @@
+# LLM 呼び出しの記録と再生
+# 初心者向け解説：本物の Gemini とのやり取り（プロンプトと応答）をファイルに記録しておき、
+#                後から Gemini を呼ばずに同じ応答を返す（オフラインで性能試験を繰り返すため）
+#
+# 使い方（.env）：
+#   # 1. 記録：普段どおり Gemini を使いながら、成功した呼び出しを JSONL に追記
+#   LLM_RECORD_FILE=llm_fixtures.jsonl
+#   # 2. 再生：Gemini を呼ばずに記録した応答を返す
+#   LLM_BACKEND=replay
+#   LLM_REPLAY_FILE=llm_fixtures.jsonl
+#
+# 記録ファイル（1行に1つの JSON）：
+#   {"operation": "extract_all_info", "prompt_sha256": "...", "prompt": "...", "text": "...", "latency_ms": 812.3}
+#
+# 再生時の応答の選び方：
+# 1. 同じ operation で、プロンプトが完全に同じ記録
+# 2. なければ、同じ operation の記録を順番に（日付やユーザーのデータでプロンプトが変わっても、
+#    本物と同じ大きさの応答とパースの手間を再現できる）
+# 3. それもなければ LookupError（呼び出し失敗として扱われ、予備の処理になる）
+#
+# 注目ポイント：
+# - 再生でも app/services/llm.py のレート制限・サーキットブレーカー・タイムアウトはそのまま通る
+# - LLM_REPLAY_LATENCY=true なら、記録した応答時間だけ待ってから返す（待ち時間も含めて再現）
+# - 記録ファイルにはユーザーのメッセージがそのまま入るので、本番データを記録した場合は扱いに注意
+
+import asyncio
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.services.fake_llm import FakeResponse
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def load_fixtures(path: str) -> List[Dict]:
+    """記録ファイルを読み込む"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class LLMRecorder:
+    """成功した呼び出しを JSONL ファイルに追記する"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def record(self, operation: str, prompt: str, text: str, seconds: float):
+        entry = {
+            "operation": operation,
+            "prompt_sha256": prompt_hash(prompt),
+            "prompt": prompt,
+            "text": text,
+            "latency_ms": round(seconds * 1000, 1),
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        }
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            # 記録に失敗してもアプリの動作は止めない
+            print(f"LLM 記録エラー: {str(e)}")
+
+
+class LLMReplayer:
+    """記録した応答を返す（Gemini は呼ばない）"""
+
+    def __init__(self, entries: List[Dict], replay_latency: bool = True):
+        self.replay_latency = replay_latency
+        self.exact = {}  # (operation, プロンプトのハッシュ) → 記録
+        self.by_operation = defaultdict(list)  # operation → 記録の一覧
+        self.cursor = defaultdict(int)  # operation → 次に返す記録の番号
+        for entry in entries:
+            operation = entry["operation"]
+            sha = entry.get("prompt_sha256") or prompt_hash(entry.get("prompt", ""))
+            self.exact.setdefault((operation, sha), entry)
+            self.by_operation[operation].append(entry)
+
+    @classmethod
+    def from_file(cls, path: str, replay_latency: bool = True) -> "LLMReplayer":
+        return cls(load_fixtures(path), replay_latency)
+
+    def lookup(self, operation: str, prompt: str) -> Optional[Dict]:
+        """応答する記録を選ぶ（なければ None）"""
+        entry = self.exact.get((operation, prompt_hash(prompt)))
+        if entry is not None:
+            return entry
+        entries = self.by_operation.get(operation)
+        if not entries:
+            return None
+        index = self.cursor[operation]
+        self.cursor[operation] = (index + 1) % len(entries)
+        return entries[index]
+
+    async def generate(self, prompt: str, operation: str) -> FakeResponse:
+        entry = self.lookup(operation, prompt)
+        if entry is None:
+            raise LookupError(f"LLM の記録がありません（{operation}）")
+        if self.replay_latency and entry.get("latency_ms"):
+            await asyncio.sleep(entry["latency_ms"] / 1000)
+        return FakeResponse(prompt, entry["text"])
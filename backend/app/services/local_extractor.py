@@ -0,0 +1,148 @@
+# ローカル情報抽出（AIを使わない予備の抽出）
+# 初心者向け解説：Gemini が使えない間（利用上限・障害でサーキットブレーカーが開いている間）に、
+#                「食費5万円」のような単純なメッセージだけを、正規表現で収入・支出などに振り分ける
+#
+# 注目ポイント：
+# - 間違った登録をするより登録しない方が安全なので、次の場合だけ抽出する
+#   * キーワードで選ばれたカテゴリがちょうど1つ（app/services/extraction_prompts.py の classify_categories）
+#   * 金額がちょうど1つ書かれている
+# - 子供教育・キャリアは項目が多く正規表現では判断できないので対象外
+# - 戻り値の形は GeminiService.extract_all_info と同じ（{"expense": {...}} など）
+
+import re
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.services.extraction_prompts import classify_categories
+
+# 「1億2000万円」「30万円」「5,000円」「300万」などの金額
+AMOUNT_PATTERN = re.compile(
+    r"(?:(\d+(?:\.\d+)?)\s*億)?\s*(?:(\d[\d,]*(?:\.\d+)?)\s*(万|千)?)?\s*円"
+    r"|(\d[\d,]*(?:\.\d+)?)\s*(億|万)"
+)
+
+UNITS = {"億": 100_000_000, "万": 10_000, "千": 1_000, None: 1}
+
+# キーワード → 値（上から順に最初に当たったものを使う）
+INCOME_TYPES = [
+    ("家賃収入", "家賃収入"), ("不動産", "不動産収入"), ("配当", "配当金"), ("利子", "利子"),
+    ("利息", "利子"), ("副業", "副業"), ("ボーナス", "ボーナス"), ("賞与", "ボーナス"),
+    ("年収", "年収"), ("月収", "月収"), ("給料", "月収"), ("給与", "月収"), ("手取り", "月収"),
+]
+EXPENSE_CATEGORIES = [
+    ("食", "食費"), ("光熱", "光熱費"), ("電気", "光熱費"), ("ガス", "光熱費"), ("水道", "光熱費"),
+    ("交通", "交通費"), ("通信", "通信費"), ("携帯", "通信費"), ("スマホ", "通信費"),
+    ("娯楽", "娯楽費"), ("趣味", "娯楽費"), ("医療", "医療費"), ("病院", "医療費"),
+    ("教育", "教育費"), ("塾", "教育費"), ("習い事", "教育費"),
+]
+FIXED_EXPENSE_CATEGORIES = ("光熱費", "通信費")
+ASSET_TYPES = [
+    ("投資信託", "投資信託"), ("投信", "投資信託"), ("株", "株式"), ("貯金", "貯金"), ("貯蓄", "貯金"),
+    ("預金", "貯金"), ("暗号", "暗号資産"), ("ビットコイン", "暗号資産"), ("債券", "債券"),
+    ("不動産", "不動産"), ("ローン", "ローン"),
+]
+HOUSE_TYPES = [
+    ("住宅ローン", "住宅ローン"), ("ローン", "住宅ローン"), ("家賃", "賃貸"), ("賃貸", "賃貸"),
+    ("持ち家", "持ち家"), ("購入予定", "購入予定"),
+]
+RISK_TYPES = [
+    ("生命保険", "生命保険"), ("医療保険", "医療保険"), ("損害保険", "損害保険"), ("火災保険", "損害保険"),
+    ("自動車保険", "損害保険"), ("学資保険", "貯蓄型保険"), ("貯蓄型", "貯蓄型保険"),
+]
+
+# 子供教育・キャリアは対象外
+LOCAL_CATEGORIES = ("income", "expense", "asset", "house", "risk", "retirement")
+
+
+def _lookup(message: str, table: Sequence[Tuple[str, str]], default: str = "その他") -> str:
+    for keyword, value in table:
+        if keyword in message:
+            return value
+    return default
+
+
+def _to_number(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+def parse_amounts(message: str) -> list:
+    """メッセージ中の金額（円）をすべて取り出す"""
+    amounts = []
+    for match in AMOUNT_PATTERN.finditer(message):
+        oku, number, unit, bare_number, bare_unit = match.groups()
+        if bare_number is not None:
+            amounts.append(_to_number(bare_number) * UNITS[bare_unit])
+        elif oku is not None or number is not None:
+            total = _to_number(oku) * UNITS["億"] if oku else 0.0
+            if number is not None:
+                total += _to_number(number) * UNITS[unit]
+            amounts.append(total)
+    return amounts
+
+
+def _is_yearly(message: str) -> bool:
+    return any(keyword in message for keyword in ("年収", "年間", "毎年", "年に", "ボーナス", "賞与"))
+
+
+def extract_locally(message: str, categories: Optional[Sequence[str]] = None) -> Dict:
+    """
+    正規表現だけで情報を抽出（判断できない場合は {}）
+
+    引数：
+        categories: 抽出してよいカテゴリ（None なら全カテゴリ）
+    """
+    selected = classify_categories(message)
+    if len(selected) != 1:
+        return {}
+    category = selected[0]
+    if category not in LOCAL_CATEGORIES or (categories is not None and category not in categories):
+        return {}
+
+    amounts = parse_amounts(message)
+    if len(amounts) != 1:
+        return {}
+    amount = amounts[0]
+    occurrence_type = "1" if _is_yearly(message) else "12"
+
+    if category == "income":
+        info = {
+            "income_type": _lookup(message, INCOME_TYPES),
+            "occurrence_type": occurrence_type,
+            "amount": amount,
+        }
+    elif category == "expense":
+        expense_category = _lookup(message, EXPENSE_CATEGORIES)
+        info = {
+            "expense_type": "固定費" if expense_category in FIXED_EXPENSE_CATEGORIES else "変動費",
+            "category": expense_category,
+            "occurrence_type": occurrence_type,
+            "amount": amount,
+        }
+    elif category == "asset":
+        asset_type = _lookup(message, ASSET_TYPES)
+        info = {
+            "asset_type": asset_type,
+            "name": asset_type,
+            "amount": -amount if asset_type == "ローン" else amount,
+        }
+    elif category == "house":
+        house_type = _lookup(message, HOUSE_TYPES)
+        info = {"house_type": house_type, "name": "家賃" if house_type == "賃貸" else house_type, "amount": amount}
+    elif category == "risk":
+        risk_type = _lookup(message, RISK_TYPES)
+        info = {"risk_type": risk_type, "name": risk_type if risk_type != "その他" else "保険", "amount": amount}
+    else:  # retirement
+        if "年金" in message:
+            monthly = amount if "月" in message else amount / 12
+            info = {
+                "retirement_type": "年金",
+                "name": "年金",
+                "monthly_amount": monthly,
+                "total_amount": monthly * 12,
+            }
+        else:
+            info = {"retirement_type": "一時金（退職金など）", "name": "退職金", "total_amount": amount}
+        age = re.search(r"(\d{2})\s*歳", message)
+        if age:
+            info["retirement_age"] = int(age.group(1))
+
+    return {category: info}
@@ -0,0 +1,187 @@
+# リクエスト単位のサンプリングプロファイラ（管理者用）
+# 初心者向け解説：特定のユーザーのシミュレーションやチャットが遅い時に、「どの関数で時間を使っているか」を調べる
+#
+# 使い方（管理者のトークンで）：
+#   GET /api/simulation/cashflow?profile=1        または ヘッダー X-Profile: 1
+#   → レスポンスはいつも通り。ヘッダー X-Profile-Id にプロファイルの ID が付く
+#   GET /api/admin/profiles/{profile_id}          → プロファイル（テキスト）をダウンロード
+#
+# プロファイルの形式（folded stacks）：
+#   main (app/main.py:10);handler (app/routers/chat.py:28);query (...) 42
+#   → 1行が「呼び出しの流れ（根元;…;先端） サンプル数」。flamegraph.pl・speedscope・inferno でフレームグラフになる
+#
+# 仕組み：
+# - 別スレッドが PROFILE_SAMPLE_INTERVAL_MS ごとに、リクエストを処理しているスレッドの呼び出し履歴
+#   （sys._current_frames()）を記録する。関数の呼び出しごとに計測するプロファイラ（cProfile）より軽い
+#
+# 注目ポイント：
+# - profile=1 がないリクエストでは、パスとヘッダーを見るだけ（サンプリングのスレッドも作らない）
+# - 記録するのはイベントループのスレッド。同時に処理中の他のリクエストも混ざることがある
+# - 計算プロセス（SIM_PROCESS_WORKERS）の中は記録できないので、プロファイル中のリクエストでは
+#   シミュレーションをプールに渡さず、イベントループのスレッドでその場で計算する（compute_pool.run_inline）
+# - スレッドプール（同期のエンドポイント・DB 処理など）の中は記録されない
+# - 待ち時間（Gemini の応答待ちなど）は、イベントループが待っている場所（select など）として出る
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi.responses import ORJSONResponse
+
+from app.config import settings
+from app.services.compute_pool import run_inline
+from app.utils.security import email_from_token, is_admin_email
+
+# プロファイルを取れるパス
+PROFILED_PATH_PREFIXES = ("/api/simulation/", "/api/chat/")
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]+$")
+
+
+class StackSampler:
+    """指定したスレッドの呼び出し履歴を、一定間隔で数える"""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks = Counter()  # "根元;…;先端" → サンプル数
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        filename = code.co_filename
+        # 自分のコードはパスを短く、ライブラリはファイル名だけ
+        app_index = filename.rfind(f"{os.sep}app{os.sep}")
+        short = filename[app_index + 1:] if app_index >= 0 else os.path.basename(filename)
+        return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """folded stacks 形式のテキスト"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _profile_path(profile_id: str) -> str:
+    return os.path.join(settings.PROFILE_DIR, f"{profile_id}.folded")
+
+
+def new_profile_id(method: str, path: str) -> str:
+    """プロファイルの ID（日時・メソッド・パス入り。ファイル名にも使う）"""
+    slug = re.sub(r"[^0-9A-Za-z]+", "_", path).strip("_")
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{method.lower()}-{slug}-{uuid.uuid4().hex[:6]}"
+
+
+def save_profile(profile_id: str, sampler: StackSampler):
+    """プロファイルをファイルに保存（フレームグラフのツールがそのまま読めるように、中身は folded stacks だけ）"""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    with open(_profile_path(profile_id), "w", encoding="utf-8") as f:
+        f.write(sampler.folded())
+
+
+def list_profiles() -> List[Dict]:
+    """保存したプロファイルの一覧（新しい順）"""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(settings.PROFILE_DIR), reverse=True):
+        if name.endswith(".folded"):
+            full_path = os.path.join(settings.PROFILE_DIR, name)
+            profiles.append({"profile_id": name[:-len(".folded")], "size": os.path.getsize(full_path)})
+    return profiles
+
+
+def read_profile(profile_id: str) -> Optional[str]:
+    """プロファイルの中身（なければ None）"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None  # パスとして危ない文字（../ など）は受け付けない
+    try:
+        with open(_profile_path(profile_id), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _profile_requested(scope) -> bool:
+    if not scope["path"].startswith(PROFILED_PATH_PREFIXES):
+        return False
+    for name, value in scope["headers"]:
+        if name == b"x-profile" and value in (b"1", b"true"):
+            return True
+    query = scope.get("query_string", b"")
+    return b"profile=" in query and parse_qs(query.decode()).get("profile", [""])[0] in ("1", "true")
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            return token if scheme.lower() == "bearer" else None
+    return None
+
+
+class ProfilingMiddleware:
+    """?profile=1 / X-Profile: 1 の付いた管理者のリクエストだけプロファイルを取るミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer_token(scope)
+        if not token or not is_admin_email(email_from_token(token)):
+            response = ORJSONResponse({"detail": "プロファイルは管理者のみ利用できます"}, status_code=403)
+            await response(scope, receive, send)
+            return
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        profile_id = new_profile_id(scope["method"], scope["path"])
+        started = time.perf_counter()
+        sampler.start()
+
+        async def send_with_profile_id(message):
+            # ヘッダーを送る時点ではまだ処理中なので、保存する前に ID だけ付ける
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with run_inline():
+                await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            seconds = time.perf_counter() - started
+            save_profile(profile_id, sampler)
+            print(f"🔬 プロファイル保存: {scope['method']} {scope['path']} "
+                  f"{seconds * 1000:.1f} ms, {sampler.samples} サンプル → {profile_id}")
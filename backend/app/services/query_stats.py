@@ -0,0 +1,159 @@
+# リクエストごとの SQL 実行回数・時間の計測（N+1 の検出）
+# 初心者向け解説：1回のリクエストで SQL が何回実行され、合計で何ミリ秒かかったかを数える
+#
+# なぜ必要なのか：
+# - User.assets のような relationship は「使った時に」SQL を実行する（遅延読み込み）
+#   → ループの中で使うと、行の数だけ SQL が実行される（N+1 問題）
+# - 回数をレスポンスヘッダーとログに出しておけば、増えたことにすぐ気づける
+#
+# 仕組み：
+# - SQLAlchemy のイベント（before/after_cursor_execute）で、全ての SQL の実行を捕まえる
+# - 今のリクエストの集計先は contextvars で持つ（同時に来た別のリクエストと混ざらない）
+#   なぜ contextvars：同期のエンドポイントはスレッドプールで動くが、
+#   FastAPI はその時にコンテキストを引き継ぐので、同じ集計先に数えられる
+#
+# レスポンスヘッダー（QUERY_STATS_HEADERS=true の時）：
+#   X-DB-Query-Count: 4
+#   X-DB-Time-Ms: 3.2
+#
+# テスト・チェック用：
+#   with assert_max_queries(3):
+#       client.get("/api/summary", headers=headers)
+#   → 4回以上実行されたら AssertionError（実行された SQL の一覧付き）
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+
+class QueryStats:
+    """1つのリクエスト（または with ブロック）の SQL の集計"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements = Counter()  # SQL 文 → 実行回数
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return self.total_seconds * 1000
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """同じ SQL 文が threshold 回以上実行されたもの（N+1 の疑い）"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def describe(self) -> str:
+        """実行された SQL の一覧（回数の多い順）"""
+        lines = [f"{self.count} queries, {self.total_ms:.1f} ms"]
+        for statement, count in self.statements.most_common():
+            lines.append(f"  {count}x {' '.join(statement.split())[:200]}")
+        return "\n".join(lines)
+
+
+# 今のリクエストの集計先（計測していない時は None）
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# count_queries() の集計先（プロセス全体の SQL を数える）
+_captures: List[QueryStats] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None or _captures:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None and not _captures:
+        return
+    started = conn.info.get("query_started")
+    seconds = time.perf_counter() - started.pop() if started else 0.0
+    if stats is not None:
+        stats.record(statement, seconds)
+    for capture in _captures:
+        capture.record(statement, seconds)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    with ブロックの間に実行された SQL を数える（テスト・チェック用）
+
+    注意：リクエストごとの集計と違い、他のスレッドの SQL も含めてプロセス全体を数える
+    （TestClient はアプリを別のスレッドで動かすため）。同時に他の処理が動いていない時に使う
+    """
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(max_count: int) -> Iterator[QueryStats]:
+    """with ブロックの中の SQL が max_count 回を超えたら AssertionError"""
+    with count_queries() as stats:
+        yield stats
+    if stats.count > max_count:
+        raise AssertionError(f"SQL が多すぎます（上限 {max_count} 回）: {stats.describe()}")
+
+
+class QueryStatsMiddleware:
+    """
+    リクエストごとに SQL を数えて、ヘッダーとログに出すミドルウェア
+
+    なぜ BaseHTTPMiddleware（@app.middleware）を使わないのか：
+    レスポンスを包み直す分だけ全リクエストが遅くなるため、ASGI の形で直接書いている
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            # ヘッダーはレスポンスの最初に送るので、その時点までの集計を付ける
+            # （ストリーミングのレスポンスでは、本文を送る間の SQL は含まれない）
+            if message["type"] == "http.response.start" and settings.QUERY_STATS_HEADERS:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, stats)
+
+    @staticmethod
+    def _log(scope, stats: QueryStats):
+        path = f"{scope['method']} {scope['path']}"
+        repeated = stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            statement, count = repeated[0]
+            print(f"⚠️ N+1 の疑い: {path} で同じ SQL を {count} 回実行: {' '.join(statement.split())[:200]}")
+        if stats.count >= settings.QUERY_LOG_MIN_COUNT:
+            print(f"🗄️ {path}: SQL {stats.count} 回, {stats.total_ms:.1f} ms")
@@ -0,0 +1,42 @@
+# 参照用のマスタデータ（全ユーザー・全リクエストで共通の、変更しない表）
+# 初心者向け解説：教育費の目安のような「決まった表」を、モジュールの読み込み時に1回だけ作っておく
+#
+# なぜモジュールの定数にするのか：
+# - 以前はチャットのリクエストのたびに、関数の中で同じ辞書を作り直していた
+# - gunicorn の --preload（gunicorn.conf.py）では、アプリの読み込みはマスタープロセスで1回だけ行い、
+#   ワーカーは fork でそのメモリを共有する（コピーオンライト）。ここで作った表も全ワーカーで共有される
+#
+# 注目ポイント：
+# - 表はタプルと NamedTuple で作る（変更できない）
+#   → 誰かが書き換えてしまう心配がなく、書き込みでメモリのページがワーカーごとにコピーされることもない
+
+from typing import NamedTuple, Tuple
+
+
+class SchoolStage(NamedTuple):
+    """学校段階1つ分の教育費（年額・円）と在学期間"""
+    school_type: str
+    public: int  # 公立の年額
+    private: int  # 私立の年額
+    start_age: int  # 入学年齢
+    duration: int  # 在学年数
+
+    @property
+    def end_age(self) -> int:
+        """卒業する年の年齢（入学年齢 + 期間 - 1）"""
+        return self.start_age + self.duration - 1
+
+    def annual_cost(self, is_private: bool) -> int:
+        return self.private if is_private else self.public
+
+
+# 教育費マスタ（入学の早い順）
+EDUCATION_COSTS: Tuple[SchoolStage, ...] = (
+    SchoolStage("nursery", public=450000, private=800000, start_age=0, duration=6),
+    SchoolStage("kindergarten", public=220000, private=530000, start_age=3, duration=3),
+    SchoolStage("elementary", public=320000, private=1600000, start_age=6, duration=6),
+    SchoolStage("junior_high", public=490000, private=1410000, start_age=12, duration=3),
+    SchoolStage("high_school", public=460000, private=970000, start_age=15, duration=3),
+    SchoolStage("university", public=540000, private=1350000, start_age=18, duration=4),
+    SchoolStage("graduate_school", public=540000, private=1150000, start_age=22, duration=2),
+)
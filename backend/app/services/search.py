@@ -0,0 +1,189 @@
+# 全文検索
+# 初心者向け解説：チャット履歴と各カテゴリの備考を、キーワードで探してスコア順に返す
+#
+# データベースごとの検索方法（索引は app/models/search_index.py で定義）：
+# - MySQL ：MATCH ... AGAINST（FULLTEXT / ngram）。各テーブルの結果を UNION ALL でまとめてスコア順に
+#            チャットだけは FULLTEXT が使えない（月別パーティション表）ので、
+#            直近 CHAT_SEARCH_WINDOW_DAYS 日に絞った部分一致（古い月の区画は読まない）
+# - SQLite：FTS5 の search_index を MATCH で検索し、bm25() でスコア付け
+# - その他：LIKE による部分一致（スコアなし、開発用の予備）
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import desc, func, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.search_index import MYSQL_FULLTEXT_SOURCES, SEARCH_SOURCES
+
+SNIPPET_CHARS = 40  # 抜粋の前後の文字数
+SQLITE_TRIGRAM_MIN_CHARS = 3  # trigram 索引が使える最小の文字数
+
+
+def search(
+    db: Session,
+    user_id: int,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    sources: Optional[List[str]] = None
+) -> Dict:
+    """
+    キーワード検索（スコアの高い順、limit / offset でページ分け）
+
+    戻り値：{"items": [...], "has_more": bool}
+    """
+    sources = [s for s in (sources or SEARCH_SOURCES) if s in SEARCH_SOURCES]
+    if not sources:
+        # 対象がないと UNION ALL を組み立てられない（MySQL・LIKE では例外になる）ので、ここで空を返す
+        return {"items": [], "has_more": False}
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        rows = _search_mysql(db, user_id, q, limit + 1, offset, sources)
+    elif dialect == "sqlite":
+        rows = _search_sqlite(db, user_id, q, limit + 1, offset, sources)
+    else:
+        rows = _search_like(db, user_id, q, limit + 1, offset, sources)
+
+    # 1件多く読んで「次のページがあるか」を判定する
+    has_more = len(rows) > limit
+    items = [
+        {
+            "source": row.source,
+            "id": row.row_id,
+            "title": row.title,
+            "snippet": make_snippet(row.body or "", q),
+            "score": float(row.score or 0),
+        }
+        for row in rows[:limit]
+    ]
+    return {"items": items, "has_more": has_more}
+
+
+def make_snippet(body: str, q: str) -> str:
+    """本文からキーワード周辺だけを切り出す（見つからなければ先頭）"""
+    position = body.lower().find(q.lower())
+    if position < 0:
+        return body[:SNIPPET_CHARS * 2]
+    start = max(position - SNIPPET_CHARS, 0)
+    end = position + len(q) + SNIPPET_CHARS
+    return ("…" if start > 0 else "") + body[start:end] + ("…" if end < len(body) else "")
+
+
+def _like_pattern(q: str) -> str:
+    """
+    部分一致の LIKE パターン（like(..., escape="\\") と一緒に使う）
+
+    なぜエスケープ：% や _ はLIKEのワイルドカードなので、そのままだと「_」の検索が任意の1文字に一致する
+    """
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _body_expression(model, columns):
+    """本文の列（複数ならスペースでつなぐ）"""
+    parts = [func.coalesce(getattr(model, column), "") for column in columns]
+    return parts[0] if len(parts) == 1 else func.concat_ws(" ", *parts)
+
+
+def _search_mysql(db: Session, user_id: int, q: str, limit: int, offset: int, sources: List[str]):
+    """MySQL：テーブルごとに MATCH ... AGAINST で検索して、スコア順にまとめる"""
+    from sqlalchemy.dialects.mysql import match
+
+    selects = []
+    for source in sources:
+        if source not in MYSQL_FULLTEXT_SOURCES:
+            continue
+        model, title, columns = SEARCH_SOURCES[source]
+        score = match(*[getattr(model, column) for column in columns], against=q).in_natural_language_mode()
+        selects.append(
+            select(
+                literal(source).label("source"),
+                model.id.label("row_id"),
+                getattr(model, title).label("title"),
+                _body_expression(model, columns).label("body"),
+                score.label("score"),
+            ).where(model.user_id == user_id, score)
+        )
+    if "chat" in sources:
+        selects.append(_chat_window_select(user_id, q))
+    query = union_all(*selects).subquery()
+    return db.execute(
+        select(query).order_by(desc(query.c.score)).limit(limit).offset(offset)
+    ).all()
+
+
+def _chat_window_select(user_id: int, q: str):
+    """
+    MySQL のチャット検索：直近 CHAT_SEARCH_WINDOW_DAYS 日の部分一致（スコアは 0）
+
+    なぜ期間を絞る：created_at の範囲が条件にあると、それより古い月の区画を読まずに済む
+    （索引 (user_id, created_at, id) で、このユーザーの期間内の行だけをたどる）
+    """
+    model, title, columns = SEARCH_SOURCES["chat"]
+    since = datetime.utcnow() - timedelta(days=settings.CHAT_SEARCH_WINDOW_DAYS)
+    pattern = _like_pattern(q)
+    return select(
+        literal("chat").label("source"),
+        model.id.label("row_id"),
+        getattr(model, title).label("title"),
+        _body_expression(model, columns).label("body"),
+        literal_column("0").label("score"),
+    ).where(
+        model.user_id == user_id,
+        model.created_at >= since,
+        or_(*[getattr(model, column).like(pattern, escape="\\") for column in columns])
+    )
+
+
+def _search_sqlite(db: Session, user_id: int, q: str, limit: int, offset: int, sources: List[str]):
+    """
+    SQLite：FTS5 の search_index を検索
+
+    なぜ短いキーワードは instr：trigram は3文字以上でないと索引が使えない
+    （FTS5 テーブルへの短い LIKE は結果が返らないので、単純な部分一致にする）
+    """
+    placeholders = ", ".join(f":source_{i}" for i in range(len(sources)))
+    params = {f"source_{i}": source for i, source in enumerate(sources)}
+    params.update({"user_id": user_id, "limit": limit, "offset": offset})
+
+    if len(q) >= SQLITE_TRIGRAM_MIN_CHARS:
+        # キーワードをフレーズとして扱う（" はエスケープ）
+        params["q"] = '"' + q.replace('"', '""') + '"'
+        condition = "search_index MATCH :q"
+        score = "-bm25(search_index)"  # bm25 は小さいほど良いので符号を反転
+    else:
+        params["q"] = q
+        condition = "instr(body, :q) > 0"
+        score = "0"
+
+    return db.execute(text(
+        f"SELECT source, row_id, title, body, {score} AS score FROM search_index "
+        f"WHERE {condition} AND user_id = :user_id AND source IN ({placeholders}) "
+        "ORDER BY score DESC, row_id DESC LIMIT :limit OFFSET :offset"
+    ), params).all()
+
+
+def _search_like(db: Session, user_id: int, q: str, limit: int, offset: int, sources: List[str]):
+    """その他のDB：LIKE による部分一致（索引は使えないので開発用）"""
+    pattern = _like_pattern(q)
+    selects = []
+    for source in sources:
+        model, title, columns = SEARCH_SOURCES[source]
+        selects.append(
+            select(
+                literal(source).label("source"),
+                model.id.label("row_id"),
+                getattr(model, title).label("title"),
+                _body_expression(model, columns).label("body"),
+                literal_column("0").label("score"),
+            ).where(
+                model.user_id == user_id,
+                or_(*[getattr(model, column).like(pattern, escape="\\") for column in columns])
+            )
+        )
+    query = union_all(*selects).subquery()
+    return db.execute(
+        select(query).order_by(desc(query.c.row_id)).limit(limit).offset(offset)
+    ).all()
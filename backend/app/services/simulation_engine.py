@@ -0,0 +1,338 @@
+# シミュレーションエンジン
+# 初心者向け解説：キャッシュフローシミュレーションの計算部分だけをまとめたモジュール
+#
+# なぜルーターから分けるのか：
+# - 計算ロジックをDBやHTTPから切り離して、単体で動かせるようにする
+# - 年次（yearly）と月次（monthly）の2つの計算モードを同じ入力で切り替える
+#
+# 計算モード：
+# - yearly ：1年を1マスとして計算（従来の方式）
+# - monthly：1か月を1マスとして計算し、最後に年単位へ集計
+#            （100年 = 1200マスの配列。ローン・家賃・年金は月単位の概念なので、
+#              購入月や誕生月を考慮した正確な初年度の値になる）
+#
+# どちらのモードも入力は Timeline（app/services/timeline.py）だけ。
+# 年ごとのイベント探索はタイムライン作成時に1回だけ行う。
+
+import numpy as np
+from typing import Dict, List, Optional
+
+from app.services.timeline import (
+    Timeline,
+    compile_timeline,
+    calc_loan_payment,
+    DEFAULT_INCREASE_RATE,
+    DEFAULT_RETIREMENT_AGE,
+)
+
+RESOLUTIONS = ("yearly", "monthly")
+
+__all__ = [
+    "simulate_cashflow",
+    "run_simulation",
+    "calc_loan_payment",
+    "DEFAULT_INCREASE_RATE",
+    "DEFAULT_RETIREMENT_AGE",
+    "RESOLUTIONS",
+]
+
+
+def simulate_cashflow(
+    incomes,
+    expenses,
+    houses,
+    educations,
+    careers,
+    retirements,
+    initial_assets: float,
+    current_year: int,
+    current_age: Optional[int],
+    years: int,
+    resolution: str = "yearly",
+    birth_month: Optional[int] = None
+) -> Dict[str, List]:
+    """
+    キャッシュフローシミュレーションを実行（タイムライン作成 + 計算）
+
+    引数：
+        incomes〜retirements: 各カテゴリの行（ORMオブジェクト）
+        initial_assets: 初期資産合計
+        current_year: 開始年
+        current_age: 本人の現在の年齢（不明なら None）
+        years: シミュレーション年数
+        resolution: "yearly" または "monthly"
+        birth_month: 本人の誕生月（monthly モードで年金開始月・定年月に使用）
+
+    戻り値：
+        years / annual_income / annual_expense / net_cashflow / cumulative_assets
+        （どちらのモードも年単位のリスト）
+    """
+    timeline = compile_timeline(
+        incomes, expenses, houses, educations, careers, retirements,
+        current_year=current_year,
+        years=years,
+        current_age=current_age,
+        birth_month=birth_month
+    )
+    return run_simulation(timeline, initial_assets, resolution)
+
+
+def run_simulation(timeline: Timeline, initial_assets: float, resolution: str = "yearly") -> Dict[str, List]:
+    """コンパイル済みのタイムラインから、指定された計算モードで実行"""
+    if resolution == "monthly":
+        return _simulate_monthly(timeline, initial_assets)
+    if resolution != "yearly":
+        raise ValueError(f"未対応の計算モードです: {resolution}")
+    return _simulate_yearly(timeline, initial_assets)
+
+
+def _simulate_yearly(timeline: Timeline, initial_assets: float) -> Dict[str, List]:
+    """年次モード：1年を1マスとして計算"""
+    year_count = timeline.year_count
+    current_year = timeline.start_year
+    current_age = timeline.current_age
+    side_job_income = timeline.side_job_income
+
+    # === 年齢と定年（年ごと） ===
+    if current_age is not None:
+        ages = current_age + np.arange(year_count)
+        working = ages < DEFAULT_RETIREMENT_AGE
+    else:
+        ages = None
+        working = np.zeros(year_count, dtype=bool)
+
+    # 定年後の収入（老後設計）
+    retirement_income = _retirement_flow(timeline, ages, ~working, periods_per_year=1)
+
+    # === 住宅費用（購入年とローン期間を考慮） ===
+    housing_cost = np.zeros(year_count)
+    loan_new_debt = np.zeros(year_count)  # 新規ローン借入額（負債増加）
+    loan_principal = np.zeros(year_count)  # 元金返済額（資産増加分）
+    for house in timeline.houses:
+        if house.kind == "monthly":
+            housing_cost += house.amount * 12
+            continue
+
+        purchase = house.purchase_year - current_year
+        annual_payment = house.monthly_payment * 12
+        if 0 <= purchase < year_count:
+            # 購入年：頭金を支出し、返済総額（元金+利息）を負債として記録
+            housing_cost[purchase] += house.down_payment
+            loan_new_debt[purchase] += house.total_repayment
+
+        # 返済期間（購入年も含む）：年間返済額がそのまま資産増加（負債減少）となる
+        last = min(purchase + house.loan_term, year_count)
+        first = max(purchase, 0)
+        if first < last:
+            loan_principal[first:last] += annual_payment
+        # 購入年は返済額を支出に含めない（既に頭金で支出済み）
+        first = max(purchase + 1, 0)
+        if first < last:
+            housing_cost[first:last] += annual_payment
+
+    year_expenses = timeline.annual_expense_base + housing_cost + timeline.education_costs
+
+    # シミュレーション結果を格納
+    annual_incomes = []
+    annual_expenses = []
+    net_cashflows = []
+    cumulative_assets_list = []
+
+    cumulative_assets = initial_assets
+
+    for year in range(year_count):
+        target_year = current_year + year
+
+        # === 収入計算（キャリア設計 + 老後設計） ===
+        if working[year]:
+            # 定年前：キャリア設計の総年収（本業 + 副業）
+            if year == 0:
+                # 初年度は現在の年収
+                year_income = timeline.base_income + side_job_income
+            elif target_year in timeline.career_events:
+                # イベントがある年は予想収入を使用
+                year_income = timeline.career_events[target_year] + side_job_income
+            else:
+                # イベントがない年は前年から昇給率で計算（本業収入のみ昇給、副業収入は固定）
+                prev_income = annual_incomes[-1] if annual_incomes else timeline.base_income
+                prev_main_income = prev_income - side_job_income
+                year_income = prev_main_income * (1 + timeline.increase_rates[year] / 100) + side_job_income
+        else:
+            # 定年後：老後設計（年金など）
+            year_income = retirement_income[year]
+
+        year_expense = year_expenses[year]
+
+        # 年間収支
+        net_cashflow = year_income - year_expense
+
+        # 累積資産を更新
+        # 1. 収支を加算
+        cumulative_assets += net_cashflow
+        # 2. 新規ローン借入を負債として減算
+        cumulative_assets -= loan_new_debt[year]
+        # 3. ローン元金返済分を資産として加算
+        cumulative_assets += loan_principal[year]
+
+        annual_incomes.append(round(year_income))
+        annual_expenses.append(round(year_expense))
+        net_cashflows.append(round(net_cashflow))
+        cumulative_assets_list.append(round(cumulative_assets))
+
+    return {
+        "years": list(range(current_year, current_year + year_count)),
+        "annual_income": annual_incomes,
+        "annual_expense": annual_expenses,
+        "net_cashflow": net_cashflows,
+        "cumulative_assets": cumulative_assets_list,
+    }
+
+
+def _simulate_monthly(timeline: Timeline, initial_assets: float) -> Dict[str, List]:
+    """
+    月次モード：月インデックスの配列（years+1 年 × 12 マス）で一括計算し、年単位に集計
+
+    年次モードとの違い：
+    - 住宅ローン：購入月の翌月から返済が始まり、返済額は支出と元金返済の両方に計上
+      （年次モードの「購入年は返済額を支出に含めない」特例がなくなる）
+    - 定年・年金：本人の誕生月で切り替わる（誕生月が不明なら1月）
+    - 年1回の支出：支出日の月に計上（不明なら1月）
+
+    なぜ NumPy の配列で計算するのか：
+    - 1200マスをPythonのループで回すと年次モードの12倍遅くなる
+    - 行ごとに「どの範囲のマスに加算するか」だけを決め、加算は配列演算で行う
+    """
+    year_count = timeline.year_count
+    current_year = timeline.start_year
+    month_count = year_count * 12
+    month_index = np.arange(month_count)
+    year_offset = month_index // 12  # 0〜years
+    calendar_month = month_index % 12 + 1  # 1〜12
+
+    # === 本人の年齢（月ごと） ===
+    # 誕生月の前月までは、その年に達する年齢の1つ下
+    if timeline.current_age is not None:
+        ages = timeline.current_age + year_offset - (calendar_month < (timeline.birth_month or 1))
+        working = ages < DEFAULT_RETIREMENT_AGE
+    else:
+        ages = None
+        working = np.zeros(month_count, dtype=bool)
+
+    # === 収入：本業 + 副業（定年前）、老後資金（定年後） ===
+    main_income = _main_income_by_year(timeline)
+    income_flow = np.where(working, (main_income[year_offset] + timeline.side_job_income) / 12, 0.0)
+    income_flow += _retirement_flow(timeline, ages, ~working, periods_per_year=12)
+
+    # === 支出：毎年同じパターンの支出は12マスのテンプレートにまとめる ===
+    month_template = timeline.expense_template.copy()
+
+    # === 支出：住宅（家賃・ローン） ===
+    housing_flow = np.zeros(month_count)
+    new_debt = np.zeros(month_count)  # 新規ローン借入（負債増加）
+    principal = np.zeros(month_count)  # 返済額（負債減少 = 資産増加）
+    for house in timeline.houses:
+        if house.kind == "monthly":
+            month_template += house.amount
+            continue
+
+        purchase_slot = (house.purchase_year - current_year) * 12 + house.purchase_month - 1
+        if 0 <= purchase_slot < month_count:
+            housing_flow[purchase_slot] += house.down_payment
+            new_debt[purchase_slot] += house.total_repayment
+
+        # 返済は購入月の翌月から loan_term × 12 回
+        first = max(purchase_slot + 1, 0)
+        last = min(purchase_slot + 1 + house.loan_term * 12, month_count)
+        if first < last:
+            housing_flow[first:last] += house.monthly_payment
+            principal[first:last] += house.monthly_payment
+
+    # === 支出：教育費（年額を12か月に按分） ===
+    expense_flow = (
+        np.tile(month_template, year_count)
+        + housing_flow
+        + np.repeat(timeline.education_costs / 12, 12)
+    )
+
+    # === 累積資産 ===
+    net_flow = income_flow - expense_flow
+    cumulative = initial_assets + np.cumsum(net_flow - new_debt + principal)
+
+    # === 年単位に集計 ===
+    def per_year(values):
+        return np.rint(values.reshape(year_count, 12).sum(axis=1)).astype(np.int64).tolist()
+
+    return {
+        "years": list(range(current_year, current_year + year_count)),
+        "annual_income": per_year(income_flow),
+        "annual_expense": per_year(expense_flow),
+        "net_cashflow": per_year(net_flow),
+        "cumulative_assets": np.rint(cumulative[11::12]).astype(np.int64).tolist(),
+    }
+
+
+def _retirement_flow(timeline: Timeline, ages, retired, periods_per_year: int) -> np.ndarray:
+    """
+    老後資金の受取額を期間ごと（年 or 月）の配列で計算
+
+    ルール（年次モードと同じ）：
+    - 年金：開始年齢以降、毎期受け取る
+    - 一時金（退職金など）：開始年齢に達した期に一括
+    - その他：開始年齢以降、月額（なければ総額を年額として）受け取る
+    どれも定年後の期間のみ対象。
+    """
+    flow = np.zeros(len(retired))
+    if ages is None:
+        return flow
+
+    months_per_period = 12 // periods_per_year
+    for retirement in timeline.retirements:
+        eligible = retired & (ages >= retirement.start_age)
+        if retirement.retirement_type == '年金':
+            if retirement.monthly_amount:
+                flow += np.where(eligible, retirement.monthly_amount * months_per_period, 0.0)
+        elif retirement.retirement_type == '一時金（退職金など）':
+            if retirement.total_amount:
+                lump_sum = retirement.total_amount
+            elif retirement.monthly_amount:
+                lump_sum = retirement.monthly_amount * 12
+            else:
+                continue
+            hit = np.flatnonzero(retired & (ages == retirement.start_age))
+            if hit.size:
+                flow[hit[0]] += lump_sum
+        else:  # 'その他'
+            if retirement.monthly_amount:
+                flow += np.where(eligible, retirement.monthly_amount * months_per_period, 0.0)
+            elif retirement.total_amount:
+                flow += np.where(eligible, retirement.total_amount / periods_per_year, 0.0)
+    return flow
+
+
+def _main_income_by_year(timeline: Timeline) -> np.ndarray:
+    """
+    本業年収の年別配列を計算（年次モードと同じルールをベクトル化）
+
+    ルール：
+    - 初年度は現在の年収
+    - キャリアイベントがある年は、その予想収入
+    - それ以外の年は前年 × (1 + 昇給率)
+    """
+    year_count = timeline.year_count
+    offsets = np.arange(year_count)
+
+    event_income = np.full(year_count, np.nan)
+    for event_year, expected_income in timeline.career_events.items():
+        offset = event_year - timeline.start_year
+        if 0 < offset < year_count:
+            event_income[offset] = expected_income
+
+    # イベント年（と初年度）を起点に、昇給率を累積して掛ける
+    is_anchor = ~np.isnan(event_income)
+    is_anchor[0] = True
+    anchor_values = np.where(is_anchor, event_income, 0.0)
+    anchor_values[0] = timeline.base_income
+    growth = np.where(is_anchor, 1.0, np.maximum(1 + timeline.increase_rates / 100, 1e-12))
+    log_growth = np.cumsum(np.log(growth))
+    anchor = np.maximum.accumulate(np.where(is_anchor, offsets, 0))
+    return anchor_values[anchor] * np.exp(log_growth - log_growth[anchor])
@@ -0,0 +1,129 @@
+# シミュレーション入力の読み込み
+# 初心者向け解説：DBから各カテゴリの行を読み込み、計算用のコンパクトな形に変換するモジュール
+#
+# 使う場所：
+# - /api/simulation/cashflow（1ユーザー分）
+# - バックグラウンドジョブ（1ユーザー分）
+# - 夜間バッチ app/batch/precompute.py（まとめて数百ユーザー分）
+#
+# 注目ポイント：
+# - SimulationInputs はORMオブジェクトを持たないので、プロセスプールへそのまま渡せる
+# - まとめて読む場合は「テーブルごとに1回の IN クエリ」で済ませる（ユーザー数 × 8回 にしない）
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.models.income import Income
+from app.models.expense import Expense
+from app.models.asset import Asset
+from app.models.house import House
+from app.models.education import Education
+from app.models.family import FamilyMember
+from app.models.career import Career
+from app.models.retirement import Retirement
+from app.services.simulation_engine import run_simulation
+from app.services.timeline import Timeline, compile_timeline
+
+# シミュレーションの入力になるテーブル（読み込み順）
+INPUT_MODELS = {
+    "incomes": Income,
+    "expenses": Expense,
+    "assets": Asset,
+    "houses": House,
+    "educations": Education,
+    "family_members": FamilyMember,
+    "careers": Career,
+    "retirements": Retirement,
+}
+
+
+class SimulationInputs(NamedTuple):
+    """1ユーザー分の計算入力"""
+    timeline: Timeline
+    initial_assets: float
+    family_count: int
+    has_children: bool
+
+
+def build_simulation_inputs(rows: Dict[str, list], years: int, current_year: int) -> SimulationInputs:
+    """カテゴリごとの行（INPUT_MODELS のキー → 行のリスト）から計算入力を作る"""
+    family_members = rows["family_members"]
+
+    # 本人の年齢を取得
+    current_age = None
+    birth_month = None
+    person = next((f for f in family_members if f.relationship_type == '本人'), None)
+    if person and person.birth_date:
+        current_age = current_year - person.birth_date.year
+        birth_month = person.birth_date.month
+
+    # 入力を年ごとのイベント表に変換（1ユーザーにつき1回）
+    timeline = compile_timeline(
+        incomes=rows["incomes"],
+        expenses=rows["expenses"],
+        houses=rows["houses"],
+        educations=rows["educations"],
+        careers=rows["careers"],
+        retirements=rows["retirements"],
+        current_year=current_year,
+        years=years,
+        current_age=current_age,
+        birth_month=birth_month
+    )
+
+    return SimulationInputs(
+        timeline=timeline,
+        initial_assets=sum(asset.amount for asset in rows["assets"]),  # 初期資産合計
+        family_count=len(family_members),
+        has_children=any('子供' in f.relationship_type for f in family_members)
+    )
+
+
+def load_simulation_inputs(db: Session, user_id: int, years: int) -> SimulationInputs:
+    """1ユーザー分の入力をDBから読み込む"""
+    return load_simulation_inputs_bulk(db, [user_id], years)[user_id]
+
+
+def load_simulation_inputs_bulk(db: Session, user_ids: Iterable[int], years: int) -> Dict[int, SimulationInputs]:
+    """
+    複数ユーザー分の入力をまとめて読み込む
+
+    戻り値：{ユーザーID: SimulationInputs}
+    """
+    user_ids = list(user_ids)
+    rows_by_user: Dict[int, Dict[str, List]] = {
+        user_id: {key: [] for key in INPUT_MODELS} for user_id in user_ids
+    }
+    for key, model in INPUT_MODELS.items():
+        query = db.query(model).filter(model.user_id.in_(user_ids)).order_by(model.id)
+        grouped = defaultdict(list)
+        for row in query:
+            grouped[row.user_id].append(row)
+        for user_id, rows in grouped.items():
+            rows_by_user[user_id][key] = rows
+
+    current_year = datetime.now().year
+    return {
+        user_id: build_simulation_inputs(rows, years, current_year)
+        for user_id, rows in rows_by_user.items()
+    }
+
+
+def simulate_payload(inputs: SimulationInputs, resolution: str = "yearly") -> Dict:
+    """
+    シミュレーションを実行し、表示・AI提案・保存に必要な情報をまとめた dict を返す
+
+    なぜモジュールの関数にするのか：プロセスプールに渡すには pickle できる関数である必要がある
+    """
+    result = run_simulation(inputs.timeline, inputs.initial_assets, resolution)
+    result.update({
+        "initial_assets": inputs.initial_assets,
+        "current_age": inputs.timeline.current_age,
+        "event_years": inputs.timeline.event_years(),
+        "family_count": inputs.family_count,
+        "has_children": inputs.has_children,
+    })
+    return result
@@ -0,0 +1,58 @@
+# 事前計算済みシミュレーション結果の読み書き
+# 初心者向け解説：simulation_results テーブルを「キャッシュ」として使うための関数
+#
+# 流れ：
+# - 夜間バッチ（app/batch/precompute.py）が save_result() で書き込む
+# - /api/simulation/cashflow は get_fresh_result() で先に探し、なければその場で計算する
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.simulation_result import SimulationResult
+from app.models.user import User
+
+
+def get_fresh_result(db: Session, user: User, years: int, resolution: str) -> Optional[Dict]:
+    """
+    まだ有効な事前計算結果を取得（なければ None）
+
+    有効 = 計算後に入力データが変わっておらず、開始年も今年のまま
+    """
+    row = db.query(SimulationResult).filter(
+        SimulationResult.user_id == user.id,
+        SimulationResult.years == years,
+        SimulationResult.resolution == resolution,
+        SimulationResult.data_version == user.data_version,
+        SimulationResult.base_year == datetime.now().year
+    ).first()
+    return row.result if row else None
+
+
+def save_result(
+    db: Session,
+    user_id: int,
+    years: int,
+    resolution: str,
+    data_version: int,
+    base_year: int,
+    result: Dict
+):
+    """
+    事前計算結果を保存（同じ条件の行があれば上書き）
+
+    注意：commit は呼び出し側で行う（バッチではチャンク単位でまとめて commit する）
+    """
+    row = db.query(SimulationResult).filter(
+        SimulationResult.user_id == user_id,
+        SimulationResult.years == years,
+        SimulationResult.resolution == resolution
+    ).first()
+    if row is None:
+        row = SimulationResult(user_id=user_id, years=years, resolution=resolution)
+        db.add(row)
+    row.data_version = data_version
+    row.base_year = base_year
+    row.result = result
+    row.computed_at = datetime.utcnow()
@@ -0,0 +1,294 @@
+# タイムラインコンパイラ
+# 初心者向け解説：シミュレーションの入力（キャリア・老後・住宅・教育の行）を、
+# 「年 → イベント」の表に1回だけ変換しておくモジュール
+#
+# なぜ必要なのか：
+# - 以前は年ごとのループの中で「この年のキャリアイベントは？」「それより前のイベントは？」と
+#   毎回リストを探し直していた（年数 × イベント数 の計算量）
+# - 先に表を作っておけば、ループの中は辞書の参照と配列の添字アクセスだけで済む
+# - 年次・月次のどちらの計算モードも、この表だけを入力にする
+#
+# 注目ポイント：
+# - Timeline はORMオブジェクトを持たない（数値・タプル・NumPy配列だけ）
+#   → DBセッションが閉じた後でも使え、別プロセスへもそのまま渡せる
+
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# === デフォルト値 ===
+DEFAULT_BASE_INCOME = 5000000  # 年収が未登録の場合
+DEFAULT_INCREASE_RATE = 2  # 昇給率（%）
+DEFAULT_RETIREMENT_AGE = 65  # 定年
+
+# === 種類の分類 ===
+MONTHLY_OCCURRENCES = ['月収', '12']  # 毎月発生する収入・支出
+RENT_TYPES = ['賃貸', '家賃']
+LOAN_TYPES = ['住宅ローン', 'マンションローン', '購入', '新築マンション']
+
+
+class HouseEvent(NamedTuple):
+    """
+    住宅1件分の計算用データ
+
+    kind:
+    - "monthly"：毎月 amount を支払う（賃貸、購入年・ローン期間が未設定のローン）
+    - "loan"   ：purchase_year に購入し、翌期から返済するローン
+    """
+    kind: str
+    amount: float
+    purchase_year: Optional[int] = None
+    purchase_month: int = 1
+    loan_term: int = 0
+    down_payment: float = 0.0
+    monthly_payment: float = 0.0
+    total_repayment: float = 0.0
+
+
+class RetirementStream(NamedTuple):
+    """老後資金1件分の計算用データ（年齢で発生するので年ではなく開始年齢で持つ）"""
+    retirement_type: str
+    start_age: int
+    monthly_amount: Optional[float]
+    total_amount: Optional[float]
+
+
+@dataclass
+class Timeline:
+    """
+    コンパイル済みのシミュレーション入力
+
+    年をキーにした表：
+    - career_events: {イベント年: 予想年収}（同じ年に複数あれば先頭のもの）
+    - increase_rates: 年オフセットごとに適用される昇給率（前方補完済み）
+    - education_costs: 年オフセットごとの教育費
+    - purchase_years: 住宅購入年の集合
+    """
+    start_year: int
+    year_count: int
+    current_age: Optional[int]
+    birth_month: Optional[int]
+
+    base_income: float
+    side_job_income: float
+    annual_expense_base: float
+    expense_template: np.ndarray  # 12か月分（毎年同じパターンの支出）
+
+    career_events: Dict[int, float]
+    increase_rates: np.ndarray
+    houses: List[HouseEvent]
+    education_costs: np.ndarray
+    education_years: List[int]
+    retirements: List[RetirementStream]
+
+    def event_years(self) -> List[int]:
+        """
+        グラフの間引きで必ず残すイベント年
+
+        住宅購入年・ローン完済年、キャリアイベント年、教育費の開始・終了年、
+        定年の年、老後資金の受取開始年
+        """
+        years = set(self.career_events)
+        years.update(self.education_years)
+        for house in self.houses:
+            if house.kind == "loan":
+                years.add(house.purchase_year)
+                years.add(house.purchase_year + house.loan_term)
+        if self.current_age is not None:
+            years.add(self.start_year + DEFAULT_RETIREMENT_AGE - self.current_age)
+            for retirement in self.retirements:
+                years.add(self.start_year + retirement.start_age - self.current_age)
+        return sorted(years)
+
+
+def calc_base_income(incomes) -> float:
+    """収入ページから現在の本業年収を取得（未登録ならデフォルト）"""
+    for income in incomes:
+        if income.income_type in ['月収', '月給']:
+            return income.amount * 12
+        elif income.income_type in ['年収', '年俸']:
+            return income.amount
+    return DEFAULT_BASE_INCOME
+
+
+def calc_side_job_income(incomes, careers, current_year: int) -> float:
+    """副業収入（年額）を計算：収入ページの副業 + 開始済みのキャリアイベントの副業"""
+    side_job_income = 0
+    for income in incomes:
+        if '副業' in income.income_type or '副収入' in income.income_type:
+            if income.occurrence_type in MONTHLY_OCCURRENCES:
+                side_job_income += income.amount * 12
+            else:
+                side_job_income += income.amount
+
+    # キャリアイベントから副業開始を加算
+    for career in careers:
+        if ('副業' in career.career_type) and career.expected_income:
+            if not career.event_year or career.event_year <= current_year:
+                side_job_income += career.expected_income
+
+    return side_job_income
+
+
+def calc_loan_payment(loan_amount: float, loan_rate: Optional[float], loan_term: int):
+    """
+    元利均等返済の月々返済額と返済総額（元金+利息）を計算
+
+    月々返済額 = ローン元金 × (月利 × (1 + 月利)^返済回数) / ((1 + 月利)^返済回数 - 1)
+    """
+    num_payments = loan_term * 12
+    if loan_rate and loan_rate > 0:
+        monthly_rate = loan_rate / 100 / 12  # %を小数に変換して月利へ
+        growth = (1 + monthly_rate) ** num_payments
+        monthly_payment = loan_amount * (monthly_rate * growth) / (growth - 1)
+        return monthly_payment, monthly_payment * num_payments
+    # 金利0%の場合は単純計算
+    return loan_amount / num_payments, loan_amount
+
+
+def calc_loan_balance(loan_amount: float, loan_rate: Optional[float], loan_term: int, months_paid: int) -> float:
+    """
+    元利均等返済で months_paid 回返済した後のローン残高
+
+    残高 = 元金 × (1 + 月利)^k - 月々返済額 × ((1 + 月利)^k - 1) / 月利
+    """
+    num_payments = loan_term * 12
+    months_paid = max(0, min(months_paid, num_payments))
+    monthly_payment, _ = calc_loan_payment(loan_amount, loan_rate, loan_term)
+    if loan_rate and loan_rate > 0:
+        monthly_rate = loan_rate / 100 / 12
+        growth = (1 + monthly_rate) ** months_paid
+        balance = loan_amount * growth - monthly_payment * (growth - 1) / monthly_rate
+    else:
+        balance = loan_amount - monthly_payment * months_paid
+    return max(balance, 0.0)
+
+
+def compile_timeline(
+    incomes,
+    expenses,
+    houses,
+    educations,
+    careers,
+    retirements,
+    current_year: int,
+    years: int,
+    current_age: Optional[int] = None,
+    birth_month: Optional[int] = None
+) -> Timeline:
+    """
+    各カテゴリの行からタイムラインを作る（1リクエストにつき1回だけ呼ぶ）
+
+    引数：
+        incomes〜retirements: 各カテゴリの行（ORMオブジェクトでも、同じ属性を持つ物でも可）
+        current_year: 開始年
+        years: シミュレーション年数（配列の長さは years + 1）
+        current_age: 本人の現在の年齢（不明なら None）
+        birth_month: 本人の誕生月（不明なら None）
+    """
+    year_count = years + 1
+
+    # === 支出：年額の合計と、12か月への配分 ===
+    annual_expense_base = 0
+    expense_template = np.zeros(12)
+    for expense in expenses:
+        if expense.occurrence_type in MONTHLY_OCCURRENCES:
+            annual_expense_base += expense.amount * 12
+            expense_template += expense.amount
+        else:
+            annual_expense_base += expense.amount
+            month = expense.expense_date.month if expense.expense_date else 1
+            expense_template[month - 1] += expense.amount
+
+    # === キャリア：イベント年の辞書と、昇給率の前方補完 ===
+    sorted_careers = sorted([c for c in careers if c.event_year], key=lambda x: x.event_year)
+    career_events = {}
+    rate_at_event = np.full(year_count, np.nan)
+    initial_rate = DEFAULT_INCREASE_RATE
+    for career in sorted_careers:
+        career_events.setdefault(career.event_year, career.expected_income or 0)
+        rate = career.salary_increase_rate if career.salary_increase_rate is not None else DEFAULT_INCREASE_RATE
+        offset = career.event_year - current_year
+        if offset < 0:
+            initial_rate = rate
+        elif offset < year_count:
+            rate_at_event[offset] = rate
+
+    # 年 y に適用される昇給率 = y より前の最後のイベントの昇給率
+    # （1年ずらしてから、値のある位置を前方へコピーする）
+    increase_rates = np.concatenate(([initial_rate], rate_at_event[:-1]))
+    filled = np.maximum.accumulate(np.where(np.isnan(increase_rates), 0, np.arange(year_count)))
+    increase_rates = increase_rates[filled]
+
+    # === 住宅：ローンの返済額はここで1回だけ計算 ===
+    house_events = []
+    for house in houses:
+        if house.house_type in RENT_TYPES:
+            house_events.append(HouseEvent(kind="monthly", amount=house.amount))
+        elif house.house_type in LOAN_TYPES:
+            if house.purchase_year and house.loan_term and house.amount:
+                down_payment = house.down_payment or 0
+                monthly_payment, total_repayment = calc_loan_payment(
+                    house.amount - down_payment, house.loan_rate, house.loan_term
+                )
+                # 購入月（start_date が購入年なら、その月。なければ1月）
+                purchase_month = 1
+                if house.start_date and house.start_date.year == house.purchase_year:
+                    purchase_month = house.start_date.month
+                house_events.append(HouseEvent(
+                    kind="loan",
+                    amount=house.amount,
+                    purchase_year=house.purchase_year,
+                    purchase_month=purchase_month,
+                    loan_term=house.loan_term,
+                    down_payment=down_payment,
+                    monthly_payment=monthly_payment,
+                    total_repayment=total_repayment
+                ))
+            else:
+                # 購入年やローン期間が未設定の場合は月額の支出として計算
+                house_events.append(HouseEvent(kind="monthly", amount=house.amount))
+
+    # === 教育：年ごとの費用 ===
+    education_costs = np.zeros(year_count)
+    education_years = set()
+    for education in educations:
+        if education.amount:
+            if education.start_year and education.end_year:
+                education_years.update((education.start_year, education.end_year))
+                first = max(education.start_year - current_year, 0)
+                last = min(education.end_year - current_year + 1, year_count)
+                if first < last:
+                    education_costs[first:last] += education.annual_cost or education.amount
+            else:
+                # 年次が設定されていない場合は全期間で計算
+                education_costs += education.amount
+
+    # === 老後：開始年齢つきのストリームに変換 ===
+    retirement_streams = [
+        RetirementStream(
+            retirement_type=retirement.retirement_type,
+            start_age=retirement.retirement_age if retirement.retirement_age else DEFAULT_RETIREMENT_AGE,
+            monthly_amount=retirement.monthly_amount,
+            total_amount=retirement.total_amount
+        )
+        for retirement in retirements
+    ]
+
+    return Timeline(
+        start_year=current_year,
+        year_count=year_count,
+        current_age=current_age,
+        birth_month=birth_month,
+        base_income=calc_base_income(incomes),
+        side_job_income=calc_side_job_income(incomes, careers, current_year),
+        annual_expense_base=annual_expense_base,
+        expense_template=expense_template,
+        career_events=career_events,
+        increase_rates=increase_rates,
+        houses=house_events,
+        education_costs=education_costs,
+        education_years=sorted(education_years),
+        retirements=retirement_streams
+    )
@@ -5,10 +5,15 @@ from app.utils.security import (
     create_access_token,
     get_current_user
 )
+from app.utils.query import load_response_columns
+from app.utils.pagination import encode_cursor, decode_cursor
 
 __all__ = [
     "get_password_hash",
     "verify_password",
     "create_access_token",
-    "get_current_user"
+    "get_current_user",
+    "load_response_columns",
+    "encode_cursor",
+    "decode_cursor"
 ]
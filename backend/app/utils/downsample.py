@@ -0,0 +1,156 @@
+# 時系列の間引き（ダウンサンプリング）ユーティリティ
+# 初心者向け解説：長期シミュレーションのグラフ用に、見た目を保ったまま点数を減らします
+#
+# なぜ必要なのか：
+# - 100年分の月次データ（1200点）などはブラウザで描画しきれない
+# - 画面の幅以上の点を送っても見た目は変わらない
+# - 点数の上限を決めておけば、通信量も描画コストも期間に関係なく一定になる
+
+from typing import Dict, Iterable, List, Sequence
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(values: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets で残す点のインデックスを選ぶ
+
+    なぜ LTTB なのか：
+    - 各バケットから「前後の点と作る三角形の面積が最大の点」を選ぶ
+    - 山や谷などグラフの形を決める点が残りやすい
+    - 計算量は O(n) で軽い
+
+    x 座標はインデックス（等間隔）として扱います。
+    """
+    n = len(values)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        # 始点と終点だけ
+        return [0, n - 1][:max(threshold, 0)]
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # 直前に選んだ点
+
+    for i in range(threshold - 2):
+        # 次のバケットの平均点（三角形の3点目）
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_count = next_end - next_start
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / next_count
+
+        # 現在のバケットから面積最大の点を選ぶ
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        max_area = -1.0
+        chosen = start
+        for j in range(start, end):
+            area = abs(
+                (a - avg_x) * (values[j] - values[a])
+                - (a - j) * (avg_y - values[a])
+            )
+            if area > max_area:
+                max_area = area
+                chosen = j
+        selected.append(chosen)
+        a = chosen
+
+    selected.append(n - 1)
+    return selected
+
+
+def minmax_indices(values: Sequence[float], threshold: int) -> List[int]:
+    """
+    min/max バケッティングで残す点のインデックスを選ぶ
+
+    各バケットの最小点と最大点を残すので、急な落ち込み（住宅購入の年など）を
+    絶対に取りこぼさない。点数は最大で threshold 個（始点・終点を含む）。
+    """
+    n = len(values)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        # 始点と終点だけ
+        return [0, n - 1][:max(threshold, 0)]
+
+    # 始点・終点を除いた枠（slots）を、間の点（1 〜 n-2）のバケットに1バケット2点で割り当てる
+    # 枠が奇数なら、最後のバケットは最小・最大のうち平均から遠い方の1点だけ
+    slots = threshold - 2
+    bucket_count = (slots + 1) // 2
+    bucket_size = (n - 2) / bucket_count
+    selected = {0, n - 1}
+    for b in range(bucket_count):
+        start = int(b * bucket_size) + 1
+        end = min(int((b + 1) * bucket_size) + 1, n - 1)
+        if start >= end:
+            continue
+        bucket = range(start, end)
+        low = min(bucket, key=lambda j: values[j])
+        high = max(bucket, key=lambda j: values[j])
+        if slots % 2 == 1 and b == bucket_count - 1:
+            mean = sum(values[j] for j in bucket) / len(bucket)
+            selected.add(max((low, high), key=lambda j: abs(values[j] - mean)))
+        else:
+            selected.update((low, high))
+    return sorted(selected)
+
+
+def downsample_series(
+    x: Sequence[int],
+    series: Dict[str, Sequence[float]],
+    max_points: int,
+    key: str,
+    keep_x: Iterable[int] = (),
+    method: str = "lttb",
+) -> Dict[str, List]:
+    """
+    x 軸と複数の系列を、同じ点で揃えて max_points 点以下に間引く
+
+    引数：
+        x: x軸（年など）
+        series: 系列名 → 値のリスト（すべて x と同じ長さ）
+        max_points: 残す点数の上限
+        key: 点を選ぶ基準にする系列名（例："cumulative_assets"）
+        keep_x: 必ず残す x の値（住宅購入年、定年の年などのイベント）
+        method: "lttb" または "minmax"
+
+    戻り値：
+        {"x": [...], 系列名: [...], ...}（間引き後）
+
+    注目ポイント：
+    - イベント年を優先して残し、残りの枠を LTTB / minmax で埋める
+    - 戻り値の点数は、イベント年が多い場合も含めて必ず max_points 以下
+    - すべての系列で同じインデックスを使うので、グラフの年がずれない
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"未対応の間引き方式です: {method}")
+
+    n = len(x)
+    if max_points >= n:
+        return {"x": list(x), **{name: list(values) for name, values in series.items()}}
+
+    if max_points < 2:
+        indices = [0, n - 1][:max(max_points, 0)]
+    else:
+        position = {value: i for i, value in enumerate(x)}
+        events = sorted({position[value] for value in keep_x if value in position} - {0, n - 1})
+
+        # イベント年だけで上限を超える場合は、イベントを等間隔に間引く（結果は必ず max_points 点以下）
+        event_slots = max_points - 2
+        if len(events) > event_slots:
+            events = [events[i * len(events) // event_slots] for i in range(event_slots)]
+        keep = {0, n - 1, *events}
+
+        # 残りの枠（budget）を LTTB / minmax で埋める
+        # picker に渡す点数は始点・終点を含むので budget + 2（始点・終点は keep と重なる）
+        budget = max_points - len(keep)
+        picker = lttb_indices if method == "lttb" else minmax_indices
+        chosen = set(picker(series[key], budget + 2)) if budget > 0 else set()
+        indices = sorted(keep | chosen)
+
+    result = {"x": [x[i] for i in indices]}
+    for name, values in series.items():
+        result[name] = [values[i] for i in indices]
+    return result
@@ -0,0 +1,33 @@
+# ページネーションユーティリティ
+# 初心者向け解説：「続きを読む」用のカーソル（目印）を作る・読むためのヘルパー
+#
+# なぜ OFFSET ではなくカーソル（キーセット）なのか：
+# - OFFSET 10000 は「先頭から1万件読み飛ばす」ので、奥のページほど遅くなる
+# - カーソル方式は「前のページの最後の行より古いもの」を索引から直接探すので、
+#   何ページ目でも1ページ分の読み込みで済む
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    (作成日時, ID) をURLに載せられる文字列に変換
+
+    なぜ ID も含めるのか：同じ日時の行が複数あっても順番が一意に決まるように
+    """
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    encode_cursor で作った文字列を (作成日時, ID) に戻す
+
+    不正な文字列の場合は ValueError
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError("不正なカーソルです") from e
@@ -0,0 +1,24 @@
+# クエリユーティリティ
+# 初心者向け解説：一覧取得で「レスポンスに必要な列だけ」を読み込むためのヘルパー
+
+from typing import Type
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+def load_response_columns(model, schema: Type[BaseModel]):
+    """
+    レスポンススキーマに含まれる列だけを読み込む load_only オプションを作る
+
+    なぜ必要なのか：
+    - 一覧APIで使わない列（将来追加される列も含む）を読み込まない
+    - 取得データ量とORMオブジェクト生成のコストを減らせる
+
+    使い方例：
+    db.query(House).options(load_response_columns(House, HouseResponse)).all()
+    """
+    columns = model.__table__.columns
+    return load_only(*[
+        getattr(model, name)
+        for name in schema.model_fields
+        if name in columns
+    ])
@@ -135,3 +135,36 @@ async def get_current_user(
         raise credentials_exception
     
     return user
+
+def email_from_token(token: str) -> Optional[str]:
+    """
+    トークンからメールアドレスを取り出す（無効なトークンなら None）
+    
+    なぜ別に用意するのか：ミドルウェア（app/services/profiling.py）のように
+    Depends が使えない場所でも、トークンの検証だけはできるようにするため
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+def is_admin_email(email: Optional[str]) -> bool:
+    """管理者（settings.ADMIN_EMAILS に含まれるメールアドレス）か"""
+    return email is not None and email.lower() in {admin.lower() for admin in settings.ADMIN_EMAILS}
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """
+    現在ログイン中のユーザーが管理者であることを確認
+    
+    使い方例：
+    @router.get("/admin-only")
+    def admin_route(admin: User = Depends(get_current_admin)):
+        ...
+    """
+    if not is_admin_email(current_user.email):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="管理者のみ利用できます",
+        )
+    return current_user
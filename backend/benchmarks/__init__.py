@@ -0,0 +1,2 @@
+# ベンチマーク __init__.py
+# 初心者向け解説：性能計測用のスクリプト置き場（本番コードからは使わない）
@@ -0,0 +1,96 @@
+# 起動時間（コールドスタート）のベンチマーク
+# 初心者向け解説：サーバーのプロセスを起動してから、最初のリクエスト（/health）に応答するまでの時間を測ります
+#                Azure のスケールアウトや再起動で、新しいワーカーが使えるようになるまでの時間の目安です
+#
+# 実行方法（backend ディレクトリで）：
+#   python -m benchmarks.cold_start_benchmark --repeat 5
+#   # 本番と同じ DB で測る場合（先に python -m alembic upgrade head を済ませておく）
+#   python -m benchmarks.cold_start_benchmark --database-url mysql+pymysql://...
+#
+# 表示する時間：
+# - import   : python -c "import app.main" にかかる時間（モジュールの読み込みだけ）
+# - ready    : uvicorn を起動してから /health が 200 を返すまで（lifespan の起動処理を含む）
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    """app.main の読み込み時間（ミリ秒）"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_ready(env: dict, timeout: float) -> float:
+    """uvicorn を起動してから /health に応答するまでの時間（ミリ秒）"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError("サーバーが起動できませんでした（DATABASE_URL などを確認してください）")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return (time.perf_counter() - started) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"{timeout} 秒以内に起動しませんでした")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="サーバーの起動時間を計測")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", help="省略時は一時ファイルの SQLite")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    env = {**os.environ, "DEBUG": "false"}
+    db_file = None
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        db_file.close()
+        env["DATABASE_URL"] = f"sqlite:///{db_file.name}"
+        # 本番と同じく、テーブルは起動前にマイグレーションで作っておく
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        imports = [measure_import(env) for _ in range(args.repeat)]
+        readies = [measure_ready(env, args.timeout) for _ in range(args.repeat)]
+    finally:
+        if db_file is not None:
+            os.remove(db_file.name)
+
+    print(f"repeat={args.repeat}")
+    print(f"import: median {statistics.median(imports):7.0f} ms  (min {min(imports):.0f})")
+    print(f"ready : median {statistics.median(readies):7.0f} ms  (min {min(readies):.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# LLM 応答のパース時間のベンチマーク
+# 初心者向け解説：記録した Gemini の応答（app/services/llm_recording.py）から JSON を取り出す処理
+#                （正規表現 \{.*\} + json.loads）だけを何度も動かして、時間を測ります
+#
+# 実行方法（backend ディレクトリで）：
+#   # 記録ファイルを使う（LLM_RECORD_FILE=llm_fixtures.jsonl で記録したもの）
+#   python -m benchmarks.llm_parsing_benchmark --fixtures llm_fixtures.jsonl
+#   # 記録がなければ、応答の前後に説明文を足して大きさを変えた合成の応答で測る
+#   python -m benchmarks.llm_parsing_benchmark --pad-chars 0 2000 20000
+#
+# 注目ポイント：
+# - \{.*\} は貪欲マッチなので、応答の最初の { から最後の } まで読み直す。
+#   JSON の前後に説明文が長く付いた応答ほど遅くなるかを、--pad-chars で確かめられる
+
+import argparse
+import json
+import statistics
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from app.routers.simulation import parse_ai_suggestions
+from app.services.fake_llm import FAKE_SUGGESTIONS
+from app.services.gemini_service import GeminiService
+from app.services.llm_recording import load_fixtures
+
+# operation → パース処理（記録の応答テキストを受け取る）
+PARSERS: Dict[str, Callable[[str], Dict]] = {
+    "extract_all_info": GeminiService.parse_extraction_result,
+    "ai_suggestions": parse_ai_suggestions,
+}
+
+SAMPLE_EXTRACTION = {
+    "expense": {"expense_type": "変動費", "category": "食費", "occurrence_type": "12", "amount": "50000"},
+}
+FILLER = "収支のバランスを見直すことが大切です。"
+
+
+def synthetic_texts(pad_chars: int) -> Dict[str, List[str]]:
+    """説明文を前後に pad_chars 文字ずつ足した、それらしい応答"""
+    padding = (FILLER * (pad_chars // len(FILLER) + 1))[:pad_chars]
+    extraction = json.dumps(SAMPLE_EXTRACTION, ensure_ascii=False, indent=2)
+    suggestions = json.dumps(FAKE_SUGGESTIONS, ensure_ascii=False, indent=2)
+    return {
+        "extract_all_info": [f"{padding}\n```json\n{extraction}\n```\n{padding}", f"{padding}\n{extraction}\n{padding}"],
+        "ai_suggestions": [f"{padding}\n```json\n{suggestions}\n```\n{padding}"],
+    }
+
+
+def measure(parser: Callable[[str], Dict], texts: List[str], repeat: int) -> float:
+    """1件あたりのパース時間（マイクロ秒）の中央値"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            try:
+                parser(text)
+            except ValueError:
+                pass  # 壊れた応答（アプリでは予備の処理になる）も時間には含める
+        timings.append((time.perf_counter() - start) * 1_000_000 / len(texts))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 応答の JSON パース時間を計測")
+    parser.add_argument("--fixtures", help="記録ファイル（JSONL）")
+    parser.add_argument("--pad-chars", nargs="+", type=int, default=[0, 2000, 20000],
+                        help="合成の応答で JSON の前後に足す文字数（--fixtures がない時）")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'source':<22}{'operation':<20}{'count':>6}{'avg chars':>11}{'median µs':>12}")
+    if args.fixtures:
+        texts_by_operation = defaultdict(list)
+        for entry in load_fixtures(args.fixtures):
+            texts_by_operation[entry["operation"]].append(entry["text"])
+        sources = [(args.fixtures, texts_by_operation)]
+    else:
+        sources = [(f"synthetic pad={pad}", synthetic_texts(pad)) for pad in args.pad_chars]
+
+    for source, texts_by_operation in sources:
+        for operation, parse in PARSERS.items():
+            texts = texts_by_operation.get(operation)
+            if not texts:
+                continue
+            median = measure(parse, texts, args.repeat)
+            average_chars = sum(len(text) for text in texts) / len(texts)
+            print(f"{source[-22:]:<22}{operation:<20}{len(texts):>6}{average_chars:>11.0f}{median:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# エンドツーエンドの負荷試験
+# 初心者向け解説：起動中のAPIサーバーに、たくさんの架空ユーザーから同時にリクエストを送り、
+#                ルートごとの応答時間（p50 / p95 / p99）を測ります
+#
+# 流れ：
+# 1. 架空ユーザーを登録・ログインし、家族・収入・支出・住宅・資産・教育・キャリア・老後の行を API で作る
+# 2. 決めた時間のあいだ、チャット・ダッシュボード・シミュレーションのリクエストを重み付きでランダムに送る
+# 3. ルートごとの件数・エラー数・秒間リクエスト数・p50 / p95 / p99 を表示する
+#
+# 実行方法：
+#   # サーバー（本物の Gemini を呼ばないように LLM_BACKEND=fake で起動）
+#   LLM_BACKEND=fake uvicorn app.main:app --port 8000
+#   # （レート制限で AI を呼ばない分も測りたくなければ LLM_RATE_LIMIT_PER_MINUTE=100000 も付ける）
+#   # 負荷をかける（backend ディレクトリで）
+#   python -m benchmarks.load_test --users 20 --concurrency 10 --duration 60
+#
+# 注意：本番のデータベースには向けないこと（架空ユーザーと行が残ります）
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+PASSWORD = "loadtest-password"
+
+# ユーザーが送りそうなチャット（情報の登録になるものと、ただの相談）
+CHAT_MESSAGES = [
+    "食費は月5万円です",
+    "月収は30万円です",
+    "携帯代が月8000円かかっています",
+    "投資信託を200万円持っています",
+    "家賃は月9万円です",
+    "ボーナスは年間80万円です",
+    "老後資金はいくら必要ですか？",
+    "貯金を増やすコツを教えてください",
+    "住宅ローンの繰上げ返済はした方がいいですか？",
+    "教育費はどのくらい準備すればいいですか？",
+]
+
+# (名前, 重み)：ダッシュボードの表示が多く、チャット・シミュレーションはそれより少ない想定
+TRAFFIC_MIX = [
+    ("chat", 3),
+    ("summary", 4),
+    ("assets", 3),
+    ("asset_history", 2),
+    ("chat_history", 2),
+    ("cashflow", 2),
+    ("cashflow_ai", 1),
+]
+
+
+def synthetic_rows(rng: random.Random) -> List[tuple]:
+    """1ユーザー分の、それらしい行 [(パス, JSON), ...] を作る"""
+    this_year = time.localtime().tm_year
+    age = rng.randint(25, 55)
+    rows = [
+        ("/api/family/", {"relationship_type": "本人", "gender": rng.choice(["男", "女"]),
+                          "birth_date": f"{this_year - age}-{rng.randint(1, 12):02d}-01"}),
+        ("/api/income/", {"income_type": "年収", "amount": rng.randrange(3_000_000, 12_000_000, 100_000)}),
+        ("/api/assets/", {"asset_type": "貯金", "name": "普通預金", "amount": rng.randrange(0, 10_000_000, 10_000)}),
+        ("/api/retirement/", {"retirement_type": "年金", "name": "年金", "amount": 0, "retirement_age": 65,
+                              "monthly_amount": rng.randrange(80_000, 220_000, 10_000)}),
+    ]
+    for category, low, high in [("食費", 30_000, 100_000), ("光熱費", 8_000, 30_000),
+                                ("通信費", 3_000, 20_000), ("娯楽費", 5_000, 60_000)]:
+        rows.append(("/api/expense/", {"expense_type": "固定費" if category in ("光熱費", "通信費") else "変動費",
+                                       "category": category, "occurrence_type": "12",
+                                       "amount": rng.randrange(low, high, 1_000)}))
+    if rng.random() < 0.4:
+        rows.append(("/api/income/", {"income_type": "副業", "occurrence_type": "12",
+                                      "amount": rng.randrange(10_000, 100_000, 5_000)}))
+    if rng.random() < 0.5:
+        rows.append(("/api/assets/", {"asset_type": "投資信託", "name": "インデックス",
+                                      "amount": rng.randrange(100_000, 5_000_000, 10_000)}))
+    if rng.random() < 0.5:
+        rows.append(("/api/house/", {"house_type": "購入", "name": "マンション",
+                                     "amount": rng.randrange(25_000_000, 60_000_000, 1_000_000),
+                                     "purchase_year": this_year + rng.randint(0, 10), "loan_term": 35,
+                                     "loan_rate": rng.choice([0.5, 0.9, 1.2, 1.5]),
+                                     "down_payment": rng.randrange(0, 8_000_000, 500_000)}))
+    else:
+        rows.append(("/api/house/", {"house_type": "賃貸", "name": "家賃",
+                                     "amount": rng.randrange(60_000, 150_000, 5_000)}))
+    for i in range(rng.choice([0, 0, 1, 2, 3])):
+        birth_year = this_year - rng.randint(0, 15)
+        rows.append(("/api/family/", {"relationship_type": f"子供{i + 1}", "gender": rng.choice(["男", "女"]),
+                                      "birth_date": f"{birth_year}-04-01"}))
+        rows.append(("/api/education/", {"education_type": "planned", "child_name": f"子供{i + 1}", "amount": 1,
+                                         "start_year": birth_year + 6, "end_year": birth_year + 22,
+                                         "annual_cost": rng.randrange(300_000, 1_500_000, 50_000)}))
+    for _ in range(rng.randint(0, 3)):
+        rows.append(("/api/career/", {"career_type": rng.choice(["転職", "昇進"]), "description": "キャリア",
+                                      "expected_income": rng.randrange(4_000_000, 15_000_000, 100_000),
+                                      "event_year": this_year + rng.randint(1, 20),
+                                      "salary_increase_rate": rng.choice([0, 1, 2, 3])}))
+    return rows
+
+
+async def create_user(client: httpx.AsyncClient, run_id: str, index: int, rng: random.Random) -> Dict[str, str]:
+    """架空ユーザーを登録・ログインし、行を作って認証ヘッダーを返す"""
+    email = f"loadtest+{run_id}-{index}@example.com"
+    response = await client.post("/api/auth/register", json={
+        "email": email, "username": f"loadtest-{index}", "password": PASSWORD
+    })
+    response.raise_for_status()
+    response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    for path, payload in synthetic_rows(rng):
+        (await client.post(path, json=payload, headers=headers)).raise_for_status()
+    return headers
+
+
+def pick_request(rng: random.Random) -> tuple:
+    """重み付きで次のリクエスト (ルート名, メソッド, パス, 引数) を選ぶ"""
+    name = rng.choices([name for name, _ in TRAFFIC_MIX], weights=[weight for _, weight in TRAFFIC_MIX])[0]
+    if name == "chat":
+        return name, "POST", "/api/chat/", {"json": {"message": rng.choice(CHAT_MESSAGES)}}
+    if name == "summary":
+        return name, "GET", "/api/summary", {}
+    if name == "assets":
+        return name, "GET", "/api/assets/", {}
+    if name == "asset_history":
+        return name, "GET", "/api/assets/history", {}
+    if name == "chat_history":
+        return name, "GET", "/api/chat/history", {}
+    include_ai = "true" if name == "cashflow_ai" else "false"
+    return name, "GET", "/api/simulation/cashflow", {"params": {"years": 50, "include_ai": include_ai}}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """最近傍法のパーセンタイル"""
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run(base_url: str, users: int, concurrency: int, duration: float,
+              seed: Optional[int], timeout: float) -> Dict:
+    rng = random.Random(seed)
+    run_id = uuid.uuid4().hex[:8]
+    latencies = defaultdict(list)  # ルート名 → 応答時間（ミリ秒）
+    errors = defaultdict(int)
+
+    limits = httpx.Limits(max_connections=concurrency + users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        print(f"👥 架空ユーザーを {users} 人作成中...")
+        setup = asyncio.Semaphore(concurrency)
+
+        async def create(index: int):
+            async with setup:
+                return await create_user(client, run_id, index, random.Random(rng.random()))
+
+        all_headers = await asyncio.gather(*[create(i) for i in range(users)])
+
+        print(f"🚀 {duration:.0f} 秒間、同時 {concurrency} 本でリクエスト中...")
+        deadline = time.monotonic() + duration
+
+        async def worker(worker_rng: random.Random):
+            while time.monotonic() < deadline:
+                name, method, path, kwargs = pick_request(worker_rng)
+                headers = worker_rng.choice(all_headers)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, headers=headers, **kwargs)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies[name].append((time.perf_counter() - started) * 1000)
+                if failed:
+                    errors[name] += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*[worker(random.Random(rng.random())) for _ in range(concurrency)])
+        elapsed = time.monotonic() - started
+
+    report = {}
+    for name, _ in TRAFFIC_MIX:
+        values = sorted(latencies.get(name, []))
+        if not values:
+            continue
+        report[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / elapsed, 2),
+            "mean_ms": round(statistics.fmean(values), 1),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+        }
+    return {"users": users, "concurrency": concurrency, "elapsed_seconds": round(elapsed, 1), "routes": report}
+
+
+def print_report(result: Dict):
+    print(f"\nusers={result['users']}, concurrency={result['concurrency']}, elapsed={result['elapsed_seconds']}s")
+    print(f"{'route':<14}{'count':>7}{'errors':>8}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in result["routes"].items():
+        print(f"{name:<14}{row['count']:>7}{row['errors']:>8}{row['rps']:>8.2f}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APIサーバーにエンドツーエンドの負荷をかける")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=20, help="作成する架空ユーザーの数")
+    parser.add_argument("--concurrency", type=int, default=10, help="同時に送るリクエストの数")
+    parser.add_argument("--duration", type=float, default=60, help="負荷をかける秒数")
+    parser.add_argument("--timeout", type=float, default=60, help="1リクエストのタイムアウト秒数")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.users, args.concurrency, args.duration, args.seed, args.timeout))
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# gunicorn の preload あり・なしで、ワーカーごとのメモリと起動時間を比べるベンチマーク
+# 初心者向け解説：gunicorn.conf.py の preload（アプリをマスターで1回だけ読み込んで fork で共有する）が
+#                どれだけ効いているかを測ります（Linux の /proc を読むので Linux 専用）
+#
+# 実行方法（backend ディレクトリで）：
+#   python -m benchmarks.preload_benchmark --workers 4
+#
+# 表示する値：
+# - ready : gunicorn を起動してから、全ワーカーの起動処理（lifespan）が終わるまでの時間
+# - RSS   : ワーカー1つが使っているメモリ（共有しているページも全部数える）
+# - USS   : ワーカー1つだけが使っているメモリ（他と共有していないページ）。ワーカーを1つ増やすと増える量の目安
+# - PSS   : 共有しているページを、共有しているプロセスの数で割って数えたメモリ
+# - total : マスター + 全ワーカーの PSS の合計（サーバー全体で実際に使っているメモリの目安）
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+
+READY_MARK = "が起動しました"  # app/main.py の lifespan が、ワーカーごとに起動の最後に表示する
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_memory(pid: int) -> Dict[str, float]:
+    """/proc/<pid>/smaps_rollup から RSS・PSS・USS（MB）を読む"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values.get("Rss", 0.0),
+        "pss": values.get("Pss", 0.0),
+        "uss": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure(env: dict, preload: bool, workers: int, requests: int, timeout: float) -> Dict:
+    """gunicorn を1回起動して、起動時間とプロセスごとのメモリを測る"""
+    port = _free_port()
+    env = {
+        **env,
+        "GUNICORN_PRELOAD": "true" if preload else "false",
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "WEB_CONCURRENCY": str(workers),
+        "PYTHONUNBUFFERED": "1",
+    }
+    ready_count = 0
+    ready_event = threading.Event()
+
+    def watch_output(stream):
+        nonlocal ready_count
+        for line in stream:
+            if READY_MARK in line:
+                ready_count += 1
+                if ready_count >= workers:
+                    ready_event.set()
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    threading.Thread(target=watch_output, args=(process.stdout,), daemon=True).start()
+    try:
+        if not ready_event.wait(timeout):
+            raise RuntimeError(f"{timeout} 秒以内に全ワーカーが起動しませんでした（{ready_count}/{workers}）")
+        ready_ms = (time.perf_counter() - started) * 1000
+
+        # 少しリクエストを処理させてから測る（起動直後だけでなく、動いている状態のメモリ）
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=10) as client:
+            for _ in range(requests):
+                client.get("/health").raise_for_status()
+
+        worker_memory = [read_memory(pid) for pid in child_pids(process.pid)]
+        master_memory = read_memory(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+    count = len(worker_memory)
+    return {
+        "mode": "preload" if preload else "no preload",
+        "ready_ms": ready_ms,
+        "workers": count,
+        "rss": sum(m["rss"] for m in worker_memory) / count,
+        "uss": sum(m["uss"] for m in worker_memory) / count,
+        "pss": sum(m["pss"] for m in worker_memory) / count,
+        "total_pss": master_memory["pss"] + sum(m["pss"] for m in worker_memory),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gunicorn の preload あり・なしで、ワーカーのメモリと起動時間を比較")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="測る前に処理させる /health の回数")
+    parser.add_argument("--database-url", help="省略時は一時ファイルの SQLite（マイグレーション済み）")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("このベンチマークは Linux（/proc/<pid>/smaps_rollup）でのみ動きます")
+
+    # SIM_PROCESS_WORKERS=0：計算プロセス（spawn で起動する別プロセス）は測定対象から外す
+    # JOB_BACKEND=redis：複数ワーカーでは memory だと起動しない（gunicorn.conf.py）。
+    #                    /health しか呼ばないので、Redis サーバーには接続しない
+    env = {**os.environ, "DEBUG": "false", "SIM_PROCESS_WORKERS": "0", "JOB_BACKEND": "redis"}
+    db_file = None
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        db_file.close()
+        env["DATABASE_URL"] = f"sqlite:///{db_file.name}"
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        results = [measure(env, preload, args.workers, args.requests, args.timeout) for preload in (False, True)]
+    finally:
+        if db_file is not None:
+            os.remove(db_file.name)
+
+    print(f"{'mode':<12}{'workers':>8}{'ready ms':>10}{'RSS MB':>9}{'USS MB':>9}{'PSS MB':>9}{'total PSS':>11}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['workers']:>8}{r['ready_ms']:>10.0f}{r['rss']:>9.1f}"
+              f"{r['uss']:>9.1f}{r['pss']:>9.1f}{r['total_pss']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
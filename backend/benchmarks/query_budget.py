@@ -0,0 +1,104 @@
+# エンドポイントごとの SQL 実行回数のチェック
+# 初心者向け解説：主なエンドポイントが「SQL を何回まで実行してよいか」（予算）を決めておき、
+#                超えたら失敗（終了コード 1）にします。N+1 問題などで回数が増えたことに気づくため
+#
+# 実行方法（backend ディレクトリで）：
+#   python -m benchmarks.query_budget
+#
+# 注目ポイント：
+# - 一時ファイルの SQLite と偽の LLM（LLM_BACKEND=fake）で動かすので、MySQL や Gemini は不要
+# - 架空ユーザーの行は benchmarks/load_test.py と同じ作り方（件数を増やしても回数が変わらないことも確かめる）
+# - 回数を減らした時は QUERY_BUDGETS も下げて、減った状態を守る
+
+import os
+import random
+import sys
+import tempfile
+
+# app を読み込む前に設定する（app.config は読み込み時に環境変数を読む）
+_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_db_file.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file.name}"
+os.environ["DEBUG"] = "false"
+os.environ["DB_CREATE_ALL_ON_STARTUP"] = "true"
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["LLM_FAKE_LATENCY_MS"] = "0"
+os.environ["LLM_RATE_LIMIT_PER_MINUTE"] = "100000"
+os.environ["LLM_RATE_LIMIT_BURST"] = "1000"
+os.environ["SIM_PROCESS_WORKERS"] = "0"
+
+import contextlib  # noqa: E402
+import io  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.query_stats import count_queries  # noqa: E402
+from benchmarks.load_test import synthetic_rows  # noqa: E402
+
+# (名前, メソッド, パス, 引数, SQL の上限回数)
+QUERY_BUDGETS = [
+    ("summary", "GET", "/api/summary", {}, 2),
+    ("assets", "GET", "/api/assets/", {}, 2),
+    ("asset_history", "GET", "/api/assets/history", {}, 2),
+    ("chat_history", "GET", "/api/chat/history", {}, 3),
+    ("cashflow", "GET", "/api/simulation/cashflow", {"params": {"include_ai": "false"}}, 10),
+    # 情報の登録なし（認証・保存・会話メモリーの読み込みと、応答後の要約の確認）
+    ("chat", "POST", "/api/chat/", {"json": {"message": "老後資金はいくら必要ですか？"}}, 9),
+    # 情報の登録あり（支出の追加と、家計サマリーの支出の列だけの再集計を含む）
+    ("chat_register", "POST", "/api/chat/", {"json": {"message": "食費は月5万円です"}}, 16),
+]
+
+
+def create_user(client: TestClient, email: str, rows: list) -> dict:
+    password = "budget-password"
+    client.post("/api/auth/register", json={"email": email, "username": "budget", "password": password})
+    token = client.post("/api/auth/login", json={"email": email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for path, payload in rows:
+        client.post(path, json=payload, headers=headers).raise_for_status()
+    return headers
+
+
+def main():
+    failures = []
+    print(f"{'endpoint':<16}{'rows':>6}{'queries':>9}{'budget':>8}")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), TestClient(app) as client:
+            rng = random.Random(1)
+            # 行の少ないユーザーと多いユーザー（行の数で SQL の回数が変わらないこと）
+            users = [
+                ("small", synthetic_rows(rng)),
+                ("large", [row for _ in range(10) for row in synthetic_rows(rng)]),
+            ]
+            results = []
+            for label, rows in users:
+                headers = create_user(client, f"budget-{label}@example.com", rows)
+                # 会話メモリーの要約が走る状態にしておく（チャットの回数に含まれるように）
+                for _ in range(12):
+                    client.post("/api/chat/", json={"message": "こんにちは"}, headers=headers)
+                for name, method, path, kwargs, budget in QUERY_BUDGETS:
+                    with count_queries() as stats:
+                        response = client.request(method, path, headers=headers, **kwargs)
+                    results.append((name, len(rows), stats, budget, response.status_code))
+    finally:
+        os.remove(_db_file.name)
+
+    for name, row_count, stats, budget, status_code in results:
+        mark = "" if stats.count <= budget and status_code < 400 else "  ← NG"
+        print(f"{name:<16}{row_count:>6}{stats.count:>9}{budget:>8}{mark}")
+        if status_code >= 400:
+            failures.append(f"{name}: HTTP {status_code}")
+        elif stats.count > budget:
+            failures.append(f"{name}（{row_count}行）: {stats.describe()}")
+
+    if failures:
+        print("\n⚠️ SQL の回数が予算を超えました:")
+        for failure in failures:
+            print(failure)
+        sys.exit(1)
+    print("✅ すべて予算内です")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# レスポンスシリアライズのベンチマーク
+# 初心者向け解説：一覧APIのレスポンス生成がどれくらい速くなったかを計測します
+#
+# 実行方法（backend ディレクトリで）：
+#   python -m benchmarks.serialization_benchmark --rows 1000 --repeat 50
+#
+# 比較する2つの方式：
+# - 旧方式：list内包表記で dict を手組み + response_model=List[dict] + 標準JSONResponse
+# - 新方式：ORMオブジェクトをそのまま返す + Pydanticスキーマ(from_attributes) + ORJSONResponse
+
+import argparse
+import statistics
+import time
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+import app.models  # noqa: F401  全モデルを登録（relationship解決のため）
+from app.models.house import House
+from app.schemas.house import HouseResponse
+
+
+def build_rows(count: int) -> List[House]:
+    """DBを使わずに House のORMオブジェクトを count 件作る"""
+    return [
+        House(
+            id=i,
+            user_id=1,
+            house_type="購入",
+            name=f"マンション{i}",
+            amount=35000000.0 + i,
+            currency="JPY",
+            notes="ベンチマーク用データ",
+            timeline="future",
+            purchase_year=2030,
+            loan_term=35,
+            loan_rate=1.2,
+            down_payment=5000000.0,
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(rows: List[House]) -> FastAPI:
+    """旧方式と新方式のエンドポイントを持つベンチマーク用アプリ"""
+    bench_app = FastAPI()
+
+    @bench_app.get("/old", response_model=List[dict], response_class=JSONResponse)
+    def old_style():
+        return [{
+            "id": h.id,
+            "house_type": h.house_type,
+            "name": h.name,
+            "amount": h.amount,
+            "currency": h.currency,
+            "start_date": str(h.start_date) if h.start_date else None,
+            "notes": h.notes,
+            "timeline": h.timeline,
+            "purchase_year": h.purchase_year,
+            "loan_term": h.loan_term,
+            "loan_rate": float(h.loan_rate) if h.loan_rate else None,
+            "down_payment": float(h.down_payment) if h.down_payment else None
+        } for h in rows]
+
+    @bench_app.get("/new", response_model=List[HouseResponse], response_class=ORJSONResponse)
+    def new_style():
+        return rows
+
+    return bench_app
+
+
+def measure(client: TestClient, path: str, repeat: int) -> List[float]:
+    """path を repeat 回叩いて、1回あたりの時間（ミリ秒）のリストを返す"""
+    client.get(path)  # ウォームアップ
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="一覧APIのシリアライズ性能を比較")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    client = TestClient(build_app(build_rows(args.rows)))
+
+    old = measure(client, "/old", args.repeat)
+    new = measure(client, "/new", args.repeat)
+
+    print(f"rows={args.rows}, repeat={args.repeat}")
+    print(f"旧方式 (dict + JSONResponse)        : median {statistics.median(old):7.2f} ms")
+    print(f"新方式 (schema + ORJSONResponse)    : median {statistics.median(new):7.2f} ms")
+    print(f"速度比: {statistics.median(old) / statistics.median(new):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
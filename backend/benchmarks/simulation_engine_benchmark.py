@@ -0,0 +1,194 @@
+# シミュレーションエンジンのマイクロベンチマーク
+# 初心者向け解説：大きさの違う架空の世帯データで simulate_cashflow（/api/simulation/cashflow の計算部分）を
+#                何度も動かし、計算時間とメモリ使用量を測ります
+#
+# 実行方法（backend ディレクトリで）：
+#   python -m benchmarks.simulation_engine_benchmark                      # 全パターンを計測
+#   python -m benchmarks.simulation_engine_benchmark --save base.json     # 結果を保存
+#   python -m benchmarks.simulation_engine_benchmark --compare base.json  # 保存した結果と比較
+#
+# 計測するパターン：世帯の大きさ（PROFILE_SIZES）× 期間（10 / 50 / 100 年）
+#
+# 注目ポイント：
+# - 時間は中央値と最小値、メモリは tracemalloc で測った1回あたりのピーク（計算中に確保した量）
+# - --compare では、時間が --tolerance 倍、メモリが --memory-tolerance 倍を超えて悪化した
+#   パターンを表示して終了コード 1 を返す（エンジンを書き換えた時の性能劣化のチェック用）
+# - 世帯データは --seed で固定しているので、毎回同じ入力で比較できる
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+from typing import Dict, List
+
+import app.models  # noqa: F401  全モデルを登録（relationship解決のため）
+from app.models.career import Career
+from app.models.education import Education
+from app.models.expense import Expense
+from app.models.house import House
+from app.models.income import Income
+from app.models.retirement import Retirement
+from app.services.simulation_engine import simulate_cashflow
+
+CURRENT_YEAR = 2026
+HORIZONS = (10, 50, 100)
+
+# 世帯の大きさ：名前 → (収入, 支出, 住宅ローン, 子供教育, キャリアイベント) の件数
+PROFILE_SIZES = {
+    "empty": (0, 0, 0, 0, 0),
+    "typical": (2, 10, 1, 2, 3),
+    "large": (50, 50, 3, 4, 12),
+    "huge": (200, 200, 10, 6, 48),
+}
+
+
+def build_profile(incomes: int, expenses: int, houses: int, children: int, careers: int,
+                  rng: random.Random) -> Dict[str, List]:
+    """DBを使わずに、指定した件数の行（ORMオブジェクト）を持つ世帯データを作る"""
+    income_types = [("年収", "定期"), ("副業", "12"), ("ボーナス", "1"), ("配当金", "1")]
+    expense_categories = ["食費", "光熱費", "通信費", "交通費", "娯楽費", "医療費", "旅行"]
+    return dict(
+        incomes=[
+            Income(income_type=income_types[i % len(income_types)][0],
+                   occurrence_type=income_types[i % len(income_types)][1],
+                   amount=rng.randrange(10_000, 8_000_000, 10_000))
+            for i in range(incomes)
+        ],
+        expenses=[
+            Expense(expense_type=rng.choice(["固定費", "変動費"]),
+                    category=expense_categories[i % len(expense_categories)],
+                    occurrence_type=rng.choice(["12", "1"]),
+                    amount=rng.randrange(1_000, 300_000, 1_000),
+                    expense_date=date(CURRENT_YEAR + rng.randint(0, 5), rng.randint(1, 12), 1))
+            for i in range(expenses)
+        ],
+        houses=[
+            House(id=i + 1, house_type="購入", name=f"住宅{i + 1}",
+                  amount=rng.randrange(20_000_000, 80_000_000, 1_000_000),
+                  purchase_year=CURRENT_YEAR + rng.randint(0, 30), loan_term=rng.choice([20, 30, 35]),
+                  loan_rate=rng.choice([0.5, 0.9, 1.2, 1.5]),
+                  down_payment=rng.randrange(0, 10_000_000, 500_000))
+            for i in range(houses)
+        ],
+        educations=[
+            Education(education_type="planned", child_name=f"子供{i // 3 + 1}", amount=1,
+                      start_year=CURRENT_YEAR + (i // 3) * 2 + (i % 3) * 6,
+                      end_year=CURRENT_YEAR + (i // 3) * 2 + (i % 3) * 6 + 5,
+                      annual_cost=rng.randrange(300_000, 1_500_000, 50_000))
+            for i in range(children * 3)  # 1人につき小学校・中高・大学の3行
+        ],
+        careers=[
+            Career(career_type=rng.choice(["転職", "昇進", "昇給"]), description=f"イベント{i + 1}",
+                   expected_income=rng.randrange(3_000_000, 15_000_000, 100_000),
+                   event_year=CURRENT_YEAR + 1 + i % 40, salary_increase_rate=rng.choice([0, 1, 2, 3]))
+            for i in range(careers)
+        ],
+        retirements=[
+            Retirement(retirement_type="年金", name="年金", amount=0, retirement_age=65,
+                       monthly_amount=150_000),
+            Retirement(retirement_type="一時金（退職金など）", name="退職金", amount=0,
+                       retirement_age=65, total_amount=20_000_000),
+        ],
+    )
+
+
+def _run(profile: Dict[str, List], years: int, resolution: str):
+    simulate_cashflow(
+        **profile,
+        initial_assets=5_000_000,
+        current_year=CURRENT_YEAR,
+        current_age=36,
+        years=years,
+        resolution=resolution,
+        birth_month=8,
+    )
+
+
+def measure(profile: Dict[str, List], years: int, resolution: str, repeat: int) -> Dict[str, float]:
+    """1パターンの計測結果（時間はミリ秒、メモリはKB）"""
+    timings = []
+    # デバッグ出力は計測から除外
+    with contextlib.redirect_stdout(io.StringIO()):
+        _run(profile, years, resolution)  # ウォームアップ
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _run(profile, years, resolution)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # tracemalloc は計算を遅くするので、時間とは別に1回だけ測る
+        tracemalloc.start()
+        _run(profile, years, resolution)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            tolerance: float, memory_tolerance: float) -> List[str]:
+    """基準より悪化したパターンの説明の一覧"""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        # 時間は揺れの少ない最小値で比べる（他の処理に割り込まれた回の影響を受けにくい）
+        if current["min_ms"] > base["min_ms"] * tolerance:
+            regressions.append(f"{key}: 時間 {base['min_ms']:.3f} → {current['min_ms']:.3f} ms")
+        if current["peak_kb"] > base["peak_kb"] * memory_tolerance:
+            regressions.append(f"{key}: メモリ {base['peak_kb']:.1f} → {current['peak_kb']:.1f} KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="シミュレーションエンジンの計算時間とメモリを計測")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILE_SIZES), default=list(PROFILE_SIZES))
+    parser.add_argument("--horizons", nargs="+", type=int, default=list(HORIZONS))
+    parser.add_argument("--resolution", choices=["yearly", "monthly"], default="yearly")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="結果を保存する JSON ファイル")
+    parser.add_argument("--compare", help="比較する基準の JSON ファイル（--save で保存したもの）")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="時間の悪化を許す倍率")
+    parser.add_argument("--memory-tolerance", type=float, default=1.10, help="メモリの悪化を許す倍率")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"resolution={args.resolution}, repeat={args.repeat}")
+    print(f"{'profile':<10}{'years':>6}{'median ms':>12}{'min ms':>10}{'peak KB':>10}")
+    for name in args.profiles:
+        profile = build_profile(*PROFILE_SIZES[name], rng=random.Random(args.seed))
+        for years in args.horizons:
+            row = measure(profile, years, args.resolution, args.repeat)
+            results[f"{name}/{years}y/{args.resolution}"] = row
+            print(f"{name:<10}{years:>6}{row['median_ms']:>12.3f}{row['min_ms']:>10.3f}{row['peak_kb']:>10.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 保存しました: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+        if regressions:
+            print("⚠️ 基準より悪化しました:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("✅ 基準と比べて悪化はありません")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# 年次モードと月次モードの計算時間の比較
+# 初心者向け解説：月次モード（1200マス）が年次モードの2倍以内で動くかを確認します
+#
+# 実行方法（backend ディレクトリで）：
+#   python -m benchmarks.simulation_resolution_benchmark --years 100 --repeat 200
+
+import argparse
+import contextlib
+import io
+import statistics
+import time
+from datetime import date
+
+import app.models  # noqa: F401  全モデルを登録（relationship解決のため）
+from app.models.career import Career
+from app.models.education import Education
+from app.models.expense import Expense
+from app.models.house import House
+from app.models.income import Income
+from app.models.retirement import Retirement
+from app.services.simulation_engine import simulate_cashflow
+
+
+def build_profile():
+    """典型的な世帯（住宅ローン1件・子供1人・転職2回）のデータを作る"""
+    return dict(
+        incomes=[
+            Income(income_type="年収", occurrence_type="定期", amount=6000000),
+            Income(income_type="副業", occurrence_type="12", amount=30000),
+        ],
+        expenses=[
+            Expense(expense_type="固定費", category="食費", occurrence_type="12", amount=80000),
+            Expense(expense_type="固定費", category="光熱費", occurrence_type="12", amount=20000),
+            Expense(expense_type="変動費", category="旅行", occurrence_type="1", amount=300000,
+                    expense_date=date(2026, 8, 1)),
+        ],
+        houses=[
+            House(id=1, house_type="購入", name="マンション", amount=40000000,
+                  purchase_year=2030, loan_term=35, loan_rate=1.2, down_payment=5000000),
+        ],
+        educations=[
+            Education(education_type="planned", child_name="子", amount=1,
+                      start_year=2027 + i * 3, end_year=2029 + i * 3, annual_cost=400000)
+            for i in range(5)
+        ],
+        careers=[
+            Career(career_type="転職", description="転職", expected_income=7000000,
+                   event_year=2029, salary_increase_rate=3),
+            Career(career_type="昇進", description="昇進", expected_income=9000000, event_year=2036),
+        ],
+        retirements=[
+            Retirement(retirement_type="年金", name="年金", amount=0, retirement_age=65,
+                       monthly_amount=150000),
+            Retirement(retirement_type="一時金（退職金など）", name="退職金", amount=0,
+                       retirement_age=65, total_amount=20000000),
+        ],
+    )
+
+
+def measure(profile, years: int, resolution: str, repeat: int):
+    """1回あたりの計算時間（ミリ秒）のリストを返す"""
+    timings = []
+    for _ in range(repeat):
+        # 年次モードのデバッグ出力は計測から除外
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            simulate_cashflow(
+                **profile,
+                initial_assets=5000000,
+                current_year=2026,
+                current_age=36,
+                years=years,
+                resolution=resolution,
+                birth_month=8,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="年次/月次シミュレーションの計算時間を比較")
+    parser.add_argument("--years", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    profile = build_profile()
+    yearly = statistics.median(measure(profile, args.years, "yearly", args.repeat))
+    monthly = statistics.median(measure(profile, args.years, "monthly", args.repeat))
+
+    print(f"years={args.years}, repeat={args.repeat}")
+    print(f"yearly : median {yearly:7.3f} ms")
+    print(f"monthly: median {monthly:7.3f} ms  ({(args.years + 1) * 12} マス)")
+    print(f"monthly / yearly = {monthly / yearly:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
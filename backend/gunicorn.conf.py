@@ -0,0 +1,62 @@
+# gunicorn の設定（startup.sh / Procfile から gunicorn -c gunicorn.conf.py app.main:app で読み込む）
+# 初心者向け解説：本番でワーカー（FastAPI を動かすプロセス）を何個・どう起動するかの設定
+#
+# preload（GUNICORN_PRELOAD=true、既定）：
+# - アプリ（app.main）の読み込みをマスタープロセスで1回だけ行い、ワーカーは fork でそれを複製する
+#   → NumPy・SQLAlchemy・ルーター・参照用のマスタデータ（app/services/reference_data.py）の
+#     読み込みがワーカーの数だけ繰り返されず、起動が速くなる
+#   → 読み込んだメモリはワーカー間で共有される（書き込まれたページだけがワーカーごとにコピーされる）
+# - DB 接続・計算プロセス・ジョブワーカー・LLM クライアントは、fork の後にワーカーごとに作る
+#   （app/main.py の lifespan。マスターでは作らない）
+#
+# 計測：python -m benchmarks.preload_benchmark（ワーカーごとのメモリと起動時間を preload あり・なしで比べる）
+
+import gc
+import os
+
+from app.config import settings
+
+MEMORY_JOB_WARNING = (
+    "⚠️ JOB_BACKEND=memory は1ワーカー用です（指定は {workers} ワーカー）。1ワーカーで起動します。"
+    "複数ワーカーにするには JOB_BACKEND=redis と REDIS_URL を設定してください"
+)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+# なぜ1ワーカーにする：memory ではジョブが登録を受けたワーカーの中にしかない。
+# 状態確認・キャンセルが別のワーカーに届くと 404 になる（4ワーカーなら4回に3回）
+# 起動を止めるより、警告を出して動く構成（1ワーカー）で起動する
+if settings.JOB_BACKEND == "memory" and workers > 1:
+    print(MEMORY_JOB_WARNING.format(workers=workers))
+    workers = 1
+# アプリ（app/config.py の WEB_CONCURRENCY）にも同じワーカー数を伝える（LLM のレート制限を分けるため）
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def on_starting(server):
+    """マスタープロセスの起動時に呼ばれる（ワーカーを作る前に設定を確かめる）"""
+    # コマンドラインの -w でワーカー数を上書きされた場合も、memory なら1ワーカーに戻す
+    if settings.JOB_BACKEND == "memory" and server.cfg.workers > 1:
+        print(MEMORY_JOB_WARNING.format(workers=server.cfg.workers))
+        server.cfg.set("workers", 1)
+        server.num_workers = 1
+
+
+def when_ready(server):
+    """ワーカーを fork する直前（マスターでアプリを読み込んだ後）に呼ばれる"""
+    if preload_app:
+        # なぜ gc.freeze：読み込み済みのオブジェクトを GC の対象から外す
+        # → ワーカーの GC がオブジェクトの管理情報に書き込まず、共有したページがコピーされにくくなる
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """ワーカーを fork した直後に、ワーカーの中で呼ばれる"""
+    from app.database import engine
+
+    # マスターで DB に接続していた場合、その接続をワーカー間で共有しないように接続プールを作り直す
+    # （close=False：マスター側の接続は閉じずに、このワーカーでは使わないだけ）
+    engine.dispose(close=False)
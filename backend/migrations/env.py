@@ -0,0 +1,84 @@
+# Alembic の実行環境
+# 初心者向け解説：python -m alembic ... の時に読み込まれ、どの DB に・どのモデルと比べて
+#                マイグレーションするかを決めるファイル
+#
+# 注目ポイント：
+# - 接続先は app.config の DATABASE_URL（アプリと同じ .env / 環境変数）
+# - 比較の相手は app.models の Base.metadata（--autogenerate でモデルとの差分からファイルを作れる）
+# - SQLite は ALTER TABLE でできることが少ないので、batch モード（作り直し）で変更する
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  全てのモデルを Base.metadata に登録する
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# なぜ % を %% に：alembic.ini の書式では % が特別な意味を持つため（パスワードに % があっても動くように）
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    --autogenerate で比較する対象
+
+    SQLite の全文検索テーブル（search_index とその内部テーブル）は、
+    マイグレーションの中で直接作るのでモデルとの比較から外す
+    """
+    if type_ == "table" and name and name.startswith("search_index"):
+        return False
+    return True
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """MySQL の FULLTEXT 索引もマイグレーションの中で直接作るので、比較から外す"""
+    if type_ == "index" and obj.dialect_options["mysql"].get("prefix") == "FULLTEXT":
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """DB に接続せず、実行する SQL を表示する（python -m alembic upgrade head --sql）"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """DB に接続してマイグレーションを適用する"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+            include_name=include_name,
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,216 @@
+"""baseline: 高速化の作業を始める前（create_all で作っていた時点）のテーブル一式
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 新しい DB では、このファイルから順に 0002 以降を適用すると、今のテーブルが全部できる
+- create_all（起動時の自動作成）や database/init.sql で作った既存の DB は、
+  ここまでのテーブルがもうあるので、次の順に実行する（README.md「データベースのマイグレーション」）
+    python -m alembic stamp 0001     ← 「0001 まで適用済み」と記録するだけ（テーブルは変更しない）
+    python -m alembic upgrade head   ← 0002 以降（data_version 列・新しいテーブル・索引）を追加する
+
+注目ポイント：
+- 金額の列は Float（モデルと同じ）。以前の database/init.sql の DECIMAL(15, 2) は使わない
+  （アプリの計算は float で行っていて、DECIMAL だと Decimal 型が返ってきて型が混ざるため）
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table('assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('asset_type', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('purchase_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_assets_id', 'assets', ['id'], unique=False)
+    op.create_index('ix_assets_user_id', 'assets', ['user_id'], unique=False)
+
+    op.create_table('chat_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chat_messages_id', 'chat_messages', ['id'], unique=False)
+    op.create_index('ix_chat_messages_user_id', 'chat_messages', ['user_id'], unique=False)
+    op.create_index('ix_chat_messages_created_at', 'chat_messages', ['created_at'], unique=False)
+
+    op.create_table('careers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('career_type', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.String(length=200), nullable=False),
+    sa.Column('expected_income', sa.Float(), nullable=True),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('target_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('timeline', sa.String(length=20), nullable=True),
+    sa.Column('event_year', sa.Integer(), nullable=True),
+    sa.Column('salary_increase_rate', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_careers_id', 'careers', ['id'], unique=False)
+
+    op.create_table('educations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('education_type', sa.String(length=50), nullable=False),
+    sa.Column('child_name', sa.String(length=100), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('timeline', sa.String(length=20), nullable=True),
+    sa.Column('child_age', sa.Integer(), nullable=True),
+    sa.Column('school_type', sa.String(length=50), nullable=True),
+    sa.Column('is_private', sa.Integer(), nullable=True),
+    sa.Column('start_year', sa.Integer(), nullable=True),
+    sa.Column('end_year', sa.Integer(), nullable=True),
+    sa.Column('annual_cost', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_educations_id', 'educations', ['id'], unique=False)
+
+    op.create_table('expenses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expense_type', sa.String(length=50), nullable=False),
+    sa.Column('occurrence_type', sa.String(length=10), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('expense_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_expenses_id', 'expenses', ['id'], unique=False)
+
+    op.create_table('family_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('relationship_type', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('gender', sa.String(length=20), nullable=False),
+    sa.Column('birth_date', sa.Date(), nullable=False),
+    sa.Column('school_type', sa.String(length=50), nullable=True),
+    sa.Column('employment_status', sa.String(length=50), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_family_members_id', 'family_members', ['id'], unique=False)
+
+    op.create_table('houses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('house_type', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('timeline', sa.String(length=20), nullable=True),
+    sa.Column('purchase_year', sa.Integer(), nullable=True),
+    sa.Column('loan_term', sa.Integer(), nullable=True),
+    sa.Column('loan_rate', sa.Float(), nullable=True),
+    sa.Column('down_payment', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_houses_id', 'houses', ['id'], unique=False)
+
+    op.create_table('incomes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('income_type', sa.String(length=50), nullable=False),
+    sa.Column('occurrence_type', sa.String(length=20), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_incomes_id', 'incomes', ['id'], unique=False)
+
+    op.create_table('retirements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('retirement_type', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('retirement_age', sa.Integer(), nullable=True),
+    sa.Column('monthly_amount', sa.Float(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_retirements_id', 'retirements', ['id'], unique=False)
+
+    op.create_table('risks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('risk_type', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=True),
+    sa.Column('timeline', sa.String(length=20), nullable=True),
+    sa.Column('insurance_type', sa.String(length=50), nullable=True),
+    sa.Column('coverage_amount', sa.Float(), nullable=True),
+    sa.Column('monthly_premium', sa.Float(), nullable=True),
+    sa.Column('coverage_period', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_risks_id', 'risks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    for table in (
+        'risks', 'retirements', 'incomes', 'houses', 'family_members', 'expenses',
+        'educations', 'chat_messages', 'careers', 'assets', 'users',
+    ):
+        op.drop_table(table)
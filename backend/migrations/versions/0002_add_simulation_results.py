@@ -0,0 +1,47 @@
+"""users.data_version と、夜間バッチの事前計算結果 simulation_results を追加
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+初心者向け解説：
+- data_version：収入・支出・資産などが変わるたびに +1 される（app/models/data_version.py のフック）
+  既存のユーザーは 0 から始まる（server_default）
+- simulation_results：夜間バッチ（python -m app.batch.precompute_simulations）の計算結果
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    op.create_table('simulation_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('years', sa.Integer(), nullable=False),
+    sa.Column('resolution', sa.String(length=10), nullable=False),
+    sa.Column('data_version', sa.Integer(), nullable=False),
+    sa.Column('base_year', sa.Integer(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'years', 'resolution', name='uq_simulation_results_user_params')
+    )
+    op.create_index('ix_simulation_results_id', 'simulation_results', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('simulation_results')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('data_version')
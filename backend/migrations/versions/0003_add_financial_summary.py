@@ -0,0 +1,54 @@
+"""家計サマリー user_financial_summary を追加
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+初心者向け解説：
+- ユーザーごとの合計値（資産合計・年収・純資産など）を、書き込みのたびに更新して1行で持つ
+- 既存のユーザーの行は、GET /api/summary などで初めて読んだ時に作られる（ここでは作らない）
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_financial_summary',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_assets', sa.Float(), nullable=False),
+    sa.Column('asset_count', sa.Integer(), nullable=False),
+    sa.Column('annual_income', sa.Float(), nullable=False),
+    sa.Column('income_count', sa.Integer(), nullable=False),
+    sa.Column('annual_expense', sa.Float(), nullable=False),
+    sa.Column('expense_count', sa.Integer(), nullable=False),
+    sa.Column('annual_net_cashflow', sa.Float(), nullable=False),
+    sa.Column('house_total', sa.Float(), nullable=False),
+    sa.Column('house_count', sa.Integer(), nullable=False),
+    sa.Column('housing_loan_balance', sa.Float(), nullable=False),
+    sa.Column('education_total', sa.Float(), nullable=False),
+    sa.Column('education_count', sa.Integer(), nullable=False),
+    sa.Column('career_count', sa.Integer(), nullable=False),
+    sa.Column('risk_total', sa.Float(), nullable=False),
+    sa.Column('risk_count', sa.Integer(), nullable=False),
+    sa.Column('retirement_total', sa.Float(), nullable=False),
+    sa.Column('retirement_count', sa.Integer(), nullable=False),
+    sa.Column('family_count', sa.Integer(), nullable=False),
+    sa.Column('net_worth', sa.Float(), nullable=False),
+    sa.Column('data_version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_financial_summary')
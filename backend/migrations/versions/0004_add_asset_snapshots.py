@@ -0,0 +1,39 @@
+"""資産推移のスナップショット asset_snapshots を追加
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 資産が変わった日に、種類ごとの合計を1行ずつ追記する（app/services/asset_history.py）
+- 古い日次の行は、週・月の行にまとめる（granularity = day / week / month）
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('asset_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('asset_type', sa.String(length=50), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('granularity', sa.String(length=5), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_asset_snapshots_user_date', 'asset_snapshots', ['user_id', 'snapshot_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('asset_snapshots')
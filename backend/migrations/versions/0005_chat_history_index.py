@@ -0,0 +1,43 @@
+"""チャット履歴のキーセットページネーション用の複合索引 (user_id, created_at, id)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 「このユーザーの履歴を新しい順に、カーソルより古いものを N 件」を、索引の順番のままたどれる
+- 複合索引に含まれる user_id・created_at だけの索引は不要になるので消す
+  （user_id の索引は外部キーにも使われていたが、複合索引の先頭が user_id なので代わりになる）
+
+注目ポイント：
+- 単独の索引の名前は DB の作り方で違う（create_all：ix_chat_messages_user_id、
+  以前の database/init.sql：idx_user_id）ので、名前ではなく列で探して消す
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SINGLE_COLUMN_INDEXES = (['user_id'], ['created_at'])
+
+
+def upgrade() -> None:
+    op.create_index('ix_chat_messages_user_created_id', 'chat_messages', ['user_id', 'created_at', 'id'], unique=False)
+
+    for index in sa.inspect(op.get_bind()).get_indexes('chat_messages'):
+        if index['column_names'] in SINGLE_COLUMN_INDEXES:
+            op.drop_index(index['name'], table_name='chat_messages')
+
+
+def downgrade() -> None:
+    op.create_index('ix_chat_messages_user_id', 'chat_messages', ['user_id'], unique=False)
+    op.create_index('ix_chat_messages_created_at', 'chat_messages', ['created_at'], unique=False)
+    op.drop_index('ix_chat_messages_user_created_id', table_name='chat_messages')
@@ -0,0 +1,69 @@
+"""チャット履歴と各カテゴリの備考（notes）の全文検索
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+初心者向け解説（データベースごとの仕組み。app/models/search_index.py と同じもの）：
+- MySQL ：FULLTEXT 索引（ngram パーサー）。日本語は単語の間にスペースがないので2文字ずつ区切る
+          （chat_messages の索引は 0008 でパーティション表にする時に消す）
+- SQLite：FTS5 の仮想テーブル search_index と、元テーブルと同期するトリガー
+          既存の行もここで取り込む
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# FULLTEXT（ngram）索引を作るテーブルと列（MySQL のみ）
+MYSQL_FULLTEXT_INDEXES = [
+    ('chat_messages', ['message', 'response']),
+    ('assets', ['notes']),
+    ('incomes', ['notes']),
+    ('expenses', ['notes']),
+    ('houses', ['notes']),
+    ('educations', ['notes']),
+    ('careers', ['notes']),
+    ('risks', ['notes']),
+    ('retirements', ['notes']),
+    ('family_members', ['notes']),
+]
+
+
+def _index_name(table, columns) -> str:
+    return f"ft_{table}_{'_'.join(columns)}"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        for table, columns in MYSQL_FULLTEXT_INDEXES:
+            op.create_index(_index_name(table, columns), table, columns,
+                            mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+    elif dialect == 'sqlite':
+        from app.models.search_index import sqlite_search_statements
+
+        for statement in sqlite_search_statements():
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        for table, columns in MYSQL_FULLTEXT_INDEXES:
+            op.drop_index(_index_name(table, columns), table_name=table)
+    elif dialect == 'sqlite':
+        from app.models.search_index import SEARCH_SOURCES
+
+        for model, _title, _columns in SEARCH_SOURCES.values():
+            for suffix in ('ai', 'au', 'ad'):
+                op.execute(f'DROP TRIGGER IF EXISTS search_{model.__tablename__}_{suffix}')
+        op.execute('DROP TABLE IF EXISTS search_index')
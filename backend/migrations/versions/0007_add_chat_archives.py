@@ -0,0 +1,43 @@
+"""チャット履歴のアーカイブ chat_archives を追加
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 古いチャットを「ユーザー × 月」ごとに1行にまとめ、JSON を圧縮して payload に入れる
+- 移す処理は python -m app.batch.archive_chat（chat_messages からは削除される）
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_archives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('first_created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(), nullable=False),
+    sa.Column('codec', sa.String(length=10), nullable=False),
+    sa.Column('payload', sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'period', name='uq_chat_archives_user_period')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('chat_archives')
@@ -0,0 +1,57 @@
+"""chat_messages を created_at の月別パーティション表にする（MySQL のみ）
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 区画の作り方は app/services/chat_partitions.py（今月から CHAT_PARTITION_AHEAD_MONTHS か月先 + pmax）
+- 先の月の区画は python -m app.batch.chat_partitions で毎月作り足す
+- SQLite など MySQL 以外では何もしない
+
+注意（MySQL の制約）：
+- パーティション表は外部キー・FULLTEXT 索引を持てないので、先に消す
+  （チャットの全文検索は、期間を絞った部分一致に切り替わる。app/services/search.py）
+- 主キーに created_at を含める必要がある → 主キーは (id, created_at)
+- 既存の行をすべて作り直すので、行数が多い場合はメンテナンス時間中に実行する
+  （今月より前の行は、すべて今月の区画に入る。アーカイブの対象なので問題ない）
+"""
+from typing import Sequence, Union
+
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        return
+    from app.config import settings
+    from app.services.chat_partitions import partitioning_ddl
+
+    # 外部キーの名前は DB の作り方で違う（例：chat_messages_ibfk_1）ので、DB から読む
+    for foreign_key in sa.inspect(bind).get_foreign_keys('chat_messages'):
+        op.drop_constraint(foreign_key['name'], 'chat_messages', type_='foreignkey')
+    op.drop_index('ft_chat_messages_message_response', table_name='chat_messages')
+
+    for statement in partitioning_ddl(date.today(), settings.CHAT_PARTITION_AHEAD_MONTHS):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.execute('ALTER TABLE chat_messages REMOVE PARTITIONING')
+    op.execute('ALTER TABLE chat_messages DROP PRIMARY KEY, ADD PRIMARY KEY (id)')
+    op.create_index('ft_chat_messages_message_response', 'chat_messages', ['message', 'response'],
+                    mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+    op.create_foreign_key(None, 'chat_messages', 'users', ['user_id'], ['id'])
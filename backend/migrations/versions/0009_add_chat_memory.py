@@ -0,0 +1,38 @@
+"""会話メモリー user_chat_memory を追加
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 直近のターンはそのまま、それより古い会話はユーザーごとの要約1つにまとめて AI に渡す
+- summarized_through_at / summarized_through_id：要約に含め終わった最後のメッセージ
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_chat_memory',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=False),
+    sa.Column('summarized_turns', sa.Integer(), nullable=False),
+    sa.Column('summarized_through_at', sa.DateTime(), nullable=True),
+    sa.Column('summarized_through_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_chat_memory')
@@ -0,0 +1,55 @@
+"""user_id の索引と、よく使うクエリ用の複合索引を追加
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+初心者向け解説：
+- 一覧・シミュレーション・家計サマリーは、どのテーブルも「WHERE user_id = ?」で読む
+  → 索引がないと、他のユーザーの行も含めて全件を読んで絞り込む（フルスキャン）
+- 索引には主キー（id）も含まれるので、ORDER BY id もそのまま索引の順で読める
+
+注目ポイント：
+- houses は (user_id, house_type)。家計サマリーの住宅ローン残高の条件
+  （user_id = ? AND house_type IN (...)）に合わせた。user_id だけの検索にも使える
+- chat_archives は (user_id, last_created_at, id)。アーカイブを新しい月から読む順番と同じ
+- MySQL では外部キーのために自動で作られていた索引が、この索引に置き換わる
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (索引名, テーブル, 列)
+INDEXES = [
+    ('ix_incomes_user_id', 'incomes', ['user_id']),
+    ('ix_expenses_user_id', 'expenses', ['user_id']),
+    ('ix_houses_user_type', 'houses', ['user_id', 'house_type']),
+    ('ix_educations_user_id', 'educations', ['user_id']),
+    ('ix_careers_user_id', 'careers', ['user_id']),
+    ('ix_risks_user_id', 'risks', ['user_id']),
+    ('ix_retirements_user_id', 'retirements', ['user_id']),
+    ('ix_family_members_user_id', 'family_members', ['user_id']),
+    ('ix_chat_archives_user_last', 'chat_archives', ['user_id', 'last_created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    # MySQL では外部キーがこれらの索引を使っているので消せない（消すとエラーになる）。
+    # 外部キー用の索引はどのみち必要なので、MySQL では残したままにする
+    if op.get_bind().dialect.name == 'mysql':
+        return
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
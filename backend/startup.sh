@@ -1,8 +1,10 @@
 #!/bin/bash
 # Azure App Service startup script
 
-# データベースマイグレーション（初回のみ）
-# python -m alembic upgrade head
+# データベースマイグレーション（ワーカーを起動する前に1回だけ）
+# なぜここで：ワーカー（-w 4）がそれぞれテーブルを作ろうとすると、起動が遅くなり、同時に実行されて衝突する
+# 失敗したら起動しない（古いテーブルのまま新しいコードが動かないように）
+python -m alembic upgrade head || exit 1
 
-# アプリケーション起動
-gunicorn -w 4 -k uvicorn.workers.UvicornWorker app.main:app --bind 0.0.0.0:8000 --timeout 120
+# アプリケーション起動（ワーカー数・preload などは gunicorn.conf.py）
+gunicorn -c gunicorn.conf.py app.main:app
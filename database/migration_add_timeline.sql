@@ -1,5 +1,7 @@
 -- データベース構造整理: 未来計画用の追加カラム
 -- 実行日: 2026-01-16
+-- 注意：今は Alembic（backend/migrations/）で管理している。この列は 0001_baseline に
+--       モデルと同じ Float で含まれているので、新しい DB にこのファイルを実行しない
 
 -- ⑦老後設計テーブル（未来計画）
 ALTER TABLE retirements 